@@ -0,0 +1,5 @@
+"""
+Micro-benchmarks for the honeypot hot paths
+
+Run from the repository root, e.g. ``python -m src.benchmarks.bench_detection``.
+"""
@@ -0,0 +1,177 @@
+"""
+Benchmark the dashboard queries on attack_logs before and after indexing.
+
+Seeds a scratch copy of the table (``attack_logs_bench`` by default) with N
+synthetic rows, times each dashboard query without secondary indexes, adds
+the indexes from src/migrations/001_attack_logs_indexes.sql and times them
+again. Point --db-url at a scratch MariaDB database, not production.
+
+    python -m src.benchmarks.bench_attack_logs_queries --rows 5000000 --db-url mariadb+mysqldb://...
+"""
+
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+from src.database import create_db_engine
+
+INDEXES = {
+    'idx_attack_logs_timestamp_risk': '(timestamp, risk_score)',
+    'idx_attack_logs_source_ip_timestamp': '(source_ip, timestamp)',
+    'idx_attack_logs_risk_timestamp': '(risk_score, timestamp)',
+}
+
+QUERIES = {
+    'stats_24h': """
+        SELECT
+            SUM(CASE WHEN risk_score >= 0.7 THEN 1 ELSE 0 END) as critical,
+            SUM(CASE WHEN risk_score >= 0.5 AND risk_score < 0.7 THEN 1 ELSE 0 END) as high,
+            SUM(CASE WHEN risk_score >= 0.3 AND risk_score < 0.5 THEN 1 ELSE 0 END) as medium,
+            SUM(CASE WHEN risk_score < 0.3 THEN 1 ELSE 0 END) as low
+        FROM {table}
+        WHERE timestamp >= DATE_SUB(NOW(), INTERVAL 24 HOUR)
+    """,
+    'latest_10': """
+        SELECT * FROM {table}
+        ORDER BY timestamp DESC
+        LIMIT 10
+    """,
+    'by_source_ip': """
+        SELECT id, timestamp, risk_score FROM {table}
+        WHERE source_ip = :source_ip
+        ORDER BY timestamp DESC
+        LIMIT 50
+    """,
+    'critical_7d': """
+        SELECT COUNT(*) FROM {table}
+        WHERE risk_score >= 0.7
+        AND timestamp >= DATE_SUB(NOW(), INTERVAL 7 DAY)
+    """,
+}
+
+
+def create_table(conn, table):
+    """Create an unindexed copy of the attack_logs layout"""
+    conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    conn.execute(text(f"""
+        CREATE TABLE {table} (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            source_ip VARCHAR(45) NOT NULL,
+            request_method VARCHAR(10),
+            request_path TEXT CHARACTER SET utf8mb4,
+            request_data MEDIUMTEXT CHARACTER SET utf8mb4,
+            type VARCHAR(100),
+            attack_type VARCHAR(100),
+            attack_details MEDIUMTEXT CHARACTER SET utf8mb4,
+            risk_score FLOAT,
+            user_agent TEXT CHARACTER SET utf8mb4,
+            headers MEDIUMTEXT CHARACTER SET utf8mb4,
+            response_code INT,
+            is_malicious BOOLEAN
+        ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+    """))
+
+
+def seed(db, table, rows, days, chunk_size=5000):
+    """Insert synthetic attack rows spread over the last ``days`` days"""
+    insert = text(f"""
+        INSERT INTO {table}
+        (timestamp, source_ip, request_method, request_path, request_data,
+        type, attack_type, attack_details, risk_score, user_agent, headers,
+        response_code, is_malicious)
+        VALUES
+        (:timestamp, :source_ip, :request_method, :request_path, :request_data,
+        :type, :attack_type, :attack_details, :risk_score, :user_agent, :headers,
+        :response_code, :is_malicious)
+    """)
+    rng = random.Random(42)
+    ips = [f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}" for _ in range(5000)]
+    now = datetime.now()
+    span = days * 86400
+
+    start = time.perf_counter()
+    inserted = 0
+    while inserted < rows:
+        batch = []
+        for _ in range(min(chunk_size, rows - inserted)):
+            login = rng.random() < 0.6
+            batch.append({
+                'timestamp': (now - timedelta(seconds=rng.randint(0, span))).strftime('%Y-%m-%d %H:%M:%S'),
+                'source_ip': rng.choice(ips),
+                'request_method': 'POST' if login else 'GET',
+                'request_path': '/login' if login else '/api/products',
+                'request_data': '{"username": "admin\' OR 1=1 --", "password": "x"}',
+                'type': 'Authentication Bypass Attempt' if login else 'Data Extraction Attempt',
+                'attack_type': 'SQL_INJECTION_LOGIN' if login else 'SQL_INJECTION_PRODUCTS',
+                'attack_details': '{}',
+                'risk_score': round(rng.random(), 3),
+                'user_agent': 'sqlmap/1.7',
+                'headers': '{}',
+                'response_code': 200,
+                'is_malicious': True,
+            })
+        with db.begin() as conn:
+            conn.execute(insert, batch)
+        inserted += len(batch)
+    elapsed = time.perf_counter() - start
+    print(f"seeded {inserted:,} rows in {elapsed:.1f}s ({inserted / elapsed:,.0f} rows/sec)")
+    return ips
+
+
+def time_queries(db, table, params, repeat):
+    """Return the median wall time in ms of each dashboard query"""
+    results = {}
+    with db.connect() as conn:
+        for name, sql in QUERIES.items():
+            query = text(sql.format(table=table))
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(query, params).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = statistics.median(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db-url', help="Scratch database URL (defaults to HONEYPOT_DB_URL)")
+    parser.add_argument('--table', default='attack_logs_bench')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=90, help="Spread rows over this many days")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--keep', action='store_true', help="Keep the benchmark table afterwards")
+    args = parser.parse_args()
+
+    db = create_db_engine(args.db_url)
+    with db.begin() as conn:
+        create_table(conn, args.table)
+    ips = seed(db, args.table, args.rows, args.days)
+    params = {'source_ip': ips[0]}
+
+    before = time_queries(db, args.table, params, args.repeat)
+
+    start = time.perf_counter()
+    with db.begin() as conn:
+        for name, columns in INDEXES.items():
+            conn.execute(text(f"CREATE INDEX {name} ON {args.table} {columns}"))
+    print(f"built indexes in {time.perf_counter() - start:.1f}s")
+
+    after = time_queries(db, args.table, params, args.repeat)
+
+    print(f"\n{'query':<16}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] else float('inf')
+        print(f"{name:<16}{before[name]:>12.1f}{after[name]:>12.1f}{speedup:>9.1f}x")
+
+    if not args.keep:
+        with db.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {args.table}"))
+
+
+if __name__ == '__main__':
+    main()
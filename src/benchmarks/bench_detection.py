@@ -0,0 +1,90 @@
+"""
+Benchmark for the pattern-based detection stage of detect_sql_injection.
+
+Compares the previous per-call implementation (rule dict rebuilt and every
+regex searched on each request) against the precompiled DetectionEngine and
+checks that both produce the same score and matched rules for every payload.
+"""
+
+import re
+import json
+import time
+import argparse
+
+from src.honeypot.detection_engine import DEFAULT_RULES, DetectionEngine
+
+SAMPLE_PAYLOADS = [
+    # Benign form submissions
+    {'username': 'alice', 'password': 'correct horse battery staple'},
+    {'username': 'bob.smith@example.com', 'password': 'Summer2024!'},
+    {'category': 'electronics'},
+    {'category': 'home & garden'},
+    {'username': 'orlando', 'password': 'android1'},
+    # Typical scanner payloads
+    {'username': "admin' --", 'password': 'x'},
+    {'username': "' OR '1'='1' --", 'password': 'x'},
+    {'username': "1' UNION SELECT username, password FROM users --", 'password': 'x'},
+    {'category': "1' AND 1=1 UNION ALL SELECT NULL,table_name FROM information_schema.tables#"},
+    {'category': "1'; DROP TABLE users; --"},
+    {'category': "x' AND name LIKE '%admin%"},
+    {'username': "1' AND SLEEP(5) AND '1'='1", 'password': 'x'},
+    {'username': "admin' OR 1=1/*", 'password': '*/'},
+    {'category': "1; UPDATE users SET role='admin' WHERE id=1"},
+]
+
+
+def legacy_scan(input_data):
+    """Pattern stage as it ran before the detection engine existed"""
+    pattern_weights = {rule.pattern: rule.weight for rule in DEFAULT_RULES}
+
+    risk_score = 0.0
+    matched_patterns = []
+    for pattern, weight in pattern_weights.items():
+        if re.search(pattern, input_data, re.IGNORECASE):
+            matched_patterns.append(pattern)
+            risk_score = max(risk_score, weight)
+
+    if len(matched_patterns) > 1:
+        risk_score = min(1.0, risk_score + (0.1 * (len(matched_patterns) - 1)))
+
+    return risk_score, matched_patterns
+
+
+def run(scan, payloads, iterations):
+    """Return requests/sec for scanning every payload ``iterations`` times"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for payload in payloads:
+            scan(payload)
+    elapsed = time.perf_counter() - start
+    return (iterations * len(payloads)) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    payloads = [json.dumps(p) for p in SAMPLE_PAYLOADS]
+    engine = DetectionEngine()
+
+    for payload in payloads:
+        expected = legacy_scan(payload)
+        actual = engine.scan(payload)
+        if expected != actual:
+            raise SystemExit(f"Mismatch for {payload!r}: {expected} != {actual}")
+
+    # Warm the re module cache so the legacy path is measured at its best
+    run(legacy_scan, payloads, 10)
+
+    before = run(legacy_scan, payloads, args.iterations)
+    after = run(engine.scan, payloads, args.iterations)
+
+    print(f"payloads:          {len(payloads)} x {args.iterations}")
+    print(f"legacy re.search:  {before:,.0f} requests/sec")
+    print(f"DetectionEngine:   {after:,.0f} requests/sec")
+    print(f"speedup:           {after / before:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
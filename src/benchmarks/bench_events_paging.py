@@ -0,0 +1,97 @@
+"""
+Benchmark deep paging of the events API: keyset cursor vs OFFSET.
+
+Seeds a scratch copy of attack_logs (see bench_attack_logs_queries), adds
+the (timestamp, id) index from src/migrations/005_attack_logs_keyset_index.sql
+and times fetching one page at increasing depths, once with LIMIT/OFFSET and
+once with the keyset query the API uses. OFFSET grows with the depth, the
+keyset page stays flat. Point --db-url at a scratch MariaDB database.
+
+    python -m src.benchmarks.bench_events_paging --rows 1000000 --db-url mariadb+mysqldb://...
+"""
+
+import time
+import argparse
+import statistics
+from sqlalchemy import text
+
+from src.database import create_db_engine
+from src.honeypot.event_query import LIST_COLUMNS, build_events_query
+from src.benchmarks.bench_attack_logs_queries import create_table, seed
+
+# The scratch table has the original attack_logs columns only
+COLUMNS = [column for column in LIST_COLUMNS if column != 'payload_fingerprint']
+
+
+def time_query(conn, query, params, repeat):
+    """Median wall time in ms of a query"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(query, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db-url', help="Scratch database URL (defaults to HONEYPOT_DB_URL)")
+    parser.add_argument('--table', default='attack_logs_bench')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=90, help="Spread rows over this many days")
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--keep', action='store_true', help="Keep the benchmark table afterwards")
+    args = parser.parse_args()
+
+    db = create_db_engine(args.db_url)
+    with db.begin() as conn:
+        create_table(conn, args.table)
+    seed(db, args.table, args.rows, args.days)
+    with db.begin() as conn:
+        conn.execute(text(f"CREATE INDEX idx_{args.table}_timestamp_id ON {args.table} (timestamp, id)"))
+
+    offset_query = text(f"""
+        SELECT {', '.join(COLUMNS)}
+        FROM {args.table}
+        ORDER BY timestamp DESC, id DESC
+        LIMIT :limit OFFSET :offset
+    """)
+    position_query = text(f"""
+        SELECT timestamp, id
+        FROM {args.table}
+        ORDER BY timestamp DESC, id DESC
+        LIMIT 1 OFFSET :offset
+    """)
+
+    depths = [0]
+    depth = 10
+    while depth * args.page_size < args.rows:
+        depths.append(depth)
+        depth *= 10
+    depths.append(args.rows // args.page_size - 1)
+
+    print(f"{'page':>10}{'offset ms':>12}{'keyset ms':>12}{'speedup':>10}")
+    with db.connect() as conn:
+        for page in depths:
+            skipped = page * args.page_size
+            offset_ms = time_query(conn, offset_query, {'limit': args.page_size, 'offset': skipped}, args.repeat)
+
+            # The cursor a client would hold after reading the previous page
+            cursor = None
+            if skipped:
+                row = conn.execute(position_query, {'offset': skipped - 1}).fetchone()
+                cursor = (row['timestamp'], row['id'])
+            query, params = build_events_query(COLUMNS, args.page_size, cursor=cursor, table=args.table)
+            keyset_ms = time_query(conn, query, params, args.repeat)
+
+            speedup = offset_ms / keyset_ms if keyset_ms else float('inf')
+            print(f"{page:>10,}{offset_ms:>12.1f}{keyset_ms:>12.1f}{speedup:>9.1f}x")
+
+    if not args.keep:
+        with db.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {args.table}"))
+
+
+if __name__ == '__main__':
+    main()
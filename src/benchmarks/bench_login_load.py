@@ -0,0 +1,111 @@
+"""
+Load test for the honeypot's /login endpoint.
+
+Runs a fixed number of client threads, each with its own keep-alive
+connection, POSTing login forms for a fixed duration, first with benign
+credentials and then with SQL injection payloads, and reports sustained
+requests/sec and latency percentiles for each. Start the server first, e.g.
+
+    python -m src.serve --workers 4 --threads 8
+    python -m src.benchmarks.bench_login_load --url http://127.0.0.1:9000 --concurrency 32
+"""
+
+import time
+import argparse
+import threading
+import statistics
+import http.client
+from itertools import cycle
+from urllib.parse import urlencode, urlsplit
+
+BENIGN_FORMS = [
+    {'username': 'alice', 'password': 'correct horse battery staple'},
+    {'username': 'bob.smith@example.com', 'password': 'Summer2024!'},
+    {'username': 'orlando', 'password': 'android1'},
+    {'username': 'j.doe', 'password': 'hunter2'},
+]
+
+INJECTION_FORMS = [
+    {'username': "admin' --", 'password': 'x'},
+    {'username': "' OR '1'='1' --", 'password': 'x'},
+    {'username': "1' UNION SELECT username, password FROM users --", 'password': 'x'},
+    {'username': "1' AND SLEEP(5) AND '1'='1", 'password': 'x'},
+    {'username': "admin' OR 1=1/*", 'password': '*/'},
+]
+
+
+def run_client(host, port, path, bodies, deadline, latencies, errors):
+    """POST bodies round-robin on one keep-alive connection until the deadline"""
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'User-Agent': 'bench-login-load'}
+    for body in cycle(bodies):
+        if time.perf_counter() >= deadline:
+            break
+        start = time.perf_counter()
+        try:
+            conn.request('POST', path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+            latencies.append(time.perf_counter() - start)
+        except Exception:
+            errors.append(None)
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.close()
+
+
+def run_scenario(url, forms, concurrency, duration, warmup):
+    """Run one load scenario and return its results"""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    path = (parts.path.rstrip('/') or '') + '/login'
+    bodies = [urlencode(form) for form in forms]
+
+    # Warm-up requests are not counted
+    warm_latencies, warm_errors = [], []
+    run_client(host, port, path, bodies, time.perf_counter() + warmup, warm_latencies, warm_errors)
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=run_client, args=(host, port, path, bodies, deadline, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': len(errors),
+        'rps': count / elapsed if elapsed else 0.0,
+        'p50_ms': statistics.median(latencies) * 1000 if count else 0.0,
+        'p99_ms': latencies[min(count - 1, int(count * 0.99))] * 1000 if count else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:9000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=15.0, help="Seconds per scenario")
+    parser.add_argument('--warmup', type=float, default=2.0)
+    args = parser.parse_args()
+
+    scenarios = {'benign': BENIGN_FORMS, 'injection': INJECTION_FORMS}
+    print(f"{'scenario':<12}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, forms in scenarios.items():
+        result = run_scenario(args.url, forms, args.concurrency, args.duration, args.warmup)
+        print(f"{name:<12}{result['requests']:>10,}{result['errors']:>8}{result['rps']:>10,.0f}"
+              f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark model memory across worker processes: private copies vs memory-mapped.
+
+Starts --workers processes that each load the active model version (see
+src.ml_models.artifacts) and score a few payloads, once reading the compiled
+arrays into each process and once memory-mapping them, and reports the
+unique (USS) and proportional (PSS) memory the workers use in total. With
+memory mapping the model pages are counted once in PSS instead of once per
+worker. Needs a trained version (python -m src.ml_models.train) and psutil.
+
+    python -m src.benchmarks.bench_model_memory --workers 8
+"""
+
+import sys
+import time
+import argparse
+import subprocess
+
+import psutil
+
+WORKER = """
+import sys
+from src.ml_models.attack_classifier import SQLInjectionClassifier
+from src.ml_models.compiled_model import CompiledSQLiModel
+classifier = SQLInjectionClassifier()
+if sys.argv[1] == 'copy':
+    classifier.compiled_model = CompiledSQLiModel.load(classifier.compiled_model_path, mmap_mode=None)
+classifier.predict_risk_batch(["' OR 1=1 --", "hello world", "1 UNION SELECT a FROM b"])
+print(classifier.version, classifier.compiled_model.memory_mapped, flush=True)
+sys.stdin.read()
+"""
+
+
+def measure(mode, workers):
+    """Start workers in one mode and return (version, total USS, total PSS) once all have loaded"""
+    processes = [
+        subprocess.Popen([sys.executable, '-c', WORKER, mode], stdin=subprocess.PIPE,
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    try:
+        version = None
+        for process in processes:
+            version, memory_mapped = process.stdout.readline().split()
+            if (mode == 'mmap') != (memory_mapped == 'True'):
+                raise SystemExit(f"Version {version} has no memory-mappable compiled model")
+        time.sleep(0.5)
+        uss = pss = 0
+        for process in processes:
+            info = psutil.Process(process.pid).memory_full_info()
+            uss += info.uss
+            pss += info.pss
+        return version, uss, pss
+    finally:
+        for process in processes:
+            process.stdin.close()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'mode':>6}{'workers':>9}{'USS MB':>10}{'PSS MB':>10}")
+    for mode in ('copy', 'mmap'):
+        version, uss, pss = measure(mode, args.workers)
+        print(f"{mode:>6}{args.workers:>9}{uss / 1e6:>10.1f}{pss / 1e6:>10.1f}")
+    print(f"model version {version}")
+
+
+if __name__ == '__main__':
+    main()
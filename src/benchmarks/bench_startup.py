@@ -0,0 +1,97 @@
+"""
+Benchmark honeypot startup: eager construction vs lazy staged startup.
+
+Each run launches a fresh server process with the Flask development server
+and measures, from process start, how long until the decoy pages answer
+and until /api/hsiem/ready reports every component loaded. Needs the same
+database settings as the honeypot itself (HONEYPOT_DB_URL).
+
+    python -m src.benchmarks.bench_startup --runs 3
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import http.client
+
+DECOY_PATHS = ('/', '/login', '/products')
+
+SERVER = """
+import sys
+from src.honeypot.web_honeypot import SQLInjectionHoneypot
+honeypot = SQLInjectionHoneypot(lazy_startup=sys.argv[1] == 'lazy')
+honeypot.app.run(host='127.0.0.1', port=int(sys.argv[2]), threaded=True)
+"""
+
+
+def free_port():
+    """Return a TCP port that is free right now"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get_status(port, path):
+    """Return the HTTP status for a GET, or None if the server is not accepting yet"""
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        conn.request('GET', path)
+        status = conn.getresponse().status
+        conn.close()
+        return status
+    except OSError:
+        return None
+
+
+def wait_for(port, path, ok, start, deadline):
+    """Poll until a GET on path returns a status in ``ok``; return seconds since start"""
+    while time.perf_counter() < deadline:
+        if get_status(port, path) in ok:
+            return time.perf_counter() - start
+        time.sleep(0.01)
+    return None
+
+
+def measure(mode, timeout):
+    """Start one server and time its decoy pages and readiness"""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-c', SERVER, mode, str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=os.getcwd()
+    )
+    deadline = start + timeout
+    try:
+        results = {}
+        for path in DECOY_PATHS:
+            results[path] = wait_for(port, path, {200}, start, deadline)
+        results['ready'] = wait_for(port, '/api/hsiem/ready', {200}, start, deadline)
+        return results
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    args = parser.parse_args()
+
+    columns = list(DECOY_PATHS) + ['ready']
+    print(f"{'mode':<8}" + ''.join(f"{name:>12}" for name in columns) + "   (median seconds from launch)")
+    for mode in ('eager', 'lazy'):
+        runs = [measure(mode, args.timeout) for _ in range(args.runs)]
+        cells = []
+        for name in columns:
+            timings = [run[name] for run in runs if run[name] is not None]
+            cells.append(f"{statistics.median(timings):>12.3f}" if timings else f"{'timeout':>12}")
+        print(f"{mode:<8}" + ''.join(cells))
+
+
+if __name__ == '__main__':
+    main()
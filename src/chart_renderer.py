@@ -0,0 +1,134 @@
+"""
+Off-thread PNG chart rendering with a cache keyed by the plotted data
+
+Charts are drawn on a dedicated worker thread with matplotlib's
+object-oriented Figure API and an Agg canvas, so no request handler ever
+touches pyplot's global state. Rendered bytes are cached by chart name and a
+hash of the data being plotted: until that data changes, every request is
+served the cached image without rendering.
+"""
+
+import io
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+logger = logging.getLogger(__name__)
+
+
+def data_digest(data):
+    """Stable hash of chart input: numpy arrays, JSON-able values or tuples of both"""
+    h = hashlib.blake2b(digest_size=16)
+
+    def update(value):
+        if isinstance(value, np.ndarray):
+            h.update(str(value.dtype).encode())
+            h.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, (tuple, list)) and any(isinstance(v, np.ndarray) for v in value):
+            for item in value:
+                update(item)
+        else:
+            h.update(json.dumps(value, sort_keys=True, default=str).encode('utf-8'))
+        h.update(b'\0')
+
+    update(data)
+    return h.hexdigest()
+
+
+class ChartRenderer:
+    """Renders charts on one worker thread and caches the PNG bytes"""
+
+    def __init__(self, max_entries=32, timeout=30.0):
+        """
+        Initialize the renderer
+
+        Args:
+            max_entries: Rendered images kept across all charts
+            timeout: Seconds a request waits for a render
+        """
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.renders = 0
+        self.hits = 0
+
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    def _draw(self, draw, data, figsize, dpi):
+        """Run a draw function on a fresh Figure and return PNG bytes (worker thread)"""
+        fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(fig)
+        draw(fig, data)
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', bbox_inches='tight')
+        return buf.getvalue()
+
+    def render(self, name, data, draw, figsize=(10, 6), dpi=100):
+        """
+        Return PNG bytes for a chart, rendering only if ``data`` changed
+
+        Args:
+            name: Chart identifier, part of the cache key
+            data: Everything the chart depends on; hashed for the cache key
+            draw: Callable ``draw(fig, data)`` that populates a Figure
+        """
+        key = (name, data_digest(data))
+        with self._lock:
+            png = self._cache.get(key)
+            if png is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return png
+
+            # Requests for the same data share one render
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._get_executor().submit(self._draw, draw, data, figsize, dpi)
+                self._inflight[key] = future
+
+        if leader:
+            # Outside the lock: the callback runs immediately if the render already finished
+            future.add_done_callback(lambda f: self._finish(key, f))
+        return future.result(timeout=self.timeout)
+
+    def _get_executor(self):
+        """Return the render worker, recreating it in forked child processes"""
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chart-renderer')
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _finish(self, key, future):
+        """Move a completed render from in-flight to the cache"""
+        with self._lock:
+            self._inflight.pop(key, None)
+            if future.exception() is not None:
+                logger.error(f"Error rendering chart {key[0]}: {str(future.exception())}")
+                return
+            self.renders += 1
+            self._cache[key] = future.result()
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def stats(self):
+        """Return render and cache counters"""
+        with self._lock:
+            return {
+                'entries': len(self._cache),
+                'renders': self.renders,
+                'hits': self.hits,
+                'inflight': len(self._inflight)
+            }
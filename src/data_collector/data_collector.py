@@ -3,20 +3,126 @@ Data collection module for system monitoring and analysis
 """
 
 import os
+import time
 import psutil
 import platform
 import subprocess
 import logging
+import threading
+from array import array
 from datetime import datetime
 
+from .log_tail import tail_lines, LogFollower
+from ..vulnerability_assessment.auth_log_analyzer import AuthLogAnalyzer
+
 logger = logging.getLogger(__name__)
 
+class CPUSampler:
+    """Rolling per-core CPU utilization built from non-blocking psutil reads"""
+    
+    def __init__(self, window_seconds=60, sample_interval=1.0):
+        """
+        Initialize the sampler and prime psutil's counters
+        
+        Args:
+            window_seconds: Length of the averaging window
+            sample_interval: Seconds between background samples
+        """
+        self.sample_interval = sample_interval
+        self.cores = psutil.cpu_count(logical=True) or 1
+        self.slots = max(1, int(round(window_seconds / sample_interval)))
+        
+        # Fixed-size ring of per-core percentages, one row per sample, plus
+        # how many seconds each sample covers so the average is time-weighted
+        self._values = array('d', [0.0]) * (self.slots * self.cores)
+        self._durations = array('d', [0.0]) * self.slots
+        self._index = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+        
+        psutil.cpu_percent(interval=None, percpu=True)
+        self._last_sample = time.monotonic()
+    
+    def sample(self):
+        """Record utilization since the previous sample without sleeping"""
+        with self._lock:
+            percents = psutil.cpu_percent(interval=None, percpu=True)
+            now = time.monotonic()
+            elapsed = now - self._last_sample
+            self._last_sample = now
+            if elapsed <= 0:
+                return
+            
+            base = self._index * self.cores
+            for core in range(self.cores):
+                self._values[base + core] = percents[core] if core < len(percents) else 0.0
+            self._durations[self._index] = elapsed
+            self._index = (self._index + 1) % self.slots
+    
+    def average(self):
+        """Per-core utilization averaged over the window, or None before the first sample"""
+        with self._lock:
+            total = sum(self._durations)
+            if total <= 0:
+                return None
+            averages = []
+            for core in range(self.cores):
+                weighted = sum(
+                    self._values[slot * self.cores + core] * self._durations[slot]
+                    for slot in range(self.slots)
+                )
+                averages.append(round(weighted / total, 1))
+            return averages
+    
+    def _run(self):
+        """Background sampling loop"""
+        while True:
+            time.sleep(self.sample_interval)
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Error sampling CPU usage: {str(e)}", exc_info=True)
+    
+    def start(self):
+        """Start background sampling, restarting it in forked child processes"""
+        if self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True, name='cpu-sampler')
+        self._thread_pid = os.getpid()
+        self._thread.start()
+    
+    def cpu_percent(self):
+        """Return the windowed per-core utilization immediately"""
+        self.start()
+        averages = self.average()
+        if averages is None:
+            # Nothing recorded yet: use the delta since the counters were primed
+            self.sample()
+            averages = self.average()
+        return averages
+
 class DataCollector:
     """Collects system data for monitoring and analysis"""
     
-    def __init__(self):
-        """Initialize the data collector"""
+    def __init__(self, cpu_window_seconds=60, follow_logs=True, log_lines=100):
+        """
+        Initialize the data collector
+        
+        Args:
+            cpu_window_seconds: Averaging window for CPU usage; None keeps the
+                blocking one-second measurement on every collection
+            follow_logs: Keep log files open between collections and only read
+                appended bytes, instead of tailing each file from scratch; new
+                auth.log lines are also fed to an incremental AuthLogAnalyzer
+            log_lines: Number of recent lines reported per log file
+        """
         self.data = {}
+        self.cpu_sampler = CPUSampler(cpu_window_seconds) if cpu_window_seconds else None
+        self.follow_logs = follow_logs
+        self.log_lines = log_lines
+        self.log_followers = {}
+        self.auth_analyzer = AuthLogAnalyzer() if follow_logs else None
         
     def collect_processes(self):
         """Collect information about running processes"""
@@ -79,11 +185,16 @@ class DataCollector:
             }
             
             # CPU information
+            cpu_freq = psutil.cpu_freq()
+            if self.cpu_sampler is not None:
+                cpu_percent = self.cpu_sampler.cpu_percent()
+            else:
+                cpu_percent = psutil.cpu_percent(interval=1, percpu=True)
             self.data['cpu'] = {
                 'physical_cores': psutil.cpu_count(logical=False),
                 'total_cores': psutil.cpu_count(logical=True),
-                'cpu_freq': psutil.cpu_freq()._asdict() if psutil.cpu_freq() else {},
-                'cpu_percent': psutil.cpu_percent(interval=1, percpu=True)
+                'cpu_freq': cpu_freq._asdict() if cpu_freq else {},
+                'cpu_percent': cpu_percent
             }
             
             # Disk information
@@ -116,17 +227,32 @@ class DataCollector:
                 for log_file in log_files:
                     if os.path.exists(log_file):
                         try:
-                            with open(log_file, 'r') as f:
-                                logs[os.path.basename(log_file)] = f.readlines()[-100:]  # Last 100 lines
+                            logs[os.path.basename(log_file)] = self._read_log(log_file)
                         except Exception as e:
                             logger.warning(f"Could not read log file {log_file}: {str(e)}")
             
             self.data['logs'] = logs
+            if self.auth_analyzer is not None and 'auth.log' in logs:
+                self.data['auth_events'] = self.auth_analyzer.summary()
             return logs
         except Exception as e:
             logger.error(f"Error collecting logs: {str(e)}", exc_info=True)
             return {}
 
+    def _read_log(self, log_file):
+        """Return the last log_lines lines of a log file"""
+        if not self.follow_logs:
+            return tail_lines(log_file, self.log_lines)
+        
+        follower = self.log_followers.get(log_file)
+        if follower is None:
+            follower = self.log_followers[log_file] = LogFollower(log_file, self.log_lines)
+        analyze = self.auth_analyzer is not None and os.path.basename(log_file) == 'auth.log'
+        for batch in follower.batches():
+            if analyze:
+                self.auth_analyzer.feed(batch)
+        return follower.lines()
+
     def collect_all(self):
         """Collect all available system data"""
         try:
@@ -0,0 +1,197 @@
+"""
+Bounded-memory readers for the end of large, growing log files
+"""
+
+import os
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 64 * 1024
+
+
+def _tail_range(f, start, end, max_lines, block_size=BLOCK_SIZE):
+    """
+    Return the raw bytes of the last ``max_lines`` lines in f[start:end].
+
+    Blocks are read backwards from ``end`` until enough newlines have been
+    seen, so memory is bounded by the size of those lines rather than the
+    size of the file.
+    """
+    if max_lines <= 0 or end <= start:
+        return b''
+
+    blocks = []
+    newlines = 0
+    position = end
+    # A trailing newline terminates the last line rather than starting a new one
+    f.seek(end - 1)
+    wanted = max_lines + 1 if f.read(1) == b'\n' else max_lines
+
+    while position > start and newlines < wanted:
+        size = min(block_size, position - start)
+        position -= size
+        f.seek(position)
+        block = f.read(size)
+        blocks.append(block)
+        newlines += block.count(b'\n')
+
+    data = b''.join(reversed(blocks))
+    if newlines >= wanted:
+        # Drop everything up to the newline that precedes the wanted lines
+        cut = len(data)
+        for _ in range(wanted):
+            cut = data.rindex(b'\n', 0, cut)
+        data = data[cut + 1:]
+    return data
+
+
+def _decode_lines(data, encoding, errors):
+    """Split raw bytes into text lines, keeping line endings like readlines()"""
+    return data.decode(encoding, errors).splitlines(keepends=True)
+
+
+def tail_lines(path, max_lines=100, encoding='utf-8', errors='replace'):
+    """Return the last ``max_lines`` lines of a file without reading all of it"""
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        return _decode_lines(_tail_range(f, 0, end, max_lines), encoding, errors)
+
+
+class LogFollower:
+    """
+    Follows a log file across calls, reading only bytes appended since the last poll.
+
+    The follower remembers the inode and offset of the open file. When the
+    file is rotated (a new inode at the same path) the rest of the old file
+    is drained before switching; when it is truncated in place
+    (copytruncate) reading restarts from the beginning. New lines are read
+    forward in bounded blocks and all of them are returned, so consumers such
+    as the auth.log analyzer see every line; ``lines()`` keeps only the most
+    recent ``max_lines`` for display, the same view as a fresh tail without
+    re-reading the file each time.
+    """
+
+    def __init__(self, path, max_lines=100, encoding='utf-8', errors='replace'):
+        """
+        Initialize the follower
+
+        Args:
+            path: Log file to follow
+            max_lines: Number of recent lines kept for lines()
+            encoding: Text encoding of the log
+            errors: Decoding error handler
+        """
+        self.path = path
+        self.max_lines = max_lines
+        self.encoding = encoding
+        self.errors = errors
+
+        self._file = None
+        self._inode = None
+        self._offset = 0
+        self._recent = deque(maxlen=max_lines)
+
+    def _open(self, from_start):
+        """Open the current file at the path, starting at its beginning or end"""
+        f = open(self.path, 'rb')
+        st = os.fstat(f.fileno())
+        self._file = f
+        self._inode = (st.st_dev, st.st_ino)
+        if from_start:
+            self._offset = 0
+        else:
+            # First open: seed the window with the existing tail, then follow
+            self._recent.extend(_decode_lines(
+                _tail_range(f, 0, st.st_size, self.max_lines), self.encoding, self.errors))
+            self._offset = self._complete_lines_end(f, st.st_size)
+
+    def _complete_lines_end(self, f, end):
+        """Offset just past the last newline before ``end``, so partial lines are re-read"""
+        position = end
+        while position > self._offset:
+            size = min(BLOCK_SIZE, position - self._offset)
+            f.seek(position - size)
+            block = f.read(size)
+            index = block.rfind(b'\n')
+            if index >= 0:
+                return position - size + index + 1
+            position -= size
+        return self._offset
+
+    def _iter_appended(self):
+        """Yield batches of whole lines appended to the open file since the last poll"""
+        f = self._file
+        end = os.fstat(f.fileno()).st_size
+        if end < self._offset:
+            logger.info(f"{self.path} was truncated, reading from the start")
+            self._offset = 0
+        complete = self._complete_lines_end(f, end)
+        position = self._offset
+        pending = b''
+        while position < complete:
+            f.seek(position)
+            block = f.read(min(BLOCK_SIZE, complete - position))
+            if not block:
+                break
+            position += len(block)
+            data = pending + block
+            cut = data.rfind(b'\n') + 1
+            pending = data[cut:]
+            if not cut:
+                # A single line longer than a block; keep reading until it ends
+                continue
+            self._offset = position - len(pending)
+            batch = _decode_lines(data[:cut], self.encoding, self.errors)
+            self._recent.extend(batch)
+            yield batch
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._inode = None
+
+    def batches(self):
+        """
+        Yield the lines appended since the previous poll, one block-sized batch at a time
+
+        Every complete line is yielded exactly once, however much was
+        appended; memory is bounded by BLOCK_SIZE (or the longest line), not
+        by the backlog. On the first call the existing tail is yielded instead.
+        """
+        try:
+            if self._file is None:
+                self._open(from_start=False)
+                if self._recent:
+                    yield list(self._recent)
+                return
+
+            try:
+                st = os.stat(self.path)
+                rotated = (st.st_dev, st.st_ino) != self._inode
+            except FileNotFoundError:
+                rotated = False
+
+            yield from self._iter_appended()
+            if rotated:
+                # Old file is drained; continue with the new one from its start
+                logger.info(f"{self.path} was rotated, following the new file")
+                self._close()
+                self._open(from_start=True)
+                yield from self._iter_appended()
+        except FileNotFoundError:
+            self._close()
+
+    def poll(self):
+        """Return all lines appended since the previous poll"""
+        return [line for batch in self.batches() for line in batch]
+
+    def lines(self):
+        """Return the most recent ``max_lines`` lines seen so far"""
+        return list(self._recent)
+
+    def close(self):
+        """Close the followed file"""
+        self._close()
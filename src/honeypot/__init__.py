@@ -2,6 +2,13 @@
 Honeypot package for SQL injection detection and monitoring
 """
 
-from .web_honeypot import SQLInjectionHoneypot
-
 __all__ = ['SQLInjectionHoneypot']
+
+
+def __getattr__(name):
+    # Imported on first use so tools that only need the detection and
+    # scoring modules do not load Flask or configure the honeypot's logging
+    if name == 'SQLInjectionHoneypot':
+        from .web_honeypot import SQLInjectionHoneypot
+        return SQLInjectionHoneypot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,587 @@
+"""
+Write-behind pipeline for attack_logs inserts
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from ..maintenance.severity_rollup import update_rollup
+from ..ml_models.feature_store import INSERT_ML_FEATURES
+
+logger = logging.getLogger(__name__)
+
+ATTACK_LOG_COLUMNS = [
+    'timestamp', 'source_ip', 'request_method', 'request_path', 'request_data',
+    'type', 'attack_type', 'attack_details', 'risk_score', 'user_agent',
+    'headers', 'response_code', 'is_malicious', 'payload_fingerprint'
+]
+
+INSERT_ATTACK_LOG = text(f"""
+    INSERT INTO attack_logs
+    ({', '.join(ATTACK_LOG_COLUMNS)})
+    VALUES
+    ({', '.join(':' + column for column in ATTACK_LOG_COLUMNS)})
+""")
+
+# Occurrences of a payload fingerprint per source IP and repeat window
+UPSERT_FINGERPRINT_COUNT = text("""
+    INSERT INTO attack_fingerprint_counts
+    (source_ip, payload_fingerprint, window_start, first_seen, last_seen, hit_count)
+    VALUES
+    (:source_ip, :payload_fingerprint, :window_start, :first_seen, :last_seen, :hit_count)
+    ON DUPLICATE KEY UPDATE
+        hit_count = hit_count + VALUES(hit_count),
+        first_seen = LEAST(first_seen, VALUES(first_seen)),
+        last_seen = GREATEST(last_seen, VALUES(last_seen))
+""")
+
+_STOP = object()
+
+
+def insert_attack_logs(conn, params):
+    """
+    Insert rows with one multi-row INSERT and return the id of the first row
+
+    InnoDB gives the rows of a single INSERT statement consecutive ids (with
+    innodb_autoinc_lock_mode 0 or 1, the MariaDB default), so row i gets the
+    first id + i * auto_increment_increment; see autoinc_step. executemany
+    cannot promise that: the driver splits large batches into several
+    statements. SQLite only reports the last rowid, but its single writer
+    also hands out consecutive rowids, so the first is counted back from it.
+    """
+    values = []
+    flat = {}
+    for i, row in enumerate(params):
+        values.append('(' + ', '.join(f':{column}_{i}' for column in ATTACK_LOG_COLUMNS) + ')')
+        for column in ATTACK_LOG_COLUMNS:
+            flat[f'{column}_{i}'] = row[column]
+    conn.execute(text(f"""
+        INSERT INTO attack_logs
+        ({', '.join(ATTACK_LOG_COLUMNS)})
+        VALUES
+        {', '.join(values)}
+    """), flat)
+    if conn.dialect.name == 'sqlite':
+        return conn.execute(text("SELECT last_insert_rowid()")).scalar() - len(params) + 1
+    return conn.execute(text("SELECT LAST_INSERT_ID()")).scalar()
+
+
+def autoinc_step(conn):
+    """
+    Id step between the rows of one multi-row INSERT, or None if it is not fixed
+
+    With innodb_autoinc_lock_mode 2 (interleaved, the MySQL 8 default)
+    concurrent inserts can take ids from the middle of a statement's range.
+    SQLite hands out consecutive rowids; insert_attack_logs supports only it
+    and MySQL/MariaDB.
+    """
+    if conn.dialect.name not in ('mysql', 'mariadb'):
+        return 1
+    increment, lock_mode = conn.execute(
+        text("SELECT @@auto_increment_increment, @@innodb_autoinc_lock_mode")
+    ).one()
+    if int(lock_mode) == 2:
+        return None
+    return int(increment)
+
+
+def update_fingerprint_counts(conn, rows):
+    """
+    Add a batch of full and repeat rows to the fingerprint counters within the caller's transaction
+
+    Returns:
+        set: (source_ip, fingerprint, window_start) keys whose counter row had
+        no hits before this batch. The upsert keeps those rows locked until
+        the transaction ends, so a concurrent writer in another worker sees
+        the hits and treats its rows for the same key as repeats.
+    """
+    counts = {}
+    for row in rows:
+        if not row.get('payload_fingerprint') or not row.get('window_start'):
+            continue
+        key = (row['source_ip'], row['payload_fingerprint'], row['window_start'])
+        timestamp = str(row.get('timestamp') or row['window_start'])
+        entry = counts.get(key)
+        if entry is None:
+            counts[key] = {
+                'source_ip': key[0], 'payload_fingerprint': key[1], 'window_start': key[2],
+                'first_seen': timestamp, 'last_seen': timestamp, 'hit_count': 1
+            }
+        else:
+            entry['first_seen'] = min(entry['first_seen'], timestamp)
+            entry['last_seen'] = max(entry['last_seen'], timestamp)
+            entry['hit_count'] += 1
+    if not counts:
+        return set()
+    # A fixed key order keeps concurrent writers from deadlocking on each other
+    keys = sorted(counts)
+    conn.execute(UPSERT_FINGERPRINT_COUNT, [counts[key] for key in keys])
+
+    params = {}
+    tuples = []
+    for i, key in enumerate(keys):
+        params.update({f'ip_{i}': key[0], f'fp_{i}': key[1], f'ws_{i}': key[2]})
+        tuples.append(f"(:ip_{i}, :fp_{i}, :ws_{i})")
+    stored = conn.execute(text(f"""
+        SELECT source_ip, payload_fingerprint, window_start, hit_count
+        FROM attack_fingerprint_counts
+        WHERE (source_ip, payload_fingerprint, window_start) IN ({', '.join(tuples)})
+    """), params)
+    created = set()
+    for source_ip, fingerprint, window_start, hit_count in stored:
+        key = (source_ip, fingerprint, str(window_start)[:19])
+        if key in counts and hit_count == counts[key]['hit_count']:
+            created.add(key)
+    return created
+
+
+def stored_windows(conn, keys, window):
+    """
+    Which (source_ip, fingerprint, window_start) keys already have a full row in attack_logs
+
+    A counter row can exist without one: when the batch holding a window's
+    first full row fails and is spilled, repeat rows written meanwhile
+    create the counter, and the replayed full row must still be inserted.
+    """
+    if not keys:
+        return set()
+    bounds = {}
+    for source_ip, fingerprint, window_start in keys:
+        window_end = datetime.strptime(window_start, '%Y-%m-%d %H:%M:%S') + timedelta(seconds=window)
+        bounds.setdefault((source_ip, fingerprint), []).append(
+            (window_start, window_end.strftime('%Y-%m-%d %H:%M:%S'))
+        )
+    params = {}
+    clauses = []
+    for i, ((source_ip, fingerprint), windows) in enumerate(sorted(bounds.items())):
+        params.update({f'ip_{i}': source_ip, f'fp_{i}': fingerprint,
+                       f'ws_{i}': min(windows)[0], f'we_{i}': max(windows)[1]})
+        clauses.append(f"(payload_fingerprint = :fp_{i} AND source_ip = :ip_{i} "
+                       f"AND timestamp >= :ws_{i} AND timestamp < :we_{i})")
+    found = conn.execute(text(f"""
+        SELECT source_ip, payload_fingerprint, timestamp
+        FROM attack_logs
+        WHERE {' OR '.join(clauses)}
+    """), params)
+    stored = set()
+    for source_ip, fingerprint, timestamp in found:
+        timestamp = str(timestamp)[:19]
+        for window_start, window_end in bounds[(source_ip, fingerprint)]:
+            if window_start <= timestamp < window_end:
+                stored.add((source_ip, fingerprint, window_start))
+    return stored
+
+
+class AttackLogWriter:
+    """
+    Bounded queue with a background thread that batches attack_logs inserts.
+
+    Rows marked ``repeat`` (a payload fingerprint already stored for that IP
+    in the current window) are not inserted into attack_logs; they only
+    increment the matching attack_fingerprint_counts row. Whether a full row
+    is the first of its window is decided again in the insert transaction
+    from that counter row, so repeats are recognized across worker processes
+    and not just by the submitting worker's RepeatTracker.
+
+    With a ``featurizer``, every inserted row also gets an ml_features row
+    holding the ML feature vector of its request_data. Vectors are computed
+    here on the writer thread, never on the request path. Rows are linked to
+    their vectors by id arithmetic, so caching is switched off (with a
+    warning) on servers where a multi-row INSERT's ids are not predictable.
+
+    Request threads hand rows to ``submit`` and return immediately. The writer
+    flushes with a single multi-row insert (plus the matching severity rollup
+    update) once ``batch_size`` rows are
+    waiting or ``flush_interval`` seconds have passed. Rows that cannot be
+    queued or written are appended to a JSON-lines spill file, which is
+    replayed into the database on startup and after each successful flush.
+    A spilled row that still fails after ``max_replay_attempts`` replays (while
+    the database is reachable) is moved to a dead-letter file so it cannot
+    hold up the rows behind it.
+    """
+
+    def __init__(self, db, max_queue_size=10000, batch_size=200, flush_interval=0.5,
+                 put_timeout=0.05, spill_path='attack_logs_spill.jsonl', featurizer=None,
+                 max_replay_attempts=5, dead_letter_path=None, repeat_window=300):
+        """
+        Initialize the writer
+
+        Args:
+            db: SQLAlchemy engine for the honeypot database
+            max_queue_size: Rows held in memory before backpressure applies
+            batch_size: Rows per multi-row insert
+            flush_interval: Seconds before a partial batch is flushed
+            put_timeout: Seconds a request thread waits on a full queue before spilling
+            spill_path: JSON-lines file for rows that could not be written
+            featurizer: Optional callable mapping a list of request_data strings to
+                (vector bytes, vectorizer id) pairs, or to an empty list when
+                vectors are unavailable. The prediction score stored with a
+                vector is the row's ``ml_score``, taken on the request path.
+            max_replay_attempts: Failed replays before a spilled row is dead-lettered
+            dead_letter_path: JSON-lines file for those rows (default: spill_path + '.dead')
+            repeat_window: Seconds per fingerprint window, as used by RepeatTracker
+        """
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.spill_path = spill_path
+        self.max_queue_size = max_queue_size
+        self.featurizer = featurizer
+        self.max_replay_attempts = max_replay_attempts
+        self.dead_letter_path = dead_letter_path or f"{spill_path}.dead"
+        self.repeat_window = repeat_window
+        self._id_step = None
+
+        self.written = 0
+        self.repeats = 0
+        self.feature_vectors = 0
+        self.batches = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.dead_lettered = 0
+        self.backpressure_waits = 0
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self._closed = False
+
+    def _ensure_worker(self):
+        """Start the writer thread, restarting it in forked child processes"""
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue_size)
+            self._worker = threading.Thread(target=self._run, daemon=True, name='attack-log-writer')
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def submit(self, row):
+        """Queue a row for insertion, spilling it to disk if the queue stays full"""
+        if self._closed:
+            self.spill([row])
+            return False
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.backpressure_waits += 1
+
+        try:
+            self._queue.put(row, timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            logger.warning("Attack log queue full, spilling row to disk")
+            self.spill([row])
+            return False
+
+    def _run(self):
+        """Drain the queue in batches until stopped"""
+        self._recover_stale_replays()
+        self._replay_spill()
+        while True:
+            batch = []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            if batch and self._write(batch) and not stop:
+                self._replay_spill()
+
+            if stop:
+                # Drain anything queued behind the stop marker
+                remaining_rows = []
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP:
+                        remaining_rows.append(item)
+                for start in range(0, len(remaining_rows), self.batch_size):
+                    self._write(remaining_rows[start:start + self.batch_size])
+                return
+
+    def _features(self, params):
+        """Feature vectors for rows about to be inserted, None where there is none"""
+        if self.featurizer is None:
+            return None
+        present = [i for i, row in enumerate(params) if row['request_data']]
+        if not present:
+            return None
+        try:
+            vectors = self.featurizer([params[i]['request_data'] for i in present])
+        except Exception as e:
+            # The attack itself is still logged without its vector
+            logger.error(f"Error computing feature vectors: {str(e)}", exc_info=True)
+            return None
+        if not vectors:
+            return None
+        features = [None] * len(params)
+        for i, vector in zip(present, vectors):
+            features[i] = vector
+        return features
+
+    @staticmethod
+    def _first_of_window(rows, created, stored):
+        """Which full rows are the first of their fingerprint window; the rest count as repeats"""
+        keep = []
+        seen = set()
+        for row in rows:
+            if not row.get('payload_fingerprint') or not row.get('window_start'):
+                keep.append(True)
+                continue
+            key = (row['source_ip'], row['payload_fingerprint'], row['window_start'])
+            keep.append((key in created or key not in stored) and key not in seen)
+            seen.add(key)
+        return keep
+
+    def _insert(self, rows):
+        """Insert rows and update the fingerprint counters and severity rollup in one transaction"""
+        candidates = [row for row in rows if not row.get('repeat')]
+        params = [{column: row.get(column) for column in ATTACK_LOG_COLUMNS} for row in candidates]
+        features = self._features(params)
+        feature_rows = []
+        with self.db.begin() as conn:
+            # Another worker may already have stored this window's payload
+            created = update_fingerprint_counts(conn, rows)
+            uncertain = {
+                (row['source_ip'], row['payload_fingerprint'], row['window_start'])
+                for row in candidates if row.get('payload_fingerprint') and row.get('window_start')
+            } - created
+            stored = stored_windows(conn, uncertain, self.repeat_window)
+            keep = self._first_of_window(candidates, created, stored)
+            kept = [row for row, first in zip(candidates, keep) if first]
+            params = [row for row, first in zip(params, keep) if first]
+            if features:
+                features = [feature for feature, first in zip(features, keep) if first]
+            if features and self._id_step is None:
+                self._check_id_step(conn)
+            if features and self.featurizer is not None:
+                first_id = insert_attack_logs(conn, params)
+                feature_rows = [
+                    {
+                        'attack_log_id': first_id + i * self._id_step,
+                        'feature_vector': feature[0],
+                        'vectorizer_id': feature[1],
+                        'prediction_score': row.get('ml_score')
+                    }
+                    for i, (row, feature) in enumerate(zip(kept, features)) if feature
+                ]
+                if feature_rows:
+                    conn.execute(INSERT_ML_FEATURES, feature_rows)
+            elif params:
+                conn.execute(INSERT_ATTACK_LOG, params)
+            update_rollup(conn, rows)
+        self.feature_vectors += len(feature_rows)
+        return len(rows) - len(params)
+
+    def _check_id_step(self, conn):
+        """Learn the id step of multi-row inserts once, disabling feature caching if it is not fixed"""
+        step = autoinc_step(conn)
+        if step is None:
+            logger.warning("innodb_autoinc_lock_mode is 2, so attack_logs ids cannot be matched "
+                           "to feature vectors; ML feature caching is disabled")
+            self.featurizer = None
+        self._id_step = step or 1
+
+    def _write(self, rows):
+        """Insert rows in one transaction, spilling them on failure"""
+        try:
+            self.repeats += self._insert(rows)
+            self.written += len(rows)
+            self.batches += 1
+            return True
+        except Exception as e:
+            logger.error(f"Error writing attack log batch: {str(e)}", exc_info=True)
+            self.spill(rows)
+            return False
+
+    def spill(self, rows):
+        """Durably append rows to the spill file"""
+        if self._append_spill(rows):
+            self.spilled += len(rows)
+
+    def _append_spill(self, rows, path=None):
+        """Append rows to the spill file (or ``path``) and fsync, counting them as dropped on failure"""
+        try:
+            with self._spill_lock:
+                with open(path or self.spill_path, 'a') as f:
+                    for row in rows:
+                        f.write(json.dumps(row, default=str) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+            return True
+        except Exception as e:
+            self.dropped += len(rows)
+            logger.error(f"Failed to write to spill file: {str(e)}", exc_info=True)
+            return False
+
+    def _recover_stale_replays(self):
+        """Return replay files left behind by dead processes to the spill file"""
+        directory = os.path.dirname(os.path.abspath(self.spill_path))
+        prefix = os.path.basename(self.spill_path) + '.'
+        for name in os.listdir(directory):
+            if not (name.startswith(prefix) and name.endswith('.replay')):
+                continue
+            try:
+                pid = int(name[len(prefix):-len('.replay')])
+                os.kill(pid, 0)
+                continue  # Owner is still replaying it
+            except ProcessLookupError:
+                pass
+            except (ValueError, PermissionError):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                with open(path, 'r') as f:
+                    rows = [json.loads(line) for line in f if line.strip()]
+                if self._append_spill(rows):
+                    os.unlink(path)
+            except Exception as e:
+                logger.error(f"Could not recover replay file {path}: {str(e)}", exc_info=True)
+
+    def _replay_spill(self):
+        """Insert rows from the spill file back into the database"""
+        if not os.path.exists(self.spill_path):
+            return
+
+        # Claim the file so new spills (from this or another worker) go to a fresh one
+        replay_path = f"{self.spill_path}.{os.getpid()}.replay"
+        try:
+            with self._spill_lock:
+                os.replace(self.spill_path, replay_path)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Could not claim spill file: {str(e)}", exc_info=True)
+            return
+
+        rows = []
+        with open(replay_path, 'r') as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping unreadable spill line: {line.strip()[:200]}")
+
+        replayed = 0
+        retry = []
+        dead = []
+        for start in range(0, len(rows), self.batch_size):
+            chunk = rows[start:start + self.batch_size]
+            try:
+                self.repeats += self._insert(chunk)
+                replayed += len(chunk)
+                continue
+            except OperationalError as e:
+                # Database unreachable: keep the rest as it is for the next replay
+                logger.error(f"Error replaying spilled attack logs: {str(e)}", exc_info=True)
+                retry.extend(rows[start:])
+                break
+            except Exception as e:
+                logger.error(f"Error replaying spilled attack logs, retrying rows singly: {str(e)}",
+                             exc_info=True)
+
+            # Find the rows that fail on their own and count their attempts
+            unreachable = False
+            for i, row in enumerate(chunk):
+                try:
+                    self.repeats += self._insert([row])
+                    replayed += 1
+                    continue
+                except OperationalError as e:
+                    logger.error(f"Error replaying spilled attack logs: {str(e)}", exc_info=True)
+                    retry.extend(chunk[i:])
+                    unreachable = True
+                    break
+                except Exception as e:
+                    error = str(e).splitlines()[0] if str(e) else type(e).__name__
+                attempts = row.get('replay_attempts', 0) + 1
+                row = dict(row, replay_attempts=attempts, replay_error=error[:200])
+                if attempts >= self.max_replay_attempts:
+                    dead.append(row)
+                else:
+                    retry.append(row)
+            if unreachable:
+                retry.extend(rows[start + len(chunk):])
+                break
+
+        if retry:
+            self._append_spill(retry)
+        if dead and self._append_spill(dead, self.dead_letter_path):
+            self.dead_lettered += len(dead)
+            logger.warning(f"Moved {len(dead)} spilled attack log rows that keep failing to "
+                           f"{self.dead_letter_path}")
+
+        self.replayed += replayed
+        self.written += replayed
+        os.unlink(replay_path)
+        if replayed:
+            logger.info(f"Replayed {replayed} spilled attack log rows")
+
+    def close(self, timeout=10.0):
+        """Flush queued rows and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._worker is None or self._worker_pid != os.getpid() or not self._worker.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.error("Attack log queue full at shutdown")
+        self._worker.join(timeout)
+
+        # Anything the worker could not reach in time is kept on disk
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        if leftover:
+            self.spill(leftover)
+
+    def stats(self):
+        """Return pipeline counters"""
+        return {
+            'queued': self._queue.qsize(),
+            'max_queue_size': self.max_queue_size,
+            'written': self.written,
+            'repeats': self.repeats,
+            'feature_vectors': self.feature_vectors,
+            'batches': self.batches,
+            'spilled': self.spilled,
+            'replayed': self.replayed,
+            'dropped': self.dropped,
+            'dead_lettered': self.dead_lettered,
+            'backpressure_waits': self.backpressure_waits
+        }
@@ -0,0 +1,410 @@
+"""
+In-memory per-IP attacker state with TTL eviction and binary snapshots
+"""
+
+import os
+import time
+import heapq
+import struct
+import atexit
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+SORT_FIELDS = ('requests', 'attacks', 'last_seen', 'first_seen', 'max_risk', 'ewma_risk', 'distinct_payloads')
+
+# Snapshot layout: header, then per attacker a fixed record followed by the
+# IP bytes and the payload hashes
+_SNAPSHOT_MAGIC = b'HPAT'
+_SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct('<4sII')
+_RECORD = struct.Struct('<BHddIIffQ')
+
+
+def short_hash(value):
+    """64-bit hash of a string, used for payloads and user agents"""
+    return int.from_bytes(
+        hashlib.blake2b(value.encode('utf-8', 'replace'), digest_size=8).digest(), 'little'
+    )
+
+
+class Attacker:
+    """State kept for one source IP"""
+
+    __slots__ = ('ip', 'first_seen', 'last_seen', 'requests', 'attacks',
+                 'max_risk', 'ewma_risk', 'user_agent_hash', 'payloads')
+
+    def __init__(self, ip, now):
+        self.ip = ip
+        self.first_seen = now
+        self.last_seen = now
+        self.requests = 0
+        self.attacks = 0
+        self.max_risk = 0.0
+        self.ewma_risk = 0.0
+        self.user_agent_hash = 0
+        self.payloads = set()
+
+    @property
+    def distinct_payloads(self):
+        return len(self.payloads)
+
+    def to_dict(self):
+        return {
+            'source_ip': self.ip,
+            'first_seen': self.first_seen,
+            'last_seen': self.last_seen,
+            'requests': self.requests,
+            'attacks': self.attacks,
+            'max_risk': round(self.max_risk, 4),
+            'ewma_risk': round(self.ewma_risk, 4),
+            'distinct_payloads': self.distinct_payloads,
+            'user_agent_hash': f"{self.user_agent_hash:016x}"
+        }
+
+
+def _write_snapshot(path, attackers):
+    """Atomically write attackers to a binary snapshot"""
+    chunks = [_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, len(attackers))]
+    for attacker in attackers:
+        ip = attacker.ip.encode('ascii', 'replace')[:255]
+        payloads = array('Q', attacker.payloads)
+        chunks.append(_RECORD.pack(
+            len(ip), len(payloads), attacker.first_seen, attacker.last_seen,
+            attacker.requests, attacker.attacks, attacker.max_risk, attacker.ewma_risk,
+            attacker.user_agent_hash
+        ))
+        chunks.append(ip)
+        chunks.append(payloads.tobytes())
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(b''.join(chunks))
+    os.replace(tmp_path, path)
+
+
+def _read_snapshot(path):
+    """Attackers stored in a snapshot, in the order saved; empty if the file is missing"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+
+    magic, version, count = _HEADER.unpack_from(data, 0)
+    if magic != _SNAPSHOT_MAGIC or version != _SNAPSHOT_VERSION:
+        raise ValueError(f"Not an attacker snapshot: {path}")
+
+    offset = _HEADER.size
+    attackers = []
+    for _ in range(count):
+        (ip_len, payload_count, first_seen, last_seen, requests, attacks,
+         max_risk, ewma_risk, user_agent_hash) = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        ip = data[offset:offset + ip_len].decode('ascii')
+        offset += ip_len
+        payloads = array('Q')
+        payloads.frombytes(data[offset:offset + 8 * payload_count])
+        offset += 8 * payload_count
+
+        attacker = Attacker(ip, first_seen)
+        attacker.last_seen = last_seen
+        attacker.requests = requests
+        attacker.attacks = attacks
+        attacker.max_risk = max_risk
+        attacker.ewma_risk = ewma_risk
+        attacker.user_agent_hash = user_agent_hash
+        attacker.payloads = set(payloads)
+        attackers.append(attacker)
+    return attackers
+
+
+def _merge(merged, base, attacker, max_payloads):
+    """
+    Fold one worker's entry into ``merged``
+
+    ``base`` maps IPs to the (last_seen, requests, attacks) every worker
+    started from; only what a worker counted beyond that is added. An entry
+    first seen after the base entry's last request was evicted and re-created
+    in the worker, so all of it is new.
+    """
+    last_seen, requests, attacks = base.get(attacker.ip, (None, 0, 0))
+    if last_seen is None or attacker.first_seen > last_seen:
+        requests = attacks = 0
+    current = merged.get(attacker.ip)
+    if current is None:
+        current = merged[attacker.ip] = Attacker(attacker.ip, attacker.first_seen)
+        current.last_seen = attacker.last_seen
+    current.requests += max(attacker.requests - requests, 0)
+    current.attacks += max(attacker.attacks - attacks, 0)
+    current.first_seen = min(current.first_seen, attacker.first_seen)
+    current.max_risk = max(current.max_risk, attacker.max_risk)
+    if attacker.last_seen >= current.last_seen:
+        current.last_seen = attacker.last_seen
+        current.ewma_risk = attacker.ewma_risk
+        current.user_agent_hash = attacker.user_agent_hash or current.user_agent_hash
+    for payload in attacker.payloads:
+        if len(current.payloads) >= max_payloads:
+            break
+        current.payloads.add(payload)
+
+
+def _top(attackers, limit, sort):
+    """Dicts of the ``limit`` attackers with the highest ``sort`` value"""
+    attackers = heapq.nlargest(
+        limit, attackers, key=lambda attacker: (getattr(attacker, sort), attacker.last_seen)
+    )
+    return [attacker.to_dict() for attacker in attackers]
+
+
+class AttackerTable:
+    """
+    Per-source-IP activity kept in memory so scanner campaigns can be
+    correlated without querying the database.
+
+    Entries are kept in least-recently-seen order: entries idle for longer
+    than ``ttl`` and, past ``max_entries``, the least recently seen ones are
+    evicted from the front. Distinct payloads are counted from 64-bit hashes,
+    up to ``max_payloads`` per IP. The table is per process; under gunicorn
+    each worker tracks the requests it handles and saves its own snapshot
+    file. merged_top combines the files of all workers for reading, and
+    load merges the files of exited workers on the next start.
+    """
+
+    def __init__(self, ttl=86400, max_entries=50000, max_payloads=256, alpha=0.2,
+                 snapshot_path=None, snapshot_interval=60):
+        """
+        Initialize the table
+
+        Args:
+            ttl: Seconds an IP is kept after its last request
+            max_entries: Most IPs kept; the least recently seen are evicted first
+            max_payloads: Most payload hashes kept per IP for the distinct count
+            alpha: Weight of the newest risk score in the moving average
+            snapshot_path: Optional base snapshot file; each process saves to
+                snapshot_path + '.<pid>' and load merges them
+            snapshot_interval: Seconds between snapshots
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_payloads = max_payloads
+        self.alpha = alpha
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.evicted = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+        self._stop = threading.Event()
+
+    def record(self, ip, risk_score, payload=None, user_agent=None, is_attack=False, now=None):
+        """Update the state of ``ip`` with one scored request"""
+        if not ip:
+            return
+        now = time.time() if now is None else now
+        payload_hash = short_hash(payload) if payload else None
+        user_agent_hash = short_hash(user_agent) if user_agent else 0
+
+        with self._lock:
+            attacker = self._entries.get(ip)
+            if attacker is None:
+                attacker = self._entries[ip] = Attacker(ip, now)
+            else:
+                self._entries.move_to_end(ip)
+            attacker.last_seen = now
+            attacker.requests += 1
+            if is_attack:
+                attacker.attacks += 1
+            attacker.max_risk = max(attacker.max_risk, risk_score)
+            if attacker.requests == 1:
+                attacker.ewma_risk = risk_score
+            else:
+                attacker.ewma_risk += self.alpha * (risk_score - attacker.ewma_risk)
+            if user_agent_hash:
+                attacker.user_agent_hash = user_agent_hash
+            if payload_hash is not None and len(attacker.payloads) < self.max_payloads:
+                attacker.payloads.add(payload_hash)
+            self._evict(now)
+
+    def _evict(self, now):
+        """Drop expired entries and enforce max_entries (lock held)"""
+        cutoff = now - self.ttl
+        entries = self._entries
+        while entries:
+            ip, attacker = next(iter(entries.items()))
+            if attacker.last_seen >= cutoff and len(entries) <= self.max_entries:
+                break
+            del entries[ip]
+            self.evicted += 1
+
+    def get(self, ip):
+        """Return the state of one IP as a dict, or None"""
+        with self._lock:
+            attacker = self._entries.get(ip)
+            return attacker.to_dict() if attacker is not None else None
+
+    def top(self, limit=50, sort='requests'):
+        """Return up to ``limit`` attackers, most active first by ``sort``"""
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort}")
+        with self._lock:
+            self._evict(time.time())
+            return _top(self._entries.values(), limit, sort)
+
+    def merged_top(self, limit=50, sort='requests'):
+        """
+        Like top, across all workers; also returns the number of IPs tracked
+
+        This process's entries are combined with the latest snapshot of
+        every other worker, so their requests show up to snapshot_interval
+        seconds late. Without a snapshot path this is the local table.
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort}")
+        if not self.snapshot_path:
+            with self._lock:
+                self._evict(time.time())
+                return _top(self._entries.values(), limit, sort), len(self._entries)
+
+        merged = {attacker.ip: attacker for attacker in _read_snapshot(self.snapshot_path)}
+        base = {ip: (attacker.last_seen, attacker.requests, attacker.attacks)
+                for ip, attacker in merged.items()}
+        for pid, path in self._worker_snapshots():
+            if pid == os.getpid():
+                continue
+            try:
+                attackers = _read_snapshot(path)
+            except Exception as e:
+                # Removed by a restarting worker, or being replaced
+                logger.debug(f"Skipping attacker snapshot {path}: {str(e)}")
+                continue
+            for attacker in attackers:
+                _merge(merged, base, attacker, self.max_payloads)
+        with self._lock:
+            self._evict(time.time())
+            for attacker in self._entries.values():
+                _merge(merged, base, attacker, self.max_payloads)
+
+        cutoff = time.time() - self.ttl
+        attackers = [attacker for attacker in merged.values() if attacker.last_seen >= cutoff]
+        return _top(attackers, limit, sort), len(attackers)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return table counters"""
+        with self._lock:
+            return {'entries': len(self._entries), 'evicted': self.evicted}
+
+    def worker_snapshot_path(self, pid=None):
+        """The snapshot file this process (or ``pid``) writes"""
+        return f"{self.snapshot_path}.{pid or os.getpid()}"
+
+    def save(self, path=None):
+        """Atomically write the table to a binary snapshot (by default this process's own file)"""
+        path = path or self.worker_snapshot_path()
+        with self._lock:
+            attackers = list(self._entries.values())
+        _write_snapshot(path, attackers)
+        return len(attackers)
+
+    def _worker_snapshots(self):
+        """(pid, path) of every worker snapshot file next to the base snapshot"""
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        prefix = os.path.basename(self.snapshot_path) + '.'
+        snapshots = []
+        for name in os.listdir(directory):
+            suffix = name[len(prefix):]
+            if name.startswith(prefix) and suffix.isdigit():
+                snapshots.append((int(suffix), os.path.join(directory, name)))
+        return sorted(snapshots)
+
+    def _stale_worker_snapshots(self):
+        """Snapshot files written by processes that are no longer running"""
+        paths = []
+        for pid, path in self._worker_snapshots():
+            if pid != os.getpid():
+                try:
+                    os.kill(pid, 0)
+                    continue  # Another running instance still owns it
+                except ProcessLookupError:
+                    pass
+                except PermissionError:
+                    continue
+            paths.append(path)
+        return sorted(paths)
+
+    def load(self, path=None):
+        """
+        Restore entries from the snapshots, skipping expired ones; returns the count loaded
+
+        Each process saves its own file, so the base snapshot is merged with
+        the files of every process that has exited: counters add up what
+        each process saw on top of the base, the rest combines. The merged
+        table is then written back as the new base and the worker files are
+        removed, so forked workers all start from the same base.
+        """
+        path = path or self.snapshot_path
+        merged = {attacker.ip: attacker for attacker in _read_snapshot(path)}
+        base = {ip: (attacker.last_seen, attacker.requests, attacker.attacks)
+                for ip, attacker in merged.items()}
+        worker_paths = self._stale_worker_snapshots() if path == self.snapshot_path else []
+        for worker_path in worker_paths:
+            try:
+                attackers = _read_snapshot(worker_path)
+            except Exception as e:
+                logger.error(f"Skipping unreadable attacker snapshot {worker_path}: {str(e)}")
+                continue
+            for attacker in attackers:
+                _merge(merged, base, attacker, self.max_payloads)
+
+        cutoff = time.time() - self.ttl
+        loaded = sorted((attacker for attacker in merged.values() if attacker.last_seen >= cutoff),
+                        key=lambda attacker: attacker.last_seen)
+        with self._lock:
+            for attacker in loaded:
+                if attacker.ip not in self._entries:
+                    self._entries[attacker.ip] = attacker
+            self._evict(time.time())
+
+        if worker_paths:
+            _write_snapshot(path, loaded)
+            for worker_path in worker_paths:
+                os.unlink(worker_path)
+        return len(loaded)
+
+    def _run(self):
+        """Snapshot loop"""
+        while not self._stop.wait(self.snapshot_interval):
+            try:
+                self.save()
+            except Exception as e:
+                logger.error(f"Error saving attacker snapshot: {str(e)}", exc_info=True)
+
+    def start(self):
+        """Start saving snapshots periodically, restarting in forked child processes"""
+        if not self.snapshot_path:
+            return
+        if self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='attacker-snapshot')
+        self._thread_pid = os.getpid()
+        self._thread.start()
+        atexit.register(self.close)
+
+    def close(self):
+        """Stop the snapshot thread and write a final snapshot"""
+        self._stop.set()
+        if self.snapshot_path and self._thread_pid == os.getpid():
+            try:
+                self.save()
+            except Exception as e:
+                logger.error(f"Error saving attacker snapshot: {str(e)}", exc_info=True)
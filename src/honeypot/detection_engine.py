@@ -0,0 +1,111 @@
+"""
+Precompiled pattern-based detection engine for SQL injection payloads
+"""
+
+import re
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# A weighted rule: the regex that decides a match, its severity weight and
+# the literal tokens that must all appear (for at least one alternative)
+# before the regex is worth running.
+DetectionRule = namedtuple('DetectionRule', ['pattern', 'weight', 'requires'])
+
+# Characters that re.IGNORECASE treats as equal to an ASCII letter but that
+# str.upper() leaves alone; folding them keeps the prefilter a strict superset
+# of what the rule regexes can match.
+_IGNORECASE_FOLD = {ord('\u0130'): 'I', ord('\u212a'): 'K'}
+
+# Pattern weights based on severity levels
+DEFAULT_RULES = [
+    # CRITICAL (0.7-1.0) - Schema enumeration, destructive operations
+    DetectionRule(r'(\bINFORMATION_SCHEMA\b)', 0.7,  # Information schema access
+                  [('INFORMATION_SCHEMA',)]),
+    DetectionRule(r'(\bDROP\b.*\bTABLE\b|\bDELETE\b.*\bFROM\b)', 0.7,  # Destructive operations
+                  [('DROP', 'TABLE'), ('DELETE', 'FROM')]),
+
+    # HIGH (0.5-0.7) - Data extraction attempts
+    DetectionRule(r'(\bUNION\b.*\bSELECT\b)', 0.5,  # UNION-based injection
+                  [('UNION', 'SELECT')]),
+    DetectionRule(r'(\bINSERT\b.*\bINTO\b|\bUPDATE\b.*\bSET\b)', 0.5,  # Data modification
+                  [('INSERT', 'INTO'), ('UPDATE', 'SET')]),
+
+    # MEDIUM (0.3-0.5) - Authentication bypass attempts
+    DetectionRule(r'(\bOR\b.*\b1\b.*=.*\b1\b|\bAND\b.*\b1\b.*=.*\b1\b)', 0.4,  # Boolean-based
+                  [('OR', '1', '='), ('AND', '1', '=')]),
+    DetectionRule(r'(\bADMIN\b.*\bOR\b)', 0.4,  # Admin bypass attempts
+                  [('ADMIN', 'OR')]),
+
+    # LOW (0.0-0.3) - Basic patterns
+    DetectionRule(r'(-{2}|\/\*|\*\/|#)', 0.2,  # Comment injection
+                  [('--',), ('/*',), ('*/',), ('#',)]),
+    DetectionRule(r'(\bLIKE\b.*%)', 0.2,  # Basic LIKE injection
+                  [('LIKE', '%')]),
+]
+
+
+class DetectionEngine:
+    """
+    Weighted rule set compiled once and gated by a literal-token prefilter.
+
+    The input is upper-cased once and checked for the literal tokens the
+    rules depend on. Only rules whose required tokens are all present are
+    confirmed with their own precompiled regex, so benign input never reaches
+    the backtracking ``.*`` patterns. Scores and matched patterns are
+    identical to running every rule with ``re.search``.
+    """
+
+    def __init__(self, rules=None):
+        """Compile the rule set and collect the prefilter tokens"""
+        self.rules = list(rules if rules is not None else DEFAULT_RULES)
+        self._compiled = [re.compile(rule.pattern, re.IGNORECASE) for rule in self.rules]
+
+        tokens = []
+        for rule in self.rules:
+            for alternative in rule.requires:
+                for token in alternative:
+                    if token.upper() not in tokens:
+                        tokens.append(token.upper())
+        self._tokens = tokens
+        self._requirements = [
+            [frozenset(token.upper() for token in alternative) for alternative in rule.requires]
+            for rule in self.rules
+        ]
+
+    def scan(self, text):
+        """
+        Evaluate all rules against text
+
+        Returns:
+            tuple: (pattern risk score, list of matched rule patterns)
+        """
+        folded = text.upper()
+        if not folded.isascii():
+            folded = folded.translate(_IGNORECASE_FOLD)
+        seen = {token for token in self._tokens if token in folded}
+
+        matched_patterns = []
+        risk_score = 0.0
+        if not seen:
+            return risk_score, matched_patterns
+
+        for rule, regex, requirements in zip(self.rules, self._compiled, self._requirements):
+            if not any(required <= seen for required in requirements):
+                continue
+            if regex.search(text):
+                matched_patterns.append(rule.pattern)
+                risk_score = max(risk_score, rule.weight)
+
+        # Add complexity bonus for multiple patterns
+        if len(matched_patterns) > 1:
+            # Add 0.1 for each additional pattern, but don't exceed 1.0
+            risk_score = min(1.0, risk_score + (0.1 * (len(matched_patterns) - 1)))
+
+        return risk_score, matched_patterns
+
+
+# Compiled once at import so every honeypot instance (and every forked
+# worker) shares the same rule set.
+default_engine = DetectionEngine()
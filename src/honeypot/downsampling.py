@@ -0,0 +1,88 @@
+"""
+Time-series downsampling for the risk trend API
+"""
+
+import numpy as np
+
+METHODS = ('lttb', 'minmax')
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last points and, for every bucket in between, the
+    point forming the largest triangle with the previously kept point and the
+    average of the next bucket. Returns the indices of the kept points.
+    """
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        raise ValueError("LTTB needs a threshold of at least 3 points")
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket edges over the points between the fixed first and last ones
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Twice the triangle area; the constant factor does not change the argmax
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        kept[i + 1] = a
+    kept[-1] = n - 1
+    return kept
+
+
+def minmax(x, y, threshold):
+    """
+    Min/max bucketing
+
+    Splits the series into ``threshold // 2`` buckets of equal length and
+    keeps the lowest and highest point of each, in time order, so spikes are
+    never averaged away. Returns the indices of the kept points.
+    """
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    buckets = threshold // 2
+    if buckets < 1:
+        raise ValueError("Min/max bucketing needs a threshold of at least 2 points")
+
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    kept = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        segment = y[start:end]
+        low = start + int(np.argmin(segment))
+        high = start + int(np.argmax(segment))
+        kept.extend(sorted({low, high}))
+    return np.array(kept, dtype=np.int64)
+
+
+def downsample(x, y, threshold, method='lttb'):
+    """Return (x, y) reduced to at most ``threshold`` points with the given method"""
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) <= threshold:
+        return x, y
+    indices = lttb(x, y, threshold) if method == 'lttb' else minmax(x, y, threshold)
+    return x[indices], y[indices]
@@ -0,0 +1,137 @@
+"""
+Keyset-paginated, filtered and projected queries on attack_logs
+"""
+
+import json
+import base64
+from datetime import datetime
+from sqlalchemy import text
+
+EVENT_COLUMNS = (
+    'id', 'timestamp', 'source_ip', 'request_method', 'request_path', 'request_data',
+    'type', 'attack_type', 'attack_details', 'risk_score', 'user_agent', 'headers',
+    'response_code', 'is_malicious', 'payload_fingerprint'
+)
+
+# Columns returned by default: everything except the large text blobs
+LIST_COLUMNS = (
+    'id', 'timestamp', 'source_ip', 'request_method', 'request_path', 'type',
+    'attack_type', 'risk_score', 'response_code', 'payload_fingerprint'
+)
+
+# Same ranges as SQLInjectionHoneypot._calculate_severity, as [low, high)
+SEVERITY_RANGES = {
+    'critical': (0.7, None),
+    'high': (0.5, 0.7),
+    'medium': (0.3, 0.5),
+    'low': (None, 0.3),
+}
+
+
+def encode_cursor(timestamp, event_id):
+    """Opaque cursor for the position after the event (timestamp, id)"""
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+    raw = json.dumps([str(timestamp), int(event_id)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (timestamp, id) from a cursor, raising ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, event_id = json.loads(raw)
+        return datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S'), int(event_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def parse_columns(fields):
+    """Columns for a comma-separated ``fields`` argument ('all' for every column)"""
+    if not fields:
+        return list(LIST_COLUMNS)
+    if fields == 'all':
+        return list(EVENT_COLUMNS)
+    columns = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [column for column in columns if column not in EVENT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # The cursor needs both keys even if the caller did not ask for them
+    for key in ('timestamp', 'id'):
+        if key not in columns:
+            columns.insert(0, key)
+    return columns
+
+
+def build_events_query(columns, limit, cursor=None, severities=None, source_ip=None,
+                       path=None, start=None, end=None, table='attack_logs'):
+    """
+    Build one page of events, newest first
+
+    The page is ordered by (timestamp, id) descending and continues strictly
+    after ``cursor``, so every page costs the same index range scan however
+    deep it is, unlike OFFSET which reads and discards every skipped row.
+    One extra row is fetched to tell whether another page follows.
+
+    Returns:
+        tuple: (TextClause, parameters)
+    """
+    conditions = []
+    params = {'limit': limit + 1}
+
+    if cursor is not None:
+        params['cursor_ts'], params['cursor_id'] = cursor
+        conditions.append("(timestamp < :cursor_ts OR (timestamp = :cursor_ts AND id < :cursor_id))")
+
+    if severities:
+        ranges = []
+        for i, severity in enumerate(severities):
+            low, high = SEVERITY_RANGES[severity]
+            bounds = []
+            if low is not None:
+                params[f'severity_low_{i}'] = low
+                bounds.append(f"risk_score >= :severity_low_{i}")
+            if high is not None:
+                params[f'severity_high_{i}'] = high
+                bounds.append(f"risk_score < :severity_high_{i}")
+            ranges.append(f"({' AND '.join(bounds)})")
+        conditions.append(f"({' OR '.join(ranges)})")
+
+    if source_ip:
+        params['source_ip'] = source_ip
+        conditions.append("source_ip = :source_ip")
+    if path:
+        params['path'] = path
+        conditions.append("request_path = :path")
+    if start is not None:
+        params['start'] = start
+        conditions.append("timestamp >= :start")
+    if end is not None:
+        params['end'] = end
+        conditions.append("timestamp < :end")
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = text(f"""
+        SELECT {', '.join(columns)}
+        FROM {table}
+        {where}
+        ORDER BY timestamp DESC, id DESC
+        LIMIT :limit
+    """)
+    return query, params
+
+
+def fetch_events_page(conn, columns, limit, **filters):
+    """
+    Run one page query
+
+    Returns:
+        tuple: (list of event dicts, cursor for the next page or None)
+    """
+    query, params = build_events_query(columns, limit, **filters)
+    rows = [dict(row) for row in conn.execute(query, params)]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['timestamp'], rows[-1]['id'])
+    return rows, next_cursor
@@ -0,0 +1,90 @@
+"""
+Payload normalization, fingerprints and per-IP repeat detection
+"""
+
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Injection payloads break out of quotes, so a quote does not reliably open a
+# literal: only quoted words without whitespace (sqlmap's random strings) are
+# literals, including one left open at the end of a field. Numbers come after
+# strings so digits inside them are already gone.
+_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_STRING = re.compile(r"""'[^'\s]*'|'[^'\s]+(?=\s|$)|"[^"\s]*"|"[^"\s]+(?=\s|$)""")
+_HEX = re.compile(r'\b0x[0-9a-f]+\b')
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_WHITESPACE = re.compile(r'\s+')
+_OPERATOR = re.compile(r'\s*([=<>!,()+*/|&]+)\s*')
+
+
+def normalize_payload(payload):
+    """
+    Reduce a payload to its shape: lowercase, inline comments and string,
+    hex and numeric literals replaced by placeholders, whitespace collapsed
+    and dropped around operators.
+
+    sqlmap-style variants such as ``AND 4821=4821`` and ``and 1337 = 1337``
+    normalize to the same text.
+    """
+    normalized = payload.lower()
+    normalized = _COMMENT.sub(' ', normalized)
+    normalized = _STRING.sub("'?'", normalized)
+    normalized = _HEX.sub('?', normalized)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _OPERATOR.sub(r'\1', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+def payload_fingerprint(payload):
+    """16-hex-digit fingerprint of a normalized payload"""
+    return hashlib.blake2b(normalize_payload(payload).encode('utf-8', 'replace'), digest_size=8).hexdigest()
+
+
+class RepeatTracker:
+    """
+    Recognizes repeats of a payload fingerprint from the same source IP.
+
+    Time is cut into fixed windows of ``window`` seconds aligned to the
+    epoch, so every process assigns an occurrence the same window start,
+    which keys the counter row it is added to. After the first occurrence of
+    an (IP, fingerprint) pair in a window, the rest are repeats. At most
+    ``max_entries`` pairs are remembered, least recently used first out.
+
+    Each process keeps its own tracker, so it only filters the repeats that
+    one worker sees; AttackLogWriter makes the final decision against
+    attack_fingerprint_counts, which all workers share.
+    """
+
+    def __init__(self, window=300, max_entries=100000):
+        """Initialize with the window length in seconds and the number of pairs remembered"""
+        self.window = window
+        self.max_entries = max_entries
+        self.repeats = 0
+
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def observe(self, source_ip, fingerprint, now=None):
+        """
+        Record one occurrence
+
+        Returns:
+            tuple: (is_repeat, window start as an epoch timestamp)
+        """
+        now = time.time() if now is None else now
+        window_start = now - now % self.window
+        key = (source_ip, fingerprint)
+        with self._lock:
+            if self._windows.get(key) == window_start:
+                self._windows.move_to_end(key)
+                self.repeats += 1
+                return True, window_start
+
+            self._windows[key] = window_start
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_entries:
+                self._windows.popitem(last=False)
+            return False, window_start
@@ -0,0 +1,141 @@
+"""
+TTL response cache with single-flight and ETag revalidation for Flask views
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from functools import wraps
+from collections import OrderedDict
+from flask import request, Response, make_response
+
+logger = logging.getLogger(__name__)
+
+
+class _CachedResponse:
+    """Immutable snapshot of a rendered response"""
+
+    __slots__ = ('body', 'status', 'mimetype', 'etag', 'expires_at')
+
+    def __init__(self, body, status, mimetype, etag, expires_at):
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    Caches successful view responses for a per-endpoint TTL.
+
+    Concurrent requests for the same key while a response is being computed
+    wait for that computation instead of starting their own (single-flight).
+    Every cached response carries an ETag, and requests whose
+    ``If-None-Match`` matches get an empty 304.
+    """
+
+    def __init__(self, max_entries=1024):
+        """Initialize an empty cache holding at most ``max_entries`` responses"""
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.not_modified = 0
+
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def cached(self, name, ttl):
+        """Decorator caching a view for ``ttl`` seconds, keyed by name and query string"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if ttl <= 0:
+                    return view(*args, **kwargs)
+                key = (name, request.full_path)
+                entry = self._get_or_compute(key, ttl, lambda: view(*args, **kwargs))
+                return self._respond(entry, ttl)
+            return wrapper
+        return decorator
+
+    def _get_or_compute(self, key, ttl, compute):
+        """Return a fresh entry for key, computing it at most once at a time"""
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+
+                inflight = self._inflight.get(key)
+                if inflight is None:
+                    inflight = self._inflight[key] = [threading.Event(), None]
+                    leader = True
+                    self.misses += 1
+                else:
+                    leader = False
+                    self.coalesced += 1
+
+            if not leader:
+                inflight[0].wait()
+                if inflight[1] is not None:
+                    return inflight[1]
+                # The leader failed; retry, possibly becoming the leader
+                continue
+
+            try:
+                entry = self._snapshot(compute(), ttl)
+                inflight[1] = entry
+                if entry.status == 200:
+                    with self._lock:
+                        self._entries[key] = entry
+                        self._entries.move_to_end(key)
+                        while len(self._entries) > self.max_entries:
+                            self._entries.popitem(last=False)
+                return entry
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                inflight[0].set()
+
+    def _snapshot(self, rv, ttl):
+        """Render a view return value into a shareable cache entry"""
+        response = make_response(rv)
+        response.direct_passthrough = False
+        body = response.get_data()
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        return _CachedResponse(body, response.status_code, response.mimetype, etag,
+                               time.monotonic() + ttl)
+
+    def _respond(self, entry, ttl):
+        """Build a response for this request, honouring If-None-Match"""
+        if entry.status == 200 and request.if_none_match.contains(entry.etag):
+            self.not_modified += 1
+            response = Response(status=304)
+        else:
+            response = Response(entry.body, status=entry.status, mimetype=entry.mimetype)
+        if entry.status == 200:
+            response.set_etag(entry.etag)
+            # Let browsers keep the body but revalidate on every poll
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return cache counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'not_modified': self.not_modified
+            }
@@ -0,0 +1,58 @@
+"""
+Risk scoring shared by the live request path and offline re-scoring
+"""
+
+import json
+
+# Higher weight to pattern matching as it's more reliable
+PATTERN_WEIGHT = 0.7
+ML_WEIGHT = 0.3
+
+# Lower threshold to catch more potential attacks
+ATTACK_THRESHOLD = 0.2
+
+
+def payload_text(input_data):
+    """The text that is scored for a request's form or query fields"""
+    if isinstance(input_data, (dict, list)):
+        return json.dumps(input_data)
+    return input_data
+
+
+def combine_scores(pattern_score, ml_score):
+    """Weighted pattern and ML scores, clamped to the 0-1 range"""
+    final_score = (PATTERN_WEIGHT * pattern_score) + (ML_WEIGHT * float(ml_score))
+    return min(1.0, max(0.0, final_score))
+
+
+def is_attack(risk_score):
+    """Whether a combined score counts as an attack"""
+    return risk_score > ATTACK_THRESHOLD
+
+
+def score_payloads(payloads, engine, classifier, vectors=None, raise_errors=False):
+    """
+    Combined risk scores for many payloads
+
+    Every payload gets its own pattern scan. ML scores come from the cached
+    ml_features ``vectors`` ((bytes, vectorizer id) or None per payload) where
+    they match the current vectorizer, and from one batched
+    ``predict_risk_batch`` call for the rest. Empty payloads score 0. With
+    ``raise_errors`` a model failure raises instead of scoring ML 0.
+    """
+    texts = [payload_text(payload) if payload else '' for payload in payloads]
+    present = [i for i, text in enumerate(texts) if text]
+    scores = [0.0] * len(texts)
+    if present:
+        ml_scores = [None] * len(present)
+        if vectors is not None:
+            ml_scores = classifier.predict_risk_vectors([vectors[i] for i in present])
+        uncached = [j for j, ml_score in enumerate(ml_scores) if ml_score is None]
+        if uncached:
+            batch = classifier.predict_risk_batch([texts[present[j]] for j in uncached],
+                                                  raise_errors=raise_errors)
+            for j, ml_score in zip(uncached, batch):
+                ml_scores[j] = ml_score
+        for i, ml_score in zip(present, ml_scores):
+            scores[i] = combine_scores(engine.scan(texts[i])[0], ml_score)
+    return scores
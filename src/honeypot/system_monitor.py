@@ -0,0 +1,190 @@
+"""
+Background system monitor that publishes immutable snapshots
+"""
+
+import os
+import copy
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from types import MappingProxyType
+
+from ..vulnerability_assessment.vulnerability_assessment import VulnerabilityAssessment
+
+logger = logging.getLogger(__name__)
+
+
+class SystemSnapshot:
+    """Collected system data and its assessment report at one point in time"""
+
+    __slots__ = ('system_data', 'report', 'collected_at', '_monotonic')
+
+    def __init__(self, system_data, report, collected_at=None):
+        # Read-only views so request handlers can never modify a published snapshot
+        self.system_data = MappingProxyType(system_data)
+        self.report = MappingProxyType(report)
+        self.collected_at = collected_at or datetime.now()
+        self._monotonic = time.monotonic() - (datetime.now() - self.collected_at).total_seconds()
+
+    @property
+    def age(self):
+        """Seconds since the snapshot was collected"""
+        return time.monotonic() - self._monotonic
+
+    def staleness(self):
+        """Fields describing how old the snapshot is, for API responses"""
+        return {
+            'snapshot_timestamp': self.collected_at.isoformat(),
+            'staleness_seconds': round(self.age, 3)
+        }
+
+
+class SystemMonitor:
+    """
+    Periodically collects system data and assesses it on a background thread.
+
+    Each cycle replaces ``latest`` with a new SystemSnapshot in a single
+    reference assignment, so request handlers always read a complete,
+    consistent snapshot without triggering a collection themselves.
+
+    With several worker processes only one of them should collect: it is
+    chosen with ``start_when_leader`` and also writes each snapshot to
+    ``publish_path``, from which the other workers load it.
+    """
+
+    def __init__(self, collector, refresh_interval=300, error_interval=60, on_report=None,
+                 publish_path=None, poll_interval=0.1):
+        """
+        Initialize the monitor
+
+        Args:
+            collector: DataCollector used for each cycle
+            refresh_interval: Seconds between collections
+            error_interval: Seconds to wait after a failed collection
+            on_report: Optional callback invoked with each new assessment report
+            publish_path: Optional file each snapshot is written to for other processes
+            poll_interval: Seconds between checks of publish_path while waiting
+        """
+        self.collector = collector
+        self.refresh_interval = refresh_interval
+        self.error_interval = error_interval
+        self.on_report = on_report
+        self.publish_path = publish_path
+        self.poll_interval = poll_interval
+        self.latest = None
+
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._leader = False
+        self._lock_file = None
+        self._published_mtime = None
+
+    def refresh(self):
+        """Collect, assess and publish a new snapshot"""
+        system_data = copy.deepcopy(self.collector.collect_all())
+        report = VulnerabilityAssessment(system_data).get_report()
+        self.latest = SystemSnapshot(system_data, report)
+        self._ready.set()
+
+        if self.publish_path:
+            self._publish(self.latest)
+
+        if self.on_report is not None:
+            self.on_report(report)
+        return self.latest
+
+    def _run(self):
+        """Monitoring loop"""
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+                self._stop.wait(self.refresh_interval)
+            except Exception as e:
+                logger.error(f"Error in monitoring thread: {str(e)}", exc_info=True)
+                self._stop.wait(self.error_interval)
+
+    def _publish(self, snapshot):
+        """Atomically write a snapshot to publish_path"""
+        try:
+            tmp_path = f"{self.publish_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'collected_at': snapshot.collected_at.isoformat(),
+                    'system_data': dict(snapshot.system_data),
+                    'report': dict(snapshot.report)
+                }, f, default=str)
+            os.replace(tmp_path, self.publish_path)
+        except Exception as e:
+            logger.error(f"Error publishing system snapshot: {str(e)}", exc_info=True)
+
+    def _load_published(self):
+        """Load the snapshot published by the collecting process if it changed"""
+        try:
+            mtime = os.stat(self.publish_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._published_mtime:
+            return
+        try:
+            with open(self.publish_path, 'r') as f:
+                published = json.load(f)
+            self.latest = SystemSnapshot(
+                published['system_data'], published['report'],
+                collected_at=datetime.fromisoformat(published['collected_at'])
+            )
+            self._published_mtime = mtime
+            self._ready.set()
+        except Exception as e:
+            logger.error(f"Error loading published system snapshot: {str(e)}", exc_info=True)
+
+    def start(self):
+        """Start the monitoring thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._leader = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='system-monitor')
+        self._thread.start()
+
+    def start_when_leader(self, lock_path):
+        """
+        Start monitoring once this process holds an exclusive lock on lock_path
+
+        Every worker calls this; one acquires the lock and collects. The rest
+        wait on the lock in a background thread and take over if the leader
+        exits, and meanwhile read snapshots from publish_path.
+        """
+        import fcntl
+
+        def await_leadership():
+            try:
+                self._lock_file = open(lock_path, 'a')
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+                logger.info(f"Process {os.getpid()} is running the system monitor")
+                self.start()
+            except Exception as e:
+                logger.error(f"Error acquiring monitor lock: {str(e)}", exc_info=True)
+
+        threading.Thread(target=await_leadership, daemon=True, name='monitor-election').start()
+
+    def stop(self):
+        """Stop the monitoring thread after the current cycle"""
+        self._stop.set()
+
+    def wait_ready(self, timeout=None):
+        """Wait for the first snapshot and return the latest one (or None)"""
+        if self._leader or not self.publish_path:
+            self._ready.wait(timeout)
+            return self.latest
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._load_published()
+            if self.latest is not None:
+                return self.latest
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
@@ -0,0 +1,130 @@
+"""
+Lazily initialized components and the background warm-up that builds them
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class LazyComponent:
+    """
+    A component built by its factory on first use or by the warm-up thread,
+    whichever comes first. Concurrent callers wait for the same build; a
+    failed build is reported in ``status()`` and retried on the next use.
+    """
+
+    def __init__(self, name, factory):
+        """Initialize with a name for readiness reports and a zero-argument factory"""
+        self.name = name
+        self.factory = factory
+        self.load_seconds = None
+        self.loaded_at = None
+        self.error = None
+
+        self._value = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def get(self):
+        """Return the component, building it now if needed"""
+        if self._ready.is_set():
+            return self._value
+        with self._lock:
+            if self._ready.is_set():
+                return self._value
+            start = time.perf_counter()
+            try:
+                self._value = self.factory()
+            except Exception as e:
+                self.error = str(e)
+                raise
+            self.load_seconds = time.perf_counter() - start
+            self.loaded_at = datetime.now()
+            self.error = None
+            self._ready.set()
+            logger.info(f"Component {self.name} ready in {self.load_seconds:.3f}s")
+            return self._value
+
+    def peek(self):
+        """Return the component if it is already built, without building it"""
+        return self._value if self._ready.is_set() else None
+
+    def status(self):
+        """Readiness of this component"""
+        return {
+            'ready': self.ready,
+            'load_seconds': round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            'loaded_at': self.loaded_at.isoformat() if self.loaded_at else None,
+            'error': self.error
+        }
+
+
+class Warmup:
+    """Builds a set of lazy components in order on a background thread"""
+
+    def __init__(self, components, on_complete=None, retry_interval=10):
+        """
+        Initialize the warm-up
+
+        Args:
+            components: LazyComponents in the order they should be built
+            on_complete: Optional callback run once every component is ready
+            retry_interval: Seconds between attempts for a component that failed
+        """
+        self.components = {component.name: component for component in components}
+        self.on_complete = on_complete
+        self.retry_interval = retry_interval
+        self.started_at = None
+        self._thread = None
+
+    def _run(self):
+        """Warm-up loop"""
+        pending = list(self.components.values())
+        while pending:
+            failed = []
+            for component in pending:
+                try:
+                    component.get()
+                except Exception as e:
+                    logger.error(f"Error warming up {component.name}: {str(e)}", exc_info=True)
+                    failed.append(component)
+            pending = failed
+            if pending:
+                time.sleep(self.retry_interval)
+
+        if self.on_complete is not None:
+            try:
+                self.on_complete()
+            except Exception as e:
+                logger.error(f"Error after warm-up: {str(e)}", exc_info=True)
+
+    def start(self):
+        """Start building the components in the background"""
+        if self._thread is not None:
+            return
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='warmup')
+        self._thread.start()
+
+    def run(self):
+        """Build every component in the calling thread, raising the first failure"""
+        for component in self.components.values():
+            component.get()
+        if self.on_complete is not None:
+            self.on_complete()
+
+    def status(self):
+        """Overall and per-component readiness"""
+        components = {name: component.status() for name, component in self.components.items()}
+        return {
+            'ready': all(status['ready'] for status in components.values()),
+            'components': components
+        }
@@ -138,8 +138,36 @@ class VulnerabilityAssessment:
                             risk += 2
                             event_risk_details["windows"].append("Process execution logged (EventID 4688)")
 
+            # Linux auth.log risk from the incremental analyzer's window counts
+            auth_events = self.data.get('auth_events', {})
+            totals = auth_events.get('totals')
+            if totals:
+                failed = totals.get('failed_password', 0)
+                sudo_failed = totals.get('sudo_failure', 0)
+                # Score distinct attacking sources, not raw attempts, so one brute
+                # forcer does not outweigh everything else for the whole window
+                cap = RISK_WEIGHTS.get('auth_failure_cap', 10)
+                failed_sources = auth_events.get('distinct_sources', {}).get('failed_password', 0)
+                if auth_events.get('unattributed', {}).get('failed_password', 0):
+                    failed_sources += 1
+                if failed and not failed_sources:
+                    failed_sources = 1
+                risk += min(failed_sources, cap) * self.nist_risk_calc(threat=3, vulnerability=3, impact=2)
+                risk += min(sudo_failed, cap) * 2
+                if failed:
+                    event_risk_details["linux"].append(
+                        f"Failed SSH login detected ({failed} in window from {failed_sources} sources)")
+                if sudo_failed:
+                    event_risk_details["linux"].append(f"Sudo auth failure ({sudo_failed} in window)")
+                for entry in auth_events.get('source_ips', []):
+                    event_risk_details["linux"].append(
+                        f"{entry['count']} auth failures from {entry['source_ip']}"
+                    )
+
             # Linux Syslog Risk Check
             for log_type, lines in logs.items():
+                if totals and log_type == "auth.log":
+                    continue
                 if isinstance(lines, list):
                     for line in lines:
                         if "Failed password" in line:
@@ -6,6 +6,8 @@ import nmap
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from utils import verify_digital_signature
+from data_collector.log_tail import tail_lines, LogFollower
+from vulnerability_assessment.auth_log_analyzer import AuthLogAnalyzer
 
 
 if platform.system() == "Windows":
@@ -14,6 +16,10 @@ if platform.system() == "Windows":
 else:
     winreg = None
 
+# run_scan builds a new collector every cycle, so auth.log state lives at module level
+AUTH_LOG_FOLLOWER = LogFollower("/var/log/auth.log")
+AUTH_LOG_ANALYZER = AuthLogAnalyzer()
+
 class DataCollector:
     def __init__(self):
         self.data = {}
@@ -145,14 +151,21 @@ class DataCollector:
     def grab_linux_logs(self, log_file="/var/log/auth.log", max_lines=100):
         logs = []
         try:
-            with open(log_file, "r") as f:
-                lines = f.readlines()[-max_lines:]
-                for line in lines:
-                    logs.append(line.strip())
+            for line in tail_lines(log_file, max_lines):
+                logs.append(line.strip())
         except Exception as e:
             logs.append(f"Error reading log: {str(e)}")
         return logs
 
+    def analyze_auth_log(self):
+        """Feed auth.log lines appended since the last scan to the shared analyzer"""
+        try:
+            for batch in AUTH_LOG_FOLLOWER.batches():
+                AUTH_LOG_ANALYZER.feed(batch)
+        except Exception as e:
+            return {"error": str(e)}
+        return AUTH_LOG_ANALYZER.summary()
+
     def collect_event_logs(self):
         if platform.system() == "Windows":
             self.data['event_logs'] = {
@@ -165,6 +178,7 @@ class DataCollector:
                 "auth.log": self.grab_linux_logs("/var/log/auth.log"),
                 "syslog": self.grab_linux_logs("/var/log/syslog")
             }
+            self.data['auth_events'] = self.analyze_auth_log()
         return self.data['event_logs']
 
     def collect_all(self):
@@ -10,7 +10,9 @@ RISK_WEIGHTS = {
     'excessive_startup_items': 2,
     'vulnerability_found': 3,
     'port_risk_weight': 0.5,
-    'threat_intel': 1
+    'threat_intel': 1,
+    # Most source IPs (and sudo failures) auth.log window counts can add risk for
+    'auth_failure_cap': 10
 }
 
 # Known Safe Startup Items (Whitelist)
@@ -1,17 +1,44 @@
-import io
 import matplotlib
 matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from datetime import datetime
 from flask import render_template_string, Response
-import json
+from chart_renderer import ChartRenderer
 
-def create_dashboard(app, latest_report):
+# Scans plotted on the trend graph
+TREND_POINTS = 50
+
+# Graph images are drawn off the request threads and cached by their data
+renderer = ChartRenderer()
+
+
+def draw_components(fig, components):
+    ax = fig.add_subplot()
+    ax.bar(list(components), list(components.values()), color='steelblue')
+    ax.set_ylabel("Risk Score")
+    ax.set_title("Risk Components")
+
+
+def draw_trend(fig, entries):
+    timestamps = [datetime.fromisoformat(item["timestamp"]) for item in entries]
+    scores = [item["risk_score"] for item in entries]
+
+    ax = fig.add_subplot()
+    ax.plot(timestamps, scores, marker='o', linestyle='-', color='darkorange')
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M\n%d-%m'))
+    fig.autofmt_xdate()
+    ax.set_title("Risk Score Trend Over Time")
+    ax.set_xlabel("Timestamp")
+    ax.set_ylabel("Risk Score")
+    ax.grid(True)
+
+
+def create_dashboard(app, latest_report, history):
 
     @app.route("/")
     def dashboard():
         try:
-            with open("risk_history.json", "r") as f:
-                report_history = json.load(f)[-5:]
+            report_history = history.latest(5)
         except Exception:
             report_history = []
 
@@ -244,43 +271,19 @@ def create_dashboard(app, latest_report):
         threat_risk = 1
         values = [process_risk, network_risk, ds_risk, registry_risk, threat_risk]
 
-        plt.figure(figsize=(8, 6))
-        plt.bar(labels, values, color='steelblue')
-        plt.ylabel("Risk Score")
-        plt.title("Risk Components")
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        plt.close()
-        return Response(buf.getvalue(), mimetype='image/png')
+        png = renderer.render("graph", dict(zip(labels, values)), draw_components, figsize=(8, 6))
+        return Response(png, mimetype='image/png')
 
     @app.route("/trend")
     def trend_graph():
-        import matplotlib.dates as mdates
-        from datetime import datetime
-
         try:
-            with open("risk_history.json", "r") as f:
-                history = json.load(f)
+            entries = history.latest(TREND_POINTS)
         except Exception:
             return "No history data available."
+        if not entries:
+            return "No history data available."
 
-        timestamps = [datetime.fromisoformat(item["timestamp"]) for item in history]
-        scores = [item["risk_score"] for item in history]
-
-        plt.figure(figsize=(10, 6))
-        plt.plot(timestamps, scores, marker='o', linestyle='-', color='darkorange')
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%H:%M\n%d-%m'))
-        plt.gcf().autofmt_xdate()
-        plt.title("Risk Score Trend Over Time")
-        plt.xlabel("Timestamp")
-        plt.ylabel("Risk Score")
-        plt.grid(True)
-
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        plt.close()
-        return Response(buf.getvalue(), mimetype='image/png')
+        png = renderer.render("trend", entries, draw_trend)
+        return Response(png, mimetype='image/png')
 
     return app
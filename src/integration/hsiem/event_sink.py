@@ -0,0 +1,184 @@
+"""
+Long-lived, buffered JSON-lines sink for HSIEM events
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ('never', 'interval', 'always')
+
+
+def _encode_json(event: Dict[str, Any]) -> bytes:
+    """Encode an event as a single JSON line, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(event, default=str, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(event, default=str, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class EventSink:
+    """
+    Appends events to a daily ``hsiem_YYYYMMDD.log`` file through one open descriptor.
+
+    Encoded lines are collected in memory and written with a single
+    ``os.write`` on an ``O_APPEND`` descriptor, so lines from several
+    processes never interleave. The buffer is flushed when it reaches
+    ``buffer_size`` bytes or every ``flush_interval`` seconds. ``fsync``
+    controls durability: ``never`` leaves it to the OS, ``interval`` syncs on
+    each timed flush and ``always`` syncs after every event.
+    """
+
+    def __init__(self, log_dir: str, prefix: str = 'hsiem', buffer_size: int = 64 * 1024,
+                 flush_interval: float = 1.0, fsync: str = 'interval'):
+        """
+        Initialize the sink
+
+        Args:
+            log_dir: Directory for the daily log files
+            prefix: File name prefix, followed by the date
+            buffer_size: Bytes buffered before a write is forced
+            flush_interval: Seconds between timed flushes
+            fsync: One of 'never', 'interval' or 'always'
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        self.events_written = 0
+        self.bytes_written = 0
+        self.rotations = 0
+        self.started_at = time.monotonic()
+
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._fd_pid: Optional[int] = None
+        self._path: Optional[str] = None
+        self._rollover_at = 0.0
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+
+        os.makedirs(self.log_dir, exist_ok=True)
+
+    @property
+    def path(self) -> Optional[str]:
+        """Path of the file currently being written"""
+        return self._path
+
+    def _open(self) -> None:
+        """Open today's file and schedule the next midnight rollover"""
+        now = datetime.now()
+        self._path = os.path.join(self.log_dir, f"{self.prefix}_{now.strftime('%Y%m%d')}.log")
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._fd_pid = os.getpid()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self._rollover_at = time.time() + (midnight - now).total_seconds()
+
+    def _ensure_open(self) -> None:
+        """Open the file on first use, after midnight, or in a forked child"""
+        if self._fd_pid != os.getpid():
+            # Descriptor and buffer inherited from the parent belong to it
+            self._fd = None
+            self._buffer = bytearray()
+            self._flusher = None
+        elif self._fd is not None and time.time() >= self._rollover_at:
+            self._write_buffer()
+            os.close(self._fd)
+            self._fd = None
+            self.rotations += 1
+
+        if self._fd is None:
+            self._open()
+
+        if self._flusher is None and self.flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_periodically, daemon=True,
+                                             name='hsiem-event-sink')
+            self._flusher.start()
+
+    def _write_buffer(self, sync: bool = False) -> None:
+        """Write buffered lines with one syscall; caller holds the lock"""
+        if self._buffer and self._fd is not None:
+            os.write(self._fd, self._buffer)
+            self._buffer = bytearray()
+        if sync and self._fd is not None:
+            os.fsync(self._fd)
+
+    def write(self, event: Dict[str, Any]) -> int:
+        """
+        Append an event
+
+        Returns:
+            int: Number of bytes queued for the event
+        """
+        line = _encode_json(event)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Event sink is closed")
+            self._ensure_open()
+            self._buffer += line
+            self.events_written += 1
+            self.bytes_written += len(line)
+            if self.fsync == 'always':
+                self._write_buffer(sync=True)
+            elif len(self._buffer) >= self.buffer_size:
+                self._write_buffer()
+        return len(line)
+
+    def flush(self, sync: Optional[bool] = None) -> None:
+        """Write any buffered events, optionally forcing an fsync"""
+        with self._lock:
+            if self._fd_pid != os.getpid():
+                return
+            self._write_buffer(sync=self.fsync != 'never' if sync is None else sync)
+
+    def _flush_periodically(self) -> None:
+        """Background timed flush"""
+        pid = os.getpid()
+        while not self._closed and self._fd_pid == pid:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush(sync=self.fsync == 'interval')
+            except Exception as e:
+                logger.error(f"Error flushing HSIEM events: {str(e)}", exc_info=True)
+
+    def close(self) -> None:
+        """Flush, sync and close the current file"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._fd is not None and self._fd_pid == os.getpid():
+                self._write_buffer(sync=self.fsync != 'never')
+                os.close(self._fd)
+            self._fd = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return throughput counters"""
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            'path': self._path,
+            'events_written': self.events_written,
+            'bytes_written': self.bytes_written,
+            'events_per_sec': self.events_written / elapsed,
+            'bytes_per_sec': self.bytes_written / elapsed,
+            'buffered_bytes': len(self._buffer),
+            'rotations': self.rotations,
+            'fsync': self.fsync,
+            'encoder': 'orjson' if orjson is not None else 'json'
+        }
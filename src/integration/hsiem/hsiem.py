@@ -3,10 +3,11 @@ HSIEM (Honeypot Security Information and Event Management) Integration Module
 """
 
 import logging
-import json
+import atexit
 from datetime import datetime
 from typing import Dict, Any, Optional
 import os
+from .event_sink import EventSink
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +21,10 @@ class HSIEMIntegration:
         Initialize HSIEM integration with optional configuration
         
         Args:
-            config: Dictionary containing SIEM configuration parameters
+            config: Dictionary containing SIEM configuration parameters.
+                ``log_fsync`` ('never', 'interval' or 'always'),
+                ``log_flush_interval`` and ``log_buffer_size`` tune the
+                local event log.
         """
         self.config = config or {}
         # Enable by default for local logging
@@ -33,6 +37,15 @@ class HSIEMIntegration:
         if not os.path.exists(self.log_dir):
             os.makedirs(self.log_dir)
         
+        # Daily event log kept open for the life of the process
+        self.sink = EventSink(
+            self.log_dir,
+            buffer_size=self.config.get('log_buffer_size', 64 * 1024),
+            flush_interval=self.config.get('log_flush_interval', 1.0),
+            fsync=self.config.get('log_fsync', 'interval')
+        )
+        atexit.register(self.sink.close)
+        
         logger.info(f"HSIEM Integration initialized. Enabled: {self.enabled}")
         
     def send_event(self, event_type: str, event_data: Dict[str, Any]) -> bool:
@@ -55,25 +68,29 @@ class HSIEMIntegration:
                 'data': event_data
             }
             
-            # Log to HSIEM log file
-            log_file = os.path.join(self.log_dir, f"hsiem_{datetime.now().strftime('%Y%m%d')}.log")
-            with open(log_file, 'a') as f:
-                f.write(json.dumps(event) + '\n')
+            # Append to the HSIEM log file
+            self.sink.write(event)
             
             # Log summary to main log
-            logger.info(
-                "SIEM Event Details:\n"
-                f"Type: {event_type}\n"
-                f"Timestamp: {event['timestamp']}\n"
-                f"Source IP: {event_data.get('source_ip')}\n"
-                f"Risk Score: {event_data.get('risk_score')}\n"
-                f"Severity: {event['severity']}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"SIEM event {event_type} from {event_data.get('source_ip')} "
+                    f"risk={event_data.get('risk_score')} severity={event['severity']}"
+                )
             return True
             
         except Exception as e:
             logger.error(f"Failed to send event to SIEM: {str(e)}", exc_info=True)
             return False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get event log throughput counters
+        
+        Returns:
+            dict: Events and bytes written, with per-second rates
+        """
+        return self.sink.stats()
             
     def _calculate_severity(self, risk_score: float) -> str:
         """
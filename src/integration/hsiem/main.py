@@ -1,17 +1,25 @@
 import os
+import sys
 import json
 import threading
 import schedule
 import time
 from flask import Flask
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from collector import DataCollector
 from assessment import VulnerabilityAssessment
 from dashboard import create_dashboard
+from risk_history import RiskHistoryStore, default_data_dir
 
 app = Flask(__name__)
 latest_report = {}
-app = create_dashboard(app, latest_report)
+# Scores are on the scanner's own scale, so they must not share the honeypot's history
+history = RiskHistoryStore(os.getenv("HSIEM_RISK_HISTORY",
+                                     os.path.join(default_data_dir(), "hsiem_risk_history.db")),
+                           legacy_json="risk_history.json",
+                           retention_days=int(os.getenv("HSIEM_RISK_HISTORY_DAYS", "30")))
+app = create_dashboard(app, latest_report, history)
 
 def run_scan():
     """Perform a full scan and update the latest report."""
@@ -27,23 +35,12 @@ def run_scan():
     print(f"Scan complete at {latest_report['timestamp']}, Risk Score: {latest_report['risk_score']}")
     
     # Append latest report to history
-    history_file = "risk_history.json"
-    if os.path.exists(history_file):
-        with open(history_file, "r") as f:
-            history = json.load(f)
-    else:
-        history = []
-
     history.append({
         "timestamp": latest_report["timestamp"],
-        "risk_score": latest_report["risk_score"]
+        "risk_score": latest_report["risk_score"],
+        "severity": latest_report["severity"]
     })
-
-    # Keep only latest 50 entries
-    history = history[-50:]
-
-    with open(history_file, "w") as f:
-        json.dump(history, f, indent=4)
+    history.prune_expired()
 
 
 def scheduled_scan():
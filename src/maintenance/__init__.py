@@ -0,0 +1,3 @@
+"""
+Database maintenance jobs for the honeypot
+"""
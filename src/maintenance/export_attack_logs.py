@@ -0,0 +1,267 @@
+"""
+Streaming bulk export of attack_logs
+
+Rows are read through a server-side cursor in fixed-size chunks and each
+chunk is encoded and written before the next one is fetched, so memory use
+does not depend on how many rows are exported. Output formats:
+
+    ndjson   gzip-compressed JSON lines (no extra dependencies)
+    parquet  Parquet with one row group per chunk (needs pyarrow)
+    arrow    Arrow IPC stream with one record batch per chunk (needs pyarrow)
+
+Usage:
+
+    python -m src.maintenance.export_attack_logs --start 2026-09-01 --end 2026-10-01 \\
+        --format parquet --output attack_logs_2026_09.parquet
+"""
+
+import sys
+import json
+import gzip
+import time
+import logging
+import argparse
+from datetime import datetime
+from sqlalchemy import text
+
+from ..database import create_db_engine
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('ndjson', 'parquet', 'arrow')
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+EXTENSIONS = {
+    'ndjson': '.ndjson.gz',
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+# attack_logs columns and their Arrow types
+EXPORT_COLUMNS = (
+    ('id', 'int64'),
+    ('timestamp', 'timestamp'),
+    ('source_ip', 'string'),
+    ('request_method', 'string'),
+    ('request_path', 'string'),
+    ('request_data', 'string'),
+    ('type', 'string'),
+    ('attack_type', 'string'),
+    ('attack_details', 'string'),
+    ('risk_score', 'float64'),
+    ('user_agent', 'string'),
+    ('headers', 'string'),
+    ('response_code', 'int32'),
+    ('is_malicious', 'bool'),
+    ('payload_fingerprint', 'string'),
+)
+
+
+def iter_chunks(db, start=None, end=None, chunk_size=10000, columns=None):
+    """
+    Yield lists of row tuples from attack_logs in (timestamp, id) order
+
+    The query runs on a server-side cursor (``stream_results``), so the
+    driver holds one chunk at a time instead of the whole result set.
+    """
+    columns = columns or [name for name, _ in EXPORT_COLUMNS]
+    conditions = []
+    params = {}
+    if start is not None:
+        conditions.append("timestamp >= :start")
+        params['start'] = start
+    if end is not None:
+        conditions.append("timestamp < :end")
+        params['end'] = end
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    query = text(f"""
+        SELECT {', '.join(columns)}
+        FROM attack_logs
+        {where}
+        ORDER BY timestamp, id
+    """)
+    with db.connect() as conn:
+        result = conn.execution_options(stream_results=True).execute(query, params)
+        for partition in result.partitions(chunk_size):
+            yield [tuple(row) for row in partition]
+
+
+class _ChunkSink:
+    """Write-only file object that collects bytes until they are drained"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        # Total bytes written, not bytes pending: Parquet records offsets with it
+        return self._position
+
+    def flush(self):
+        pass
+
+    def writable(self):
+        return True
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        """Return and forget the bytes written since the last drain"""
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _encode_json(record):
+    """Encode a record as one JSON line, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(record, default=str, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(record, default=str, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class _NDJSONEncoder:
+    """gzip-compressed JSON lines"""
+
+    def __init__(self, sink, columns, compresslevel=6):
+        self.columns = columns
+        self._gzip = gzip.GzipFile(fileobj=sink, mode='wb', compresslevel=compresslevel)
+
+    def write(self, rows):
+        columns = self.columns
+        self._gzip.write(b''.join(_encode_json(dict(zip(columns, row))) for row in rows))
+
+    def close(self):
+        self._gzip.close()
+
+
+class _ArrowEncoder:
+    """Parquet row groups or Arrow IPC record batches, one per chunk"""
+
+    def __init__(self, sink, columns, fmt):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError(f"The {fmt} export format needs pyarrow (pip install pyarrow)")
+
+        types = {
+            'int64': pa.int64(), 'int32': pa.int32(), 'float64': pa.float64(),
+            'bool': pa.bool_(), 'string': pa.string(), 'timestamp': pa.timestamp('s'),
+        }
+        column_types = dict(EXPORT_COLUMNS)
+        self.pa = pa
+        self.schema = pa.schema([(name, types[column_types[name]]) for name in columns])
+        if fmt == 'parquet':
+            self._writer = pq.ParquetWriter(sink, self.schema, compression='zstd')
+        else:
+            self._writer = pa.ipc.new_stream(
+                sink, self.schema, options=pa.ipc.IpcWriteOptions(compression='zstd')
+            )
+
+    def write(self, rows):
+        pa = self.pa
+        arrays = []
+        for column, field in zip(zip(*rows), self.schema):
+            if pa.types.is_boolean(field.type):
+                # MariaDB BOOLEAN is TINYINT(1) and arrives as an int
+                column = [None if value is None else bool(value) for value in column]
+            arrays.append(pa.array(column, type=field.type))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def stream_export(db, fmt='ndjson', start=None, end=None, chunk_size=10000, stats=None):
+    """
+    Yield the encoded export in pieces, one per chunk of rows
+
+    Args:
+        db: SQLAlchemy engine for the honeypot database
+        fmt: One of FORMATS
+        start, end: Optional time range, start inclusive and end exclusive
+        chunk_size: Rows fetched and encoded at a time
+        stats: Optional dict filled with rows, bytes and seconds as the export runs
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    stats = stats if stats is not None else {}
+    stats.update(rows=0, bytes=0, seconds=0.0)
+    columns = [name for name, _ in EXPORT_COLUMNS]
+
+    sink = _ChunkSink()
+    if fmt == 'ndjson':
+        encoder = _NDJSONEncoder(sink, columns)
+    else:
+        encoder = _ArrowEncoder(sink, columns, fmt)
+
+    started = time.perf_counter()
+    for rows in iter_chunks(db, start, end, chunk_size, columns):
+        encoder.write(rows)
+        data = sink.drain()
+        stats['rows'] += len(rows)
+        stats['bytes'] += len(data)
+        stats['seconds'] = time.perf_counter() - started
+        if data:
+            yield data
+    encoder.close()
+    data = sink.drain()
+    stats['bytes'] += len(data)
+    stats['seconds'] = time.perf_counter() - started
+    if data:
+        yield data
+
+
+def throughput(stats):
+    """One-line summary of an export's stats"""
+    seconds = stats['seconds'] or float('nan')
+    return (f"{stats['rows']:,} rows, {stats['bytes'] / 1e6:,.1f} MB in {stats['seconds']:.1f}s "
+            f"({stats['rows'] / seconds:,.0f} rows/sec, {stats['bytes'] / 1e6 / seconds:,.1f} MB/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export attack_logs in a streaming columnar or NDJSON format")
+    parser.add_argument('--db-url', help="Database URL (defaults to HONEYPOT_DB_URL)")
+    parser.add_argument('--start', type=datetime.fromisoformat, help="First timestamp included (ISO format)")
+    parser.add_argument('--end', type=datetime.fromisoformat, help="First timestamp excluded (ISO format)")
+    parser.add_argument('--format', choices=FORMATS, default='ndjson')
+    parser.add_argument('--output', help="Output file (default: attack_logs<extension>, '-' for stdout)")
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    output = args.output or f"attack_logs{EXTENSIONS[args.format]}"
+    db = create_db_engine(args.db_url)
+
+    stats = {}
+    out = sys.stdout.buffer if output == '-' else open(output, 'wb')
+    try:
+        for data in stream_export(db, args.format, args.start, args.end, args.chunk_size, stats):
+            out.write(data)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    logger.info(f"Exported {throughput(stats)} to {output}")
+
+
+if __name__ == '__main__':
+    main()
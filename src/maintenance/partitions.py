@@ -0,0 +1,171 @@
+"""
+Monthly range partitioning and retention for attack_logs
+
+Old data is removed by dropping whole monthly partitions, which is a metadata
+operation, instead of running DELETE over millions of rows.
+
+Usage (after applying src/migrations/002_attack_logs_partitioning.sql):
+
+    python -m src.maintenance.partitions --enable
+    python -m src.maintenance.partitions --retention-months 6
+"""
+
+import re
+import logging
+import argparse
+from datetime import date, datetime
+from sqlalchemy import text
+
+from ..database import create_db_engine
+
+logger = logging.getLogger(__name__)
+
+_MONTHLY_PARTITION = re.compile(r'^p(\d{4})(\d{2})$')
+
+
+def add_months(month_start, months):
+    """Return the first day of the month ``months`` after month_start"""
+    index = month_start.year * 12 + (month_start.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month_start):
+    """Partition holding the rows of the given month"""
+    return f"p{month_start.strftime('%Y%m')}"
+
+
+def partition_definition(month_start):
+    """Range partition for one month, bounded by the first day of the next month"""
+    upper = add_months(month_start, 1)
+    return (f"PARTITION {partition_name(month_start)} VALUES LESS THAN "
+            f"(UNIX_TIMESTAMP('{upper.isoformat()} 00:00:00'))")
+
+
+class PartitionManager:
+    """Creates, extends and expires monthly partitions of a log table"""
+
+    def __init__(self, db, table='attack_logs'):
+        """Initialize with a SQLAlchemy engine and the partitioned table name"""
+        self.db = db
+        self.table = table
+
+    def get_partitions(self, conn):
+        """Return the monthly partitions as {month_start: name}, plus whether pmax exists"""
+        rows = conn.execute(text("""
+            SELECT PARTITION_NAME
+            FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE()
+            AND TABLE_NAME = :table
+            AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+        """), {'table': self.table}).fetchall()
+
+        months = {}
+        has_max = False
+        for (name,) in rows:
+            match = _MONTHLY_PARTITION.match(name)
+            if match:
+                months[date(int(match.group(1)), int(match.group(2)), 1)] = name
+            elif name == 'pmax':
+                has_max = True
+        return months, has_max
+
+    def is_partitioned(self):
+        """Check whether the table is already range partitioned"""
+        with self.db.connect() as conn:
+            months, has_max = self.get_partitions(conn)
+        return bool(months) or has_max
+
+    def enable(self, months_ahead=2):
+        """Partition the table by month, covering existing data and the coming months"""
+        with self.db.begin() as conn:
+            months, has_max = self.get_partitions(conn)
+            if months or has_max:
+                logger.info(f"{self.table} is already partitioned")
+                return False
+
+            oldest = conn.execute(text(f"SELECT MIN(timestamp) FROM {self.table}")).scalar()
+            current = date.today().replace(day=1)
+            first = oldest.date().replace(day=1) if oldest else current
+            last = add_months(current, months_ahead)
+
+            definitions = []
+            month = first
+            while month <= last:
+                definitions.append(partition_definition(month))
+                month = add_months(month, 1)
+            definitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+
+            logger.info(f"Partitioning {self.table} into {len(definitions)} partitions")
+            conn.execute(text(
+                f"ALTER TABLE {self.table} PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) "
+                f"({', '.join(definitions)})"
+            ))
+        return True
+
+    def ensure_future_partitions(self, months_ahead=2):
+        """Split empty monthly partitions off pmax so new rows never land in it"""
+        with self.db.begin() as conn:
+            months, has_max = self.get_partitions(conn)
+            if not has_max:
+                logger.warning(f"{self.table} has no pmax partition; run --enable first")
+                return []
+
+            current = date.today().replace(day=1)
+            target = add_months(current, months_ahead)
+            month = add_months(max(months), 1) if months else current
+
+            created = []
+            while month <= target:
+                created.append(month)
+                month = add_months(month, 1)
+            if not created:
+                return []
+
+            definitions = [partition_definition(m) for m in created]
+            definitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+            conn.execute(text(
+                f"ALTER TABLE {self.table} REORGANIZE PARTITION pmax INTO ({', '.join(definitions)})"
+            ))
+            logger.info(f"Added partitions {', '.join(partition_name(m) for m in created)}")
+            return [partition_name(m) for m in created]
+
+    def drop_expired(self, retention_months):
+        """Drop monthly partitions entirely older than the retention window"""
+        if retention_months < 1:
+            raise ValueError("retention_months must be at least 1")
+
+        with self.db.begin() as conn:
+            months, _ = self.get_partitions(conn)
+            cutoff = add_months(date.today().replace(day=1), -retention_months)
+            expired = [months[m] for m in sorted(months) if m < cutoff]
+            if not expired:
+                return []
+
+            conn.execute(text(f"ALTER TABLE {self.table} DROP PARTITION {', '.join(expired)}"))
+            logger.info(f"Dropped expired partitions {', '.join(expired)}")
+            return expired
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of attack_logs")
+    parser.add_argument('--db-url', help="Database URL (defaults to HONEYPOT_DB_URL)")
+    parser.add_argument('--table', default='attack_logs')
+    parser.add_argument('--enable', action='store_true', help="Convert the table to monthly partitions")
+    parser.add_argument('--months-ahead', type=int, default=2, help="Empty partitions to keep ahead of now")
+    parser.add_argument('--retention-months', type=int, help="Drop partitions older than this many months")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    manager = PartitionManager(create_db_engine(args.db_url), table=args.table)
+
+    if args.enable:
+        manager.enable(months_ahead=args.months_ahead)
+    manager.ensure_future_partitions(months_ahead=args.months_ahead)
+    if args.retention_months:
+        manager.drop_expired(args.retention_months)
+    logger.info(f"Partition maintenance finished at {datetime.now().isoformat()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""
+Offline re-scoring of historical attack_logs rows
+
+After the model is retrained or the scoring weights change, the stored
+risk_score values are stale. This job reads attack_logs in id order, scores
+request_data with the same pattern+ML logic as the live request path
+(src.honeypot.scoring) on a pool of worker processes, each loading the model
+once, and writes changed scores back with batched UPDATEs. Rows whose
+ml_features vector was cached by the current vectorizer skip tokenization. Progress is saved
+to a checkpoint after every committed chunk, so an interrupted run resumes
+where it stopped. Rows whose severity changes are moved between severity
+rollup buckets in the same transaction as their UPDATE; the rollup is never
+rebuilt, since that would drop repeat hits that have no attack_logs row.
+
+    python -m src.maintenance.rescore_attack_logs --workers 8
+    python -m src.maintenance.rescore_attack_logs --restart     (ignore the checkpoint)
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import text
+
+from ..database import create_db_engine
+from .severity_rollup import move_rollup
+
+logger = logging.getLogger(__name__)
+
+# Scores closer than this to the stored FLOAT are left alone
+SCORE_TOLERANCE = 1e-4
+
+# Rows per UPDATE statement
+UPDATE_BATCH_SIZE = 1000
+
+# Set in each worker process by _init_worker
+_scorer = None
+
+
+def _init_worker():
+    """Load the detection rules and the model once per worker process"""
+    global _scorer
+    from ..honeypot.detection_engine import default_engine
+    from ..ml_models.attack_classifier import SQLInjectionClassifier
+    _scorer = (default_engine, SQLInjectionClassifier())
+
+
+def score_chunk(rows):
+    """
+    Score one chunk of (id, timestamp, request_data, risk_score, feature_vector,
+    vectorizer_id) rows in a worker
+
+    Model errors propagate, so a failing chunk stops the run at the last
+    checkpoint instead of writing zero ML scores.
+
+    Returns:
+        tuple: (last id in the chunk, rows scored,
+        [(id, timestamp, old score, new score)] for changed rows)
+    """
+    from ..honeypot.scoring import score_payloads
+    engine, classifier = _scorer
+    vectors = [(row[4], row[5]) if row[4] is not None else None for row in rows]
+    scores = score_payloads([row[2] for row in rows], engine, classifier, vectors, raise_errors=True)
+    changed = [
+        (row[0], row[1], row[3], score) for row, score in zip(rows, scores)
+        if row[3] is None or abs(score - row[3]) > SCORE_TOLERANCE
+    ]
+    return rows[-1][0], len(rows), changed
+
+
+def read_chunks(db, after_id=0, chunk_size=5000, start=None, end=None):
+    """
+    Yield chunks of (id, timestamp, request_data, risk_score, feature_vector,
+    vectorizer_id) in id order, one keyset query each
+
+    The cached ml_features vector is NULL for rows logged without one.
+    """
+    conditions = ["a.id > :after_id"]
+    params = {'chunk_size': chunk_size}
+    if start is not None:
+        conditions.append("a.timestamp >= :start")
+        params['start'] = start
+    if end is not None:
+        conditions.append("a.timestamp < :end")
+        params['end'] = end
+    query = text(f"""
+        SELECT a.id, a.timestamp, a.request_data, a.risk_score, f.feature_vector, f.vectorizer_id
+        FROM attack_logs a
+        LEFT JOIN ml_features f ON f.attack_log_id = a.id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY a.id
+        LIMIT :chunk_size
+    """)
+    while True:
+        params['after_id'] = after_id
+        with db.connect() as conn:
+            rows = [tuple(row) for row in conn.execute(query, params)]
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1][0]
+
+
+def write_scores(conn, scores, batch_size=UPDATE_BATCH_SIZE):
+    """
+    Write changed scores with one CASE UPDATE per batch and move the rows'
+    severity rollup counts within the caller's transaction
+
+    Args:
+        scores: (id, timestamp, old risk_score, new risk_score) per row
+    """
+    for offset in range(0, len(scores), batch_size):
+        batch = scores[offset:offset + batch_size]
+        params = {}
+        cases = []
+        for i, (event_id, _, _, score) in enumerate(batch):
+            params[f'id_{i}'] = event_id
+            params[f'score_{i}'] = score
+            cases.append(f"WHEN :id_{i} THEN :score_{i}")
+        ids = ', '.join(f":id_{i}" for i in range(len(batch)))
+        conn.execute(text(f"""
+            UPDATE attack_logs
+            SET risk_score = CASE id {' '.join(cases)} END
+            WHERE id IN ({ids})
+        """), params)
+    move_rollup(conn, [(timestamp, old, new) for _, timestamp, old, new in scores])
+
+
+class Checkpoint:
+    """Progress of a re-scoring run, saved atomically as JSON"""
+
+    def __init__(self, path, start=None, end=None):
+        self.path = path
+        self.last_id = 0
+        self.scanned = 0
+        self.updated = 0
+        self.start = start.isoformat() if start else None
+        self.end = end.isoformat() if end else None
+
+    def load(self):
+        """Resume from the saved checkpoint if it is for the same time range"""
+        try:
+            with open(self.path, 'r') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return False
+        if (saved.get('start'), saved.get('end')) != (self.start, self.end):
+            raise ValueError(f"Checkpoint {self.path} is for a different time range; use --restart")
+        self.last_id = saved['last_id']
+        self.scanned = saved['scanned']
+        self.updated = saved['updated']
+        return True
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'last_id': self.last_id,
+                'scanned': self.scanned,
+                'updated': self.updated,
+                'start': self.start,
+                'end': self.end,
+                'saved_at': datetime.now().isoformat()
+            }, f)
+        os.replace(tmp_path, self.path)
+
+
+def rescore(db, workers=None, chunk_size=5000, checkpoint_path='rescore_checkpoint.json',
+            restart=False, start=None, end=None, report_interval=10.0):
+    """
+    Re-score attack_logs and return the finished checkpoint
+
+    Chunks are scored in parallel but committed in id order, so the
+    checkpoint never moves past a row whose new score is not yet written.
+    """
+    workers = workers or os.cpu_count() or 1
+    checkpoint = Checkpoint(checkpoint_path, start, end)
+    if not restart and checkpoint.load():
+        logger.info(f"Resuming after id {checkpoint.last_id} ({checkpoint.scanned:,} rows already scored)")
+
+    chunks = read_chunks(db, checkpoint.last_id, chunk_size, start, end)
+    started = time.perf_counter()
+    last_report = started
+    scanned = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        inflight = deque()
+        exhausted = False
+        while True:
+            # Keep every worker busy with one chunk queued behind it
+            while not exhausted and len(inflight) < workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                inflight.append(pool.submit(score_chunk, chunk))
+            if not inflight:
+                break
+
+            last_id, count, changed = inflight.popleft().result()
+            if changed:
+                with db.begin() as conn:
+                    write_scores(conn, changed)
+            checkpoint.last_id = last_id
+            checkpoint.scanned += count
+            checkpoint.updated += len(changed)
+            checkpoint.save()
+            scanned += count
+
+            now = time.perf_counter()
+            if now - last_report >= report_interval:
+                logger.info(f"Scored {checkpoint.scanned:,} rows, updated {checkpoint.updated:,} "
+                            f"({scanned / (now - started):,.0f} rows/sec), at id {last_id}")
+                last_report = now
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Re-scored {scanned:,} rows in {elapsed:.1f}s "
+                f"({scanned / elapsed if elapsed else 0.0:,.0f} rows/sec), "
+                f"{checkpoint.updated:,} scores changed in total")
+    return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score historical attack_logs with the current model")
+    parser.add_argument('--db-url', help="Database URL (defaults to HONEYPOT_DB_URL)")
+    parser.add_argument('--workers', type=int, help="Scoring processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="Rows per scoring task")
+    parser.add_argument('--start', type=datetime.fromisoformat, help="Only rows from this timestamp (ISO format)")
+    parser.add_argument('--end', type=datetime.fromisoformat, help="Only rows before this timestamp (ISO format)")
+    parser.add_argument('--checkpoint', default='rescore_checkpoint.json')
+    parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    db = create_db_engine(args.db_url)
+
+    rescore(db, workers=args.workers, chunk_size=args.chunk_size, checkpoint_path=args.checkpoint,
+            restart=args.restart, start=args.start, end=args.end)
+    if os.path.exists(args.checkpoint):
+        os.unlink(args.checkpoint)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+Per-minute severity rollup for attack_logs
+
+attack_severity_rollup holds one row per (minute, severity) with the number
+of attacks logged in that minute. It is updated in the same transaction as
+the attack_logs insert, so the dashboard can read 24 hours of stats from at
+most 1440 rows per severity instead of scanning raw events.
+
+Backfill or repair it with:
+
+    python -m src.maintenance.severity_rollup --rebuild
+"""
+
+import logging
+import argparse
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import text
+
+from ..database import create_db_engine
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ('critical', 'high', 'medium', 'low')
+
+UPSERT_ROLLUP = text("""
+    INSERT INTO attack_severity_rollup (minute, severity, event_count)
+    VALUES (:minute, :severity, :event_count)
+    ON DUPLICATE KEY UPDATE event_count = event_count + VALUES(event_count)
+""")
+
+# Same ranges as SQLInjectionHoneypot._calculate_severity
+SEVERITY_CASE_SQL = """
+    CASE
+        WHEN risk_score >= 0.7 THEN 'critical'
+        WHEN risk_score >= 0.5 THEN 'high'
+        WHEN risk_score >= 0.3 THEN 'medium'
+        ELSE 'low'
+    END
+"""
+
+
+def severity_bucket(risk_score):
+    """Map a risk score to its rollup severity bucket"""
+    risk_score = risk_score or 0.0
+    if risk_score >= 0.7:
+        return 'critical'
+    elif risk_score >= 0.5:
+        return 'high'
+    elif risk_score >= 0.3:
+        return 'medium'
+    return 'low'
+
+
+def minute_of(timestamp):
+    """Truncate a row timestamp ('YYYY-MM-DD HH:MM:SS' or datetime) to its minute"""
+    if isinstance(timestamp, datetime):
+        return timestamp.strftime('%Y-%m-%d %H:%M:00')
+    if timestamp:
+        return f"{str(timestamp)[:16]}:00"
+    return datetime.now().strftime('%Y-%m-%d %H:%M:00')
+
+
+def update_rollup(conn, rows):
+    """Add a batch of attack_logs rows to the rollup within the caller's transaction"""
+    counts = Counter(
+        (minute_of(row.get('timestamp')), severity_bucket(row.get('risk_score')))
+        for row in rows
+    )
+    if counts:
+        conn.execute(UPSERT_ROLLUP, [
+            {'minute': minute, 'severity': severity, 'event_count': count}
+            for (minute, severity), count in counts.items()
+        ])
+
+
+# Decrements never take a bucket below zero (its minute may have been pruned)
+DECREMENT_ROLLUP = text("""
+    UPDATE attack_severity_rollup
+    SET event_count = GREATEST(event_count - :event_count, 0)
+    WHERE minute = :minute AND severity = :severity
+""")
+
+
+def move_rollup(conn, changes):
+    """
+    Move re-scored rows between severity buckets within the caller's transaction
+
+    Args:
+        changes: (timestamp, old risk score, new risk score) per updated attack_logs row
+    """
+    moves = Counter()
+    for timestamp, old_score, new_score in changes:
+        old_bucket, new_bucket = severity_bucket(old_score), severity_bucket(new_score)
+        if old_bucket != new_bucket:
+            minute = minute_of(timestamp)
+            moves[(minute, old_bucket)] -= 1
+            moves[(minute, new_bucket)] += 1
+    decrements = [
+        {'minute': minute, 'severity': severity, 'event_count': -count}
+        for (minute, severity), count in moves.items() if count < 0
+    ]
+    increments = [
+        {'minute': minute, 'severity': severity, 'event_count': count}
+        for (minute, severity), count in moves.items() if count > 0
+    ]
+    if decrements:
+        conn.execute(DECREMENT_ROLLUP, decrements)
+    if increments:
+        conn.execute(UPSERT_ROLLUP, increments)
+
+
+def get_severity_stats(conn, hours=24):
+    """Return {'critical', 'high', 'medium', 'low'} counts over the last ``hours``"""
+    result = conn.execute(text("""
+        SELECT severity, SUM(event_count)
+        FROM attack_severity_rollup
+        WHERE minute >= DATE_FORMAT(DATE_SUB(NOW(), INTERVAL :hours HOUR), '%Y-%m-%d %H:%i:00')
+        GROUP BY severity
+    """), {'hours': hours})
+    stats = dict.fromkeys(SEVERITIES, 0)
+    for severity, count in result:
+        stats[severity] = int(count or 0)
+    return stats
+
+
+def rebuild(db, hours=None):
+    """
+    Recompute the rollup from attack_logs, for the last ``hours`` or all history
+
+    Repeat hits that were only counted in attack_fingerprint_counts have no
+    attack_logs row and drop out of the rebuilt range, so prefer
+    move_rollup for routine corrections.
+    """
+    where = "WHERE timestamp >= DATE_SUB(NOW(), INTERVAL :hours HOUR)" if hours else ""
+    rollup_where = (
+        "WHERE minute >= DATE_FORMAT(DATE_SUB(NOW(), INTERVAL :hours HOUR), '%Y-%m-%d %H:%i:00')"
+        if hours else ""
+    )
+    params = {'hours': hours} if hours else {}
+
+    with db.begin() as conn:
+        conn.execute(text(f"DELETE FROM attack_severity_rollup {rollup_where}"), params)
+        result = conn.execute(text(f"""
+            INSERT INTO attack_severity_rollup (minute, severity, event_count)
+            SELECT DATE_FORMAT(timestamp, '%Y-%m-%d %H:%i:00') AS minute,
+                   {SEVERITY_CASE_SQL} AS severity,
+                   COUNT(*) AS event_count
+            FROM attack_logs
+            {where}
+            GROUP BY minute, severity
+        """), params)
+    logger.info(f"Rebuilt attack_severity_rollup with {result.rowcount} rows")
+    return result.rowcount
+
+
+def prune(db, days):
+    """Delete rollup rows older than ``days``"""
+    with db.begin() as conn:
+        result = conn.execute(text("""
+            DELETE FROM attack_severity_rollup
+            WHERE minute < DATE_SUB(NOW(), INTERVAL :days DAY)
+        """), {'days': days})
+    logger.info(f"Pruned {result.rowcount} rollup rows older than {days} days")
+    return result.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the attack severity rollup")
+    parser.add_argument('--db-url', help="Database URL (defaults to HONEYPOT_DB_URL)")
+    parser.add_argument('--rebuild', action='store_true', help="Backfill the rollup from attack_logs")
+    parser.add_argument('--hours', type=int, help="Only rebuild the last N hours (default: all history)")
+    parser.add_argument('--prune-days', type=int, help="Delete rollup rows older than N days")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    db = create_db_engine(args.db_url)
+
+    if args.rebuild:
+        rebuild(db, hours=args.hours)
+    if args.prune_days:
+        prune(db, args.prune_days)
+    if not (args.rebuild or args.prune_days):
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
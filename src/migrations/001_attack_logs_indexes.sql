@@ -0,0 +1,21 @@
+-- Add covering indexes for the dashboard queries on attack_logs.
+--
+-- Apply with: mysql -u root -p honeypot_db < src/migrations/001_attack_logs_indexes.sql
+USE honeypot_db;
+
+-- Drop the implicit ON UPDATE CURRENT_TIMESTAMP so that updating a row
+-- (e.g. re-scoring) never moves it in time.
+ALTER TABLE attack_logs
+    MODIFY timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+
+-- 24-hour severity stats and ORDER BY timestamp DESC LIMIT n
+CREATE INDEX IF NOT EXISTS idx_attack_logs_timestamp_risk
+    ON attack_logs (timestamp, risk_score);
+
+-- Per-attacker history
+CREATE INDEX IF NOT EXISTS idx_attack_logs_source_ip_timestamp
+    ON attack_logs (source_ip, timestamp);
+
+-- Highest-risk events first, optionally within a time range
+CREATE INDEX IF NOT EXISTS idx_attack_logs_risk_timestamp
+    ON attack_logs (risk_score, timestamp);
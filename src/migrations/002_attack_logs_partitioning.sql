@@ -0,0 +1,19 @@
+-- Optional: prepare attack_logs for monthly range partitioning.
+--
+-- MariaDB requires the partitioning column in every unique key and does not
+-- allow foreign keys on partitioned tables, so this widens the primary key to
+-- (id, timestamp) and drops the ml_features -> attack_logs foreign key.
+-- The partitions themselves are created and rotated by:
+--
+--   python -m src.maintenance.partitions --enable
+--   python -m src.maintenance.partitions --retention-months 6   (from cron)
+--
+-- Apply with: mysql -u root -p honeypot_db < src/migrations/002_attack_logs_partitioning.sql
+USE honeypot_db;
+
+ALTER TABLE ml_features DROP FOREIGN KEY IF EXISTS ml_features_ibfk_1;
+CREATE INDEX IF NOT EXISTS idx_ml_features_attack_log_id ON ml_features (attack_log_id);
+
+ALTER TABLE attack_logs
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id, timestamp);
@@ -0,0 +1,12 @@
+-- Per-minute severity rollup used by the HSIEM stats endpoints.
+--
+-- Apply with: mysql -u root -p honeypot_db < src/migrations/003_attack_severity_rollup.sql
+-- then backfill: PYTHONPATH=. python -m src.maintenance.severity_rollup --rebuild
+USE honeypot_db;
+
+CREATE TABLE IF NOT EXISTS attack_severity_rollup (
+    minute DATETIME NOT NULL,
+    severity VARCHAR(10) NOT NULL,
+    event_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (minute, severity)
+);
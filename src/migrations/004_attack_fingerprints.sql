@@ -0,0 +1,23 @@
+-- Payload fingerprints: repeats of a payload from the same source IP within
+-- HONEYPOT_REPEAT_WINDOW seconds are counted instead of logged in full.
+--
+-- Apply with: mysql -u root -p honeypot_db < src/migrations/004_attack_fingerprints.sql
+USE honeypot_db;
+
+ALTER TABLE attack_logs
+    ADD COLUMN IF NOT EXISTS payload_fingerprint CHAR(16);
+
+-- Latest stored payload per fingerprint
+CREATE INDEX IF NOT EXISTS idx_attack_logs_fingerprint_timestamp
+    ON attack_logs (payload_fingerprint, timestamp);
+
+CREATE TABLE IF NOT EXISTS attack_fingerprint_counts (
+    source_ip VARCHAR(45) NOT NULL,
+    payload_fingerprint CHAR(16) NOT NULL,
+    window_start DATETIME NOT NULL,
+    first_seen DATETIME NOT NULL,
+    last_seen DATETIME NOT NULL,
+    hit_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (source_ip, payload_fingerprint, window_start),
+    INDEX idx_attack_fingerprint_counts_last_seen (last_seen)
+);
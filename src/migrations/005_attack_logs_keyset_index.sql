@@ -0,0 +1,8 @@
+-- Index for keyset pagination of /api/hsiem/events, which pages with
+-- ORDER BY timestamp DESC, id DESC and a (timestamp, id) cursor.
+--
+-- Apply with: mysql -u root -p honeypot_db < src/migrations/005_attack_logs_keyset_index.sql
+USE honeypot_db;
+
+CREATE INDEX IF NOT EXISTS idx_attack_logs_timestamp_id
+    ON attack_logs (timestamp, id);
@@ -0,0 +1,14 @@
+-- Cached ML feature vectors: every logged attack gets an ml_features row with
+-- its sparse TF-IDF vector and handcrafted counts in the binary layout of
+-- src/ml_models/feature_store.py. vectorizer_id records which vectorizer the
+-- vector belongs to, so vectors from an older vocabulary are skipped.
+--
+-- Apply with: mysql -u root -p honeypot_db < src/migrations/006_ml_feature_vectors.sql
+USE honeypot_db;
+
+ALTER TABLE ml_features
+    MODIFY COLUMN feature_vector BLOB,
+    ADD COLUMN IF NOT EXISTS vectorizer_id CHAR(16);
+
+CREATE INDEX IF NOT EXISTS idx_ml_features_attack_log_id
+    ON ml_features (attack_log_id);
@@ -0,0 +1,83 @@
+"""
+Versioned model artifacts
+
+Each training run writes one directory under the model directory, named by
+its version, and the CURRENT file names the version the honeypot loads:
+
+    artifacts/
+        CURRENT                     "20261017-142501"
+        20261017-142501/
+            sqli_model.joblib       sklearn forest, uncompressed
+            sqli_vectorizer.joblib  sklearn vectorizer, uncompressed
+            sqli_compiled/          NumPy-only model, one .npy per array
+            manifest.json
+
+The compiled model's .npy arrays (and the arrays inside the uncompressed
+pickles) are loaded memory-mapped, so every worker process shares one page
+cache copy of a version instead of holding its own.
+
+Without a CURRENT file the model bundled next to this module is used.
+"""
+
+import os
+import json
+from datetime import datetime
+
+MODEL_FILE = 'sqli_model.joblib'
+VECTORIZER_FILE = 'sqli_vectorizer.joblib'
+COMPILED_FILE = 'sqli_compiled.npz'
+COMPILED_DIR = 'sqli_compiled'
+MANIFEST_FILE = 'manifest.json'
+
+CURRENT_FILE = 'CURRENT'
+
+# Version reported for the model shipped with the package
+BUNDLED_VERSION = 'bundled'
+
+BUNDLED_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def default_model_dir():
+    """Directory holding versioned artifacts, overridable with HONEYPOT_MODEL_DIR"""
+    return os.getenv('HONEYPOT_MODEL_DIR', os.path.join(BUNDLED_DIR, 'artifacts'))
+
+
+def new_version():
+    """Version name for an artifact created now"""
+    return datetime.now().strftime('%Y%m%d-%H%M%S')
+
+
+def version_dir(model_dir, version):
+    """Directory of one artifact version (the package directory for the bundled model)"""
+    if version == BUNDLED_VERSION:
+        return BUNDLED_DIR
+    return os.path.join(model_dir, version)
+
+
+def current_version(model_dir):
+    """The active version named by CURRENT, or BUNDLED_VERSION if there is none"""
+    try:
+        with open(os.path.join(model_dir, CURRENT_FILE), 'r') as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return BUNDLED_VERSION
+    return version or BUNDLED_VERSION
+
+
+def activate(model_dir, version):
+    """Atomically point CURRENT at a version"""
+    if not os.path.isdir(version_dir(model_dir, version)):
+        raise FileNotFoundError(f"No artifact version {version} in {model_dir}")
+    tmp_path = os.path.join(model_dir, f"{CURRENT_FILE}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(version + '\n')
+    os.replace(tmp_path, os.path.join(model_dir, CURRENT_FILE))
+
+
+def read_manifest(model_dir, version):
+    """The manifest of a version, or an empty dict if it has none"""
+    try:
+        with open(os.path.join(version_dir(model_dir, version), MANIFEST_FILE), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
@@ -1,45 +1,80 @@
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier
 import joblib
 import os
 import re
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from collections import OrderedDict
+from .compiled_model import CompiledSQLiModel
+from .feature_store import encode_features, decode_features, densify
+from .artifacts import (
+    MODEL_FILE, VECTORIZER_FILE, COMPILED_FILE, COMPILED_DIR,
+    default_model_dir, current_version, version_dir
+)
+
+logger = logging.getLogger(__name__)
+
+
+def preprocess_text(text):
+    """Preprocess input text"""
+    if isinstance(text, (dict, list)):
+        text = str(text)
+    
+    # Convert to lowercase
+    text = text.lower()
+    
+    # Remove extra whitespace
+    text = re.sub(r'\s+', ' ', text)
+    
+    return text
+
 
 class SQLInjectionClassifier:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            ngram_range=(1, 3),
-            analyzer='char'
-        )
+    def __init__(self, cache_size=4096, model_dir=None):
+        # The sklearn estimators are only unpickled when no compiled model is
+        # available, so the runtime path never has to import sklearn. Models
+        # are trained by src.ml_models.train, never here.
+        self.vectorizer = None
+        self.classifier = None
+        self.compiled_model = None
         
-        self.classifier = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42
-        )
+        # Load the version CURRENT points at, or the bundled model
+        self.model_dir = model_dir or default_model_dir()
+        self.version = current_version(self.model_dir)
+        artifact_dir = version_dir(self.model_dir, self.version)
+        self.model_path = os.path.join(artifact_dir, MODEL_FILE)
+        self.vectorizer_path = os.path.join(artifact_dir, VECTORIZER_FILE)
+        # Trained versions ship a memory-mappable directory, the bundled model an .npz
+        self.compiled_model_path = os.path.join(artifact_dir, COMPILED_DIR)
+        if not os.path.isdir(self.compiled_model_path):
+            self.compiled_model_path = os.path.join(artifact_dir, COMPILED_FILE)
         
-        self.model_path = os.path.join(os.path.dirname(__file__), 'sqli_model.joblib')
-        self.vectorizer_path = os.path.join(os.path.dirname(__file__), 'sqli_vectorizer.joblib')
+        # Bounded LRU cache of scores keyed by a hash of the normalized payload
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
         
-        # Load or train the model
-        if os.path.exists(self.model_path) and os.path.exists(self.vectorizer_path):
+        # Prefer the compiled model, then the pickled one
+        started = time.perf_counter()
+        if not (self._compiled_model_is_current() and self.load_compiled_model()):
+            if not (os.path.exists(self.model_path) and os.path.exists(self.vectorizer_path)):
+                raise FileNotFoundError(
+                    f"No SQL injection model in {artifact_dir} (version {self.version}); "
+                    f"train one with python -m src.ml_models.train"
+                )
             self.load_model()
-        else:
-            self.train_model()
+            self.export_compiled_model()
+        self.load_seconds = time.perf_counter() - started
+        self.loaded_at = datetime.now()
     
     def preprocess_text(self, text):
         """Preprocess input text"""
-        if isinstance(text, (dict, list)):
-            text = str(text)
-        
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        return text
+        return preprocess_text(text)
     
     def extract_features(self, text):
         """Extract features from text"""
@@ -57,68 +92,219 @@ class SQLInjectionClassifier:
         }
         return features
     
-    def train_model(self):
-        """Train the model with sample data"""
-        # Sample training data (you should replace this with real data)
-        benign_queries = [
-            "SELECT * FROM users WHERE id = 1",
-            "SELECT name, price FROM products WHERE category = 'electronics'",
-            "INSERT INTO orders (user_id, product_id) VALUES (1, 2)",
-            "UPDATE users SET name = 'John' WHERE id = 1",
-            "DELETE FROM cart WHERE user_id = 1"
-        ]
+    def load_model(self):
+        """Load the trained model, memory-mapping the arrays of uncompressed pickles"""
+        self.classifier = joblib.load(self.model_path, mmap_mode='r')
+        self.vectorizer = joblib.load(self.vectorizer_path, mmap_mode='r')
+    
+    def _compiled_model_is_current(self):
+        """Check that the compiled model exists and is newer than the pickled one"""
+        if not os.path.exists(self.compiled_model_path):
+            return False
+        compiled_mtime = os.path.getmtime(self.compiled_model_path)
+        for path in (self.model_path, self.vectorizer_path):
+            if os.path.exists(path) and os.path.getmtime(path) > compiled_mtime:
+                return False
+        return True
+    
+    def load_compiled_model(self):
+        """Load the NumPy-only compiled model"""
+        try:
+            self.compiled_model = CompiledSQLiModel.load(self.compiled_model_path)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not load compiled model, falling back to sklearn: {str(e)}")
+            self.compiled_model = None
+            return False
+    
+    def export_compiled_model(self, path=None, samples=None):
+        """
+        Flatten the trained vectorizer and forest into NumPy arrays
         
-        malicious_queries = [
-            "SELECT * FROM users WHERE id = 1 OR 1=1",
-            "SELECT * FROM users WHERE username = '' OR '1'='1'",
-            "SELECT * FROM users WHERE id = 1; DROP TABLE users;",
-            "SELECT * FROM users UNION SELECT * FROM admin",
-            "' OR '1'='1' --",
-            "admin' --",
-            "1'; DROP TABLE users; --",
+        The compiled model is only written if it reproduces predict_proba on
+        the sample payloads within float tolerance.
+        """
+        path = path or os.path.join(os.path.dirname(self.model_path), COMPILED_FILE)
+        try:
+            compiled = CompiledSQLiModel.from_sklearn(self.vectorizer, self.classifier)
+            
+            samples = [self.preprocess_text(x) for x in (samples or self._parity_samples())]
+            expected = self.classifier.predict_proba(self.vectorizer.transform(samples))[:, 1]
+            actual = compiled.predict_proba(samples)
+            if not np.allclose(expected, actual, rtol=0.0, atol=1e-9):
+                logger.error(f"Compiled model diverges from sklearn by {np.abs(expected - actual).max()}")
+                return False
+            
+            tmp_path = path + '.tmp'
+            compiled.save(tmp_path)
+            os.replace(tmp_path, path)
+            self.compiled_model = compiled
+            logger.info(f"Compiled model exported to {path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error exporting compiled model: {str(e)}", exc_info=True)
+            return False
+    
+    def status(self):
+        """Version and load details of this model"""
+        return {
+            'version': self.version,
+            'loaded_at': self.loaded_at.isoformat(),
+            'load_seconds': round(self.load_seconds, 4),
+            'compiled': self.compiled_model is not None,
+            'memory_mapped': self.compiled_model is not None and self.compiled_model.memory_mapped,
+            'vectorizer_id': self.vectorizer_id,
+        }
+    
+    def _parity_samples(self):
+        """Payloads used to check the compiled model against sklearn"""
+        return [
+            "", "a", "hello world", "alice@example.com", "electronics",
+            "' OR '1'='1' --", "admin' --", "1'; DROP TABLE users; --",
             "1' UNION SELECT username, password FROM users --",
-            "1' OR '1' = '1",
-            "' OR 1=1 #",
-            "' OR 'x'='x",
-            "1' AND 1=(SELECT COUNT(*) FROM tabname); --"
+            "1' AND 1=(SELECT COUNT(*) FROM information_schema.tables); --",
+            '{"username": "admin\' or 1=1 #", "password": "x"}',
+            '{"category": "x\' AND name LIKE \'%admin%"}',
         ]
+    
+    def _cache_key(self, processed_input):
+        """Hash a normalized payload into a compact cache key"""
+        return hashlib.blake2b(processed_input.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    
+    def cached_risk(self, input_data):
+        """Return the cached risk score for input data, or None if not cached"""
+        key = self._cache_key(self.preprocess_text(input_data))
+        with self._cache_lock:
+            score = self._cache.get(key)
+            if score is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            return score
+    
+    def cache_stats(self):
+        """Return prediction cache counters"""
+        with self._cache_lock:
+            return {
+                'size': len(self._cache),
+                'max_size': self.cache_size,
+                'hits': self.cache_hits,
+                'misses': self.cache_misses
+            }
+    
+    def _predict_positive(self, processed_inputs):
+        """Return the SQL injection probability for preprocessed inputs"""
+        if self.compiled_model is not None:
+            return self.compiled_model.predict_proba(processed_inputs)
+        X_tfidf = self.vectorizer.transform(processed_inputs)
+        return self.classifier.predict_proba(X_tfidf)[:, 1]
+    
+    @property
+    def vectorizer_id(self):
+        """Digest of the vectorizer that cached feature vectors must match, or None"""
+        if self.compiled_model is None:
+            return None
+        return self.compiled_model.vectorizer.digest
+    
+    def feature_vectors(self, inputs):
+        """
+        Encode inputs as cacheable feature vectors, without scoring them
         
-        # Prepare training data
-        X = benign_queries + malicious_queries
-        y = [0] * len(benign_queries) + [1] * len(malicious_queries)
-        
-        # Preprocess and extract features
-        X_processed = [self.preprocess_text(x) for x in X]
-        
-        # Transform text data
-        X_tfidf = self.vectorizer.fit_transform(X_processed)
-        
-        # Train the model
-        self.classifier.fit(X_tfidf, y)
-        
-        # Save the model
-        joblib.dump(self.classifier, self.model_path)
-        joblib.dump(self.vectorizer, self.vectorizer_path)
+        Returns:
+            list: (vector bytes, vectorizer id) per input, or an empty list
+            when there is no compiled vectorizer to encode with
+        """
+        vectorizer_id = self.vectorizer_id
+        if vectorizer_id is None:
+            return []
+        vectorizer = self.compiled_model.vectorizer
+        vectors = []
+        for input_data in inputs:
+            text = input_data if isinstance(input_data, str) else str(input_data)
+            indices, values = vectorizer.transform_sparse(self.preprocess_text(text))
+            vectors.append((encode_features(indices, values, self.extract_features(text)), vectorizer_id))
+        return vectors
     
-    def load_model(self):
-        """Load the trained model"""
-        self.classifier = joblib.load(self.model_path)
-        self.vectorizer = joblib.load(self.vectorizer_path)
+    def predict_risk_vectors(self, vectors):
+        """
+        Risk scores from cached (vector bytes, vectorizer id) pairs
+        
+        Vectors from another vectorizer, or missing ones, score None so the
+        caller can fall back to predict_risk_batch on the raw payload.
+        """
+        scores = [None] * len(vectors)
+        vectorizer_id = self.vectorizer_id
+        usable = [i for i, vector in enumerate(vectors) if vector and vector[1] == vectorizer_id]
+        if vectorizer_id is None or not usable:
+            return scores
+        decoded = [decode_features(bytes(vectors[i][0])) for i in usable]
+        X = densify(decoded, self.compiled_model.vectorizer.n_features)
+        for i, probability in zip(usable, self.compiled_model.forest.predict_proba(X)):
+            scores[i] = float(probability)
+        return scores
     
-    def predict_risk(self, input_data):
-        """Predict risk score for input data"""
+    def predict_risk_batch(self, inputs, raise_errors=False):
+        """
+        Predict risk scores for a list of inputs with one vectorize+predict call
+        
+        Errors score every input 0.0 unless ``raise_errors`` is set, for
+        callers that must not store those scores.
+        """
         try:
-            # Preprocess input
-            processed_input = self.preprocess_text(input_data)
+            processed_inputs = [self.preprocess_text(x) for x in inputs]
+            scores = [None] * len(processed_inputs)
+            
+            # Serve repeats from the cache and group the rest by payload
+            pending = OrderedDict()
+            with self._cache_lock:
+                for i, processed_input in enumerate(processed_inputs):
+                    key = self._cache_key(processed_input)
+                    score = self._cache.get(key)
+                    if score is not None:
+                        self._cache.move_to_end(key)
+                        self.cache_hits += 1
+                        scores[i] = score
+                    else:
+                        self.cache_misses += 1
+                        pending.setdefault(key, (processed_input, []))[1].append(i)
             
-            # Transform input
-            X_tfidf = self.vectorizer.transform([processed_input])
+            if pending:
+                # Transform and score every distinct uncached payload at once
+                probabilities = self._predict_positive([entry[0] for entry in pending.values()])
+                
+                with self._cache_lock:
+                    for (key, (_, indices)), probability in zip(pending.items(), probabilities):
+                        score = float(probability)
+                        self._cache[key] = score
+                        self._cache.move_to_end(key)
+                        for i in indices:
+                            scores[i] = score
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
             
-            # Get prediction probability
-            risk_score = self.classifier.predict_proba(X_tfidf)[0][1]
+            return scores
             
-            return risk_score
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Error in batch prediction: {str(e)}")
+            return [0.0] * len(inputs)  # Return 0 risk scores on error
+    
+    def predict_risk(self, input_data):
+        """Predict risk score for input data"""
+        try:
+            return self.predict_risk_batch([input_data])[0]
             
         except Exception as e:
             print(f"Error in prediction: {str(e)}")
-            return 0.0  # Return 0 risk score on error 
\ No newline at end of file
+            return 0.0  # Return 0 risk score on error
+
+
+if __name__ == '__main__':
+    # Re-export the compiled model from the pickled sklearn artifacts
+    logging.basicConfig(level=logging.INFO)
+    classifier = SQLInjectionClassifier()
+    if classifier.vectorizer is None:
+        classifier.load_model()
+    if not classifier.export_compiled_model():
+        raise SystemExit(1)
@@ -0,0 +1,361 @@
+"""
+Dependency-light inference path for the SQL injection classifier
+
+The trained TF-IDF vectorizer and RandomForest are flattened into plain NumPy
+arrays so payloads can be scored without importing scikit-learn.
+"""
+
+import os
+import re
+import json
+import hashlib
+import numpy as np
+
+# Each character n-gram (n <= 3) is packed into a single uint64 key using
+# 21 bits per code point. Code points are offset by one so that a key of zero
+# always marks an empty hash table slot.
+_CODEPOINT_BITS = 21
+_MAX_NGRAM = 3
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+FORMAT_VERSION = 1
+
+# Metadata of a model saved with save_dir()
+METADATA_FILE = 'metadata.json'
+
+
+def _pack_ngrams(codepoints, n):
+    """Pack every n-gram of an offset code point array into uint64 keys"""
+    count = len(codepoints) - n + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.uint64)
+    keys = codepoints[:count].copy()
+    for j in range(1, n):
+        keys |= codepoints[j:count + j] << np.uint64(_CODEPOINT_BITS * j)
+    return keys
+
+
+def _pack_term(term):
+    """Pack a single vocabulary term the same way _pack_ngrams does"""
+    key = 0
+    for j, char in enumerate(term):
+        key |= (ord(char) + 1) << (_CODEPOINT_BITS * j)
+    return key
+
+
+class CompiledVectorizer:
+    """TF-IDF character n-gram vectorizer backed by an open-addressing hash table"""
+
+    _white_spaces = re.compile(r"\s\s+")
+
+    def __init__(self, table_keys, table_values, idf, ngram_range, max_probe,
+                 lowercase=True, norm='l2', sublinear_tf=False):
+        self.table_keys = table_keys
+        self.table_values = table_values
+        self.idf = idf
+        self.ngram_range = tuple(int(n) for n in ngram_range)
+        self.max_probe = int(max_probe)
+        self.lowercase = bool(lowercase)
+        self.norm = norm
+        self.sublinear_tf = bool(sublinear_tf)
+        self.n_features = len(idf)
+        self._mask = np.uint64(len(table_keys) - 1)
+        self._shift = np.uint64(64 - int(len(table_keys)).bit_length() + 1)
+        self._digest = None
+
+    @classmethod
+    def from_sklearn(cls, vectorizer):
+        """Build a compiled vectorizer from a fitted sklearn TfidfVectorizer"""
+        params = vectorizer.get_params()
+        min_n, max_n = params['ngram_range']
+        if params['analyzer'] != 'char' or max_n > _MAX_NGRAM:
+            raise ValueError("Only char analyzers with n-grams up to 3 can be compiled")
+        if params['norm'] not in ('l2', None) or params['preprocessor'] or params['strip_accents']:
+            raise ValueError("Unsupported vectorizer configuration for compilation")
+
+        vocabulary = vectorizer.vocabulary_
+        size = 1
+        while size < 2 * len(vocabulary):
+            size <<= 1
+        shift = 64 - size.bit_length() + 1
+
+        terms = list(vocabulary.keys())
+        keys = np.array([_pack_term(term) for term in terms], dtype=np.uint64)
+        slots = (keys * _HASH_MULTIPLIER) >> np.uint64(shift)
+
+        table_keys = np.zeros(size, dtype=np.uint64)
+        table_values = np.full(size, -1, dtype=np.int32)
+        max_probe = 1
+        for term, key, slot in zip(terms, keys, slots):
+            probe = 0
+            while table_keys[(int(slot) + probe) & (size - 1)] != 0:
+                probe += 1
+            table_keys[(int(slot) + probe) & (size - 1)] = key
+            table_values[(int(slot) + probe) & (size - 1)] = vocabulary[term]
+            max_probe = max(max_probe, probe + 1)
+
+        if params['use_idf']:
+            idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+        else:
+            idf = np.ones(len(vocabulary), dtype=np.float64)
+
+        return cls(table_keys, table_values, idf, (min_n, max_n), max_probe,
+                   lowercase=params['lowercase'], norm=params['norm'],
+                   sublinear_tf=params['sublinear_tf'])
+
+    def _lookup(self, keys):
+        """Map packed n-gram keys to feature indices, -1 when not in the vocabulary"""
+        slots = (keys * _HASH_MULTIPLIER) >> self._shift
+        result = np.full(len(keys), -1, dtype=np.int64)
+        unresolved = np.ones(len(keys), dtype=bool)
+        for step in range(self.max_probe):
+            index = (slots + np.uint64(step)) & self._mask
+            found = self.table_keys[index]
+            hit = unresolved & (found == keys)
+            result[hit] = self.table_values[index[hit]]
+            unresolved &= ~hit & (found != 0)
+            if not unresolved.any():
+                break
+        return result
+
+    @property
+    def digest(self):
+        """Identifier of the feature space: equal digests produce identical vectors"""
+        if self._digest is None:
+            h = hashlib.blake2b(digest_size=8)
+            for array in (self.table_keys, self.table_values, self.idf):
+                h.update(np.ascontiguousarray(array).tobytes())
+            h.update(json.dumps([list(self.ngram_range), self.lowercase, self.norm, self.sublinear_tf]).encode())
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def _features(self, document):
+        """Feature index of every in-vocabulary n-gram of a document"""
+        min_n, max_n = self.ngram_range
+        if self.lowercase:
+            document = document.lower()
+        document = self._white_spaces.sub(" ", document)
+        codepoints = np.frombuffer(
+            document.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32
+        ).astype(np.uint64) + np.uint64(1)
+        keys = np.concatenate([_pack_ngrams(codepoints, n) for n in range(min_n, max_n + 1)])
+        features = self._lookup(keys)
+        return features[features >= 0]
+
+    def transform_sparse(self, document):
+        """Transform one document into the (indices, values) of its nonzero TF-IDF features"""
+        indices, tf = np.unique(self._features(document), return_counts=True)
+        values = tf.astype(np.float64)
+        if self.sublinear_tf:
+            values = np.log(values) + 1
+        values *= self.idf[indices]
+        if self.norm == 'l2':
+            norm = np.sqrt(np.dot(values, values))
+            if norm > 0:
+                values /= norm
+        return indices.astype(np.int32), values
+
+    def transform(self, documents):
+        """Transform documents into a dense, normalized TF-IDF matrix"""
+        X = np.zeros((len(documents), self.n_features), dtype=np.float64)
+        for row, document in enumerate(documents):
+            X[row] = np.bincount(self._features(document), minlength=self.n_features)
+
+        if self.sublinear_tf:
+            nonzero = X > 0
+            X[nonzero] = np.log(X[nonzero]) + 1
+        X *= self.idf
+        if self.norm == 'l2':
+            norms = np.sqrt(np.einsum('ij,ij->i', X, X))
+            norms[norms == 0] = 1.0
+            X /= norms[:, None]
+        return X
+
+    def to_arrays(self, prefix='vectorizer_'):
+        """Return the arrays that make up this vectorizer"""
+        return {
+            prefix + 'table_keys': self.table_keys,
+            prefix + 'table_values': self.table_values,
+            prefix + 'idf': self.idf,
+        }
+
+
+class CompiledForest:
+    """Random forest flattened into contiguous node arrays for vectorized evaluation"""
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_sklearn(cls, forest, positive_class=1):
+        """Flatten a fitted sklearn RandomForestClassifier"""
+        class_index = list(forest.classes_).index(positive_class)
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            # Leaves point back at themselves so every sample can be walked
+            # for the same number of steps regardless of where it lands.
+            left = np.where(is_leaf, node_ids, tree.children_left).astype(np.int32) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right).astype(np.int32) + offset
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+            threshold = np.where(is_leaf, np.inf, tree.threshold).astype(np.float64)
+
+            # Older sklearn stores class counts, newer stores fractions
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1)
+            totals[totals == 0] = 1.0
+            value = (counts[:, class_index] / totals).astype(np.float64)
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            roots.append(offset)
+            max_depth = max(max_depth, int(tree.max_depth))
+            offset += n_nodes
+
+        return cls(np.concatenate(features), np.concatenate(thresholds),
+                   np.concatenate(lefts), np.concatenate(rights),
+                   np.concatenate(values), np.asarray(roots, dtype=np.int32), max_depth)
+
+    def predict_proba(self, X):
+        """Return the positive-class probability for each row of X"""
+        # sklearn evaluates splits on float32 features
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[nodes].mean(axis=1)
+
+    def to_arrays(self, prefix='forest_'):
+        """Return the arrays that make up this forest"""
+        return {
+            prefix + 'feature': self.feature,
+            prefix + 'threshold': self.threshold,
+            prefix + 'left': self.left,
+            prefix + 'right': self.right,
+            prefix + 'value': self.value,
+            prefix + 'roots': self.roots,
+        }
+
+
+class CompiledSQLiModel:
+    """Vectorizer and forest pair that scores payloads with NumPy only"""
+
+    def __init__(self, vectorizer, forest):
+        self.vectorizer = vectorizer
+        self.forest = forest
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, classifier):
+        """Compile a fitted vectorizer and RandomForest classifier"""
+        return cls(CompiledVectorizer.from_sklearn(vectorizer), CompiledForest.from_sklearn(classifier))
+
+    def predict_proba(self, documents):
+        """Return the positive-class probability for each preprocessed document"""
+        if not documents:
+            return np.empty(0, dtype=np.float64)
+        return self.forest.predict_proba(self.vectorizer.transform(documents))
+
+    def _metadata(self):
+        return {
+            'format_version': FORMAT_VERSION,
+            'ngram_range': list(self.vectorizer.ngram_range),
+            'max_probe': self.vectorizer.max_probe,
+            'lowercase': self.vectorizer.lowercase,
+            'norm': self.vectorizer.norm,
+            'sublinear_tf': self.vectorizer.sublinear_tf,
+            'max_depth': self.forest.max_depth,
+        }
+
+    def _arrays(self):
+        arrays = {}
+        arrays.update(self.vectorizer.to_arrays())
+        arrays.update(self.forest.to_arrays())
+        return arrays
+
+    def save(self, path):
+        """Write the model to an uncompressed .npz archive"""
+        with open(path, 'wb') as f:
+            np.savez(f, metadata=np.array(json.dumps(self._metadata())), **self._arrays())
+
+    def save_dir(self, path):
+        """
+        Write the model as a directory of .npy files
+
+        Unlike an .npz member, an .npy file can be memory-mapped, so every
+        process that loads the directory shares the same page cache copy.
+        """
+        os.makedirs(path)
+        for name, array in self._arrays().items():
+            np.save(os.path.join(path, name + '.npy'), np.ascontiguousarray(array))
+        with open(os.path.join(path, METADATA_FILE), 'w') as f:
+            json.dump(self._metadata(), f)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        Load a model written by save() or save_dir()
+
+        Arrays of a save_dir() directory are memory-mapped with ``mmap_mode``
+        (None reads them into memory); .npz archives are always read.
+        """
+        if os.path.isdir(path):
+            with open(os.path.join(path, METADATA_FILE), 'r') as f:
+                metadata = json.load(f)
+            cls._check_format(metadata)
+            return cls._from_arrays(metadata, lambda name: np.load(
+                os.path.join(path, name + '.npy'), mmap_mode=mmap_mode, allow_pickle=False))
+
+        with np.load(path, allow_pickle=False) as archive:
+            metadata = json.loads(str(archive['metadata']))
+            cls._check_format(metadata)
+            return cls._from_arrays(metadata, lambda name: archive[name])
+
+    @staticmethod
+    def _check_format(metadata):
+        if metadata.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled model format: {metadata.get('format_version')}")
+
+    @classmethod
+    def _from_arrays(cls, metadata, array):
+        vectorizer = CompiledVectorizer(
+            array('vectorizer_table_keys'),
+            array('vectorizer_table_values'),
+            array('vectorizer_idf'),
+            metadata['ngram_range'],
+            metadata['max_probe'],
+            lowercase=metadata['lowercase'],
+            norm=metadata['norm'],
+            sublinear_tf=metadata['sublinear_tf'],
+        )
+        forest = CompiledForest(
+            array('forest_feature'),
+            array('forest_threshold'),
+            array('forest_left'),
+            array('forest_right'),
+            array('forest_value'),
+            array('forest_roots'),
+            metadata['max_depth'],
+        )
+        return cls(vectorizer, forest)
+
+    @property
+    def memory_mapped(self):
+        """Whether the model's arrays are memory-mapped rather than private copies"""
+        return isinstance(self.forest.feature, np.memmap)
@@ -0,0 +1,94 @@
+"""
+Compact binary feature vectors cached in ml_features
+
+Each logged attack stores the nonzero TF-IDF features of its payload and the
+handcrafted counts from SQLInjectionClassifier.extract_features, so
+re-scoring and retraining can skip tokenization. A vector is only valid for
+the vectorizer that produced it, which ml_features.vectorizer_id records
+(CompiledVectorizer.digest).
+
+Layout, little-endian:
+
+    header   version u8, count fields u8, index width u8 (2 or 4), pad, nonzeros u32
+    counts   u32 per count field, in COUNT_FEATURES order
+    indices  u16 or u32 per nonzero, ascending
+    values   f32 per nonzero
+"""
+
+import struct
+import numpy as np
+from sqlalchemy import text
+
+FORMAT_VERSION = 1
+
+# Keys of SQLInjectionClassifier.extract_features, in storage order
+COUNT_FEATURES = (
+    'length', 'space_count', 'quote_count', 'semicolon_count', 'comment_count',
+    'union_count', 'select_count', 'or_count', 'and_count', 'equal_count'
+)
+
+_HEADER = struct.Struct('<BBBxI')
+
+INSERT_ML_FEATURES = text("""
+    INSERT INTO ml_features
+    (attack_log_id, feature_vector, vectorizer_id, prediction_score)
+    VALUES
+    (:attack_log_id, :feature_vector, :vectorizer_id, :prediction_score)
+""")
+
+
+def encode_features(indices, values, counts):
+    """
+    Pack one sparse vector and its counts into bytes
+
+    Args:
+        indices: Ascending feature indices of the nonzero TF-IDF values
+        values: TF-IDF values, stored as float32 (the forest compares float32 anyway)
+        counts: Dict of count features as returned by extract_features
+    """
+    indices = np.asarray(indices)
+    width = 2 if not len(indices) or indices.max() < 65536 else 4
+    return b''.join((
+        _HEADER.pack(FORMAT_VERSION, len(COUNT_FEATURES), width, len(indices)),
+        np.array([counts[name] for name in COUNT_FEATURES], dtype='<u4').tobytes(),
+        indices.astype('<u2' if width == 2 else '<u4').tobytes(),
+        np.asarray(values, dtype='<f4').tobytes(),
+    ))
+
+
+def decode_features(blob):
+    """
+    Unpack a vector written by encode_features
+
+    Returns:
+        tuple: (indices int32 array, values float32 array, counts uint32 array)
+    """
+    version, n_counts, width, nnz = _HEADER.unpack_from(blob)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported feature vector version {version}")
+    offset = _HEADER.size
+    counts = np.frombuffer(blob, dtype='<u4', count=n_counts, offset=offset)
+    offset += 4 * n_counts
+    indices = np.frombuffer(blob, dtype='<u2' if width == 2 else '<u4', count=nnz, offset=offset)
+    offset += width * nnz
+    values = np.frombuffer(blob, dtype='<f4', count=nnz, offset=offset)
+    return indices.astype(np.int32), values, counts
+
+
+def densify(decoded, n_features):
+    """Dense float32 TF-IDF matrix from decoded vectors"""
+    X = np.zeros((len(decoded), n_features), dtype=np.float32)
+    for row, (indices, values, _) in enumerate(decoded):
+        X[row, indices] = values
+    return X
+
+
+def to_csr(decoded, n_features):
+    """scipy CSR TF-IDF matrix from decoded vectors, for training"""
+    from scipy.sparse import csr_matrix
+    indptr = np.zeros(len(decoded) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(indices) for indices, _, _ in decoded])
+    indices = np.concatenate([d[0] for d in decoded]) if decoded else np.empty(0, dtype=np.int32)
+    values = np.concatenate([d[1] for d in decoded]) if decoded else np.empty(0, dtype=np.float32)
+    return csr_matrix((values, indices, indptr), shape=(len(decoded), n_features))
+
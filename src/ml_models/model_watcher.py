@@ -0,0 +1,116 @@
+"""
+Hot reload of versioned model artifacts
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime
+
+from .attack_classifier import SQLInjectionClassifier
+from .artifacts import current_version, read_manifest
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWatcher:
+    """
+    Polls the artifact directory's CURRENT file and swaps in new versions.
+
+    A new version is loaded completely on the watcher thread and only then
+    handed to the PredictionBatcher, so requests never see a half-loaded
+    model and batches already being scored finish on the old one. A version
+    that fails to load is logged and not retried until CURRENT changes again;
+    the running model stays in place.
+    """
+
+    def __init__(self, batcher, model_dir=None, interval=30.0):
+        """
+        Initialize the watcher
+
+        Args:
+            batcher: PredictionBatcher whose classifier is replaced
+            model_dir: Artifact directory (defaults to the classifier's)
+            interval: Seconds between checks of CURRENT; 0 disables polling
+        """
+        self.batcher = batcher
+        self.model_dir = model_dir or batcher.classifier.model_dir
+        self.interval = interval
+
+        self.reloads = 0
+        self.previous_version = None
+        self.last_check = None
+        self.last_error = None
+        self.failed_version = None
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+
+    def check(self):
+        """Load and swap in the version CURRENT names if it is new; return True if swapped"""
+        with self._lock:
+            self.last_check = datetime.now()
+            version = current_version(self.model_dir)
+            active = self.batcher.classifier
+            if version == active.version or version == self.failed_version:
+                return False
+
+            try:
+                classifier = SQLInjectionClassifier(cache_size=active.cache_size, model_dir=self.model_dir)
+            except Exception as e:
+                self.failed_version = version
+                self.last_error = f"{version}: {str(e)}"
+                logger.error(f"Error loading model version {version}: {str(e)}", exc_info=True)
+                return False
+
+            # CURRENT may have moved on while loading; serve what was loaded
+            previous = self.batcher.swap(classifier)
+            self.previous_version = previous.version
+            self.failed_version = None
+            self.last_error = None
+            self.reloads += 1
+            logger.info(f"Model {previous.version} replaced by {classifier.version} "
+                        f"(loaded in {classifier.load_seconds:.2f}s)")
+            return True
+
+    def _run(self):
+        """Polling loop"""
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Error checking for a new model: {str(e)}", exc_info=True)
+
+    def start(self):
+        """Start polling, restarting in forked child processes"""
+        if self.interval <= 0:
+            return
+        if self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='model-watcher')
+        self._thread_pid = os.getpid()
+        self._thread.start()
+
+    def close(self):
+        """Stop polling"""
+        self._stop.set()
+
+    def status(self):
+        """Active model version, when it was loaded and the watcher's counters"""
+        classifier = self.batcher.classifier
+        manifest = read_manifest(self.model_dir, classifier.version)
+        status = classifier.status()
+        status.update({
+            'model_dir': self.model_dir,
+            'created_at': manifest.get('created_at'),
+            'metrics': manifest.get('metrics'),
+            'previous_version': self.previous_version,
+            'reloads': self.reloads,
+            'reload_interval': self.interval,
+            'last_check': self.last_check.isoformat() if self.last_check else None,
+            'last_error': self.last_error,
+        })
+        return status
@@ -0,0 +1,125 @@
+"""
+Micro-batching front end for SQLInjectionClassifier risk predictions
+"""
+
+import os
+import queue
+import time
+import logging
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionBatcher:
+    """
+    Groups concurrent predict_risk calls into a single batched prediction.
+
+    Request threads enqueue their payload and wait on a future. A worker
+    thread drains the queue for at most ``max_wait_ms`` (or until
+    ``max_batch_size`` payloads are waiting) and scores the whole group with
+    one ``predict_risk_batch`` call. Cached payloads skip the queue entirely.
+    """
+
+    def __init__(self, classifier, max_batch_size=64, max_wait_ms=2.0, timeout=1.0):
+        """
+        Initialize the batcher
+
+        Args:
+            classifier: SQLInjectionClassifier used for scoring
+            max_batch_size: Largest number of payloads scored in one call
+            max_wait_ms: How long the worker waits to fill a batch; 0 disables batching
+            timeout: Seconds a caller waits for its batch before scoring inline
+        """
+        self.classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.timeout = timeout
+
+        self.batches = 0
+        self.batched_items = 0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    def _ensure_worker(self):
+        """Start the worker thread, restarting it in forked child processes"""
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._run, daemon=True, name='prediction-batcher')
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def swap(self, classifier):
+        """
+        Replace the classifier and return the previous one
+
+        A single attribute assignment: batches already being scored finish
+        with the classifier they started with, later ones use the new one.
+        """
+        previous = self.classifier
+        self.classifier = classifier
+        return previous
+
+    def predict_risk(self, input_data):
+        """Predict the risk score for input data, batching with concurrent callers"""
+        classifier = self.classifier
+        cached = classifier.cached_risk(input_data)
+        if cached is not None:
+            return cached
+
+        if self.max_wait <= 0:
+            return classifier.predict_risk(input_data)
+
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((input_data, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"Batched prediction unavailable, scoring inline: {str(e)}")
+            return classifier.predict_risk(input_data)
+
+    def _run(self):
+        """Collect queued payloads into batches and score them"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                scores = self.classifier.predict_risk_batch([item[0] for item in batch])
+                for (_, future), score in zip(batch, scores):
+                    future.set_result(score)
+            except Exception as e:
+                logger.error(f"Error in prediction batch: {str(e)}", exc_info=True)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            self.batches += 1
+            self.batched_items += len(batch)
+
+    def stats(self):
+        """Return batching and cache counters"""
+        stats = self.classifier.cache_stats()
+        stats.update({
+            'batches': self.batches,
+            'batched_items': self.batched_items,
+            'queued': self._queue.qsize()
+        })
+        return stats
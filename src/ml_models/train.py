@@ -0,0 +1,432 @@
+"""
+Explicit training pipeline for the SQL injection classifier
+
+Labeled payloads are streamed in chunks from attack_logs and from corpus
+files on disk, vectorized chunk by chunk into sparse rows and fitted with a
+random forest on all cores. attack_logs rows whose ml_features vector was
+cached by the same vectorizer are not tokenized again. The result is a new
+versioned artifact (see src.ml_models.artifacts) with a manifest recording
+the sources, holdout metrics, stage timings and memory use; CURRENT is
+pointed at it unless --no-activate is given.
+
+Corpus files hold one payload per line (--benign / --malicious) or JSON
+lines with "payload" and "label" fields, 1 for SQL injection (--corpus).
+Files ending in .gz are decompressed on the fly.
+
+    python -m src.ml_models.train --benign corpora/benign.txt.gz --malicious corpora/sqli.txt --jobs 8
+    python -m src.ml_models.train --refit-vectorizer --corpus corpora/labeled.jsonl --no-attack-logs
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import resource
+from datetime import datetime
+
+import joblib
+import numpy as np
+import sklearn
+from sqlalchemy import text
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from ..database import create_db_engine
+from .attack_classifier import preprocess_text
+from .compiled_model import CompiledVectorizer, CompiledForest, CompiledSQLiModel
+from .feature_store import decode_features, to_csr
+from .artifacts import (
+    MODEL_FILE, VECTORIZER_FILE, COMPILED_DIR, MANIFEST_FILE,
+    default_model_dir, new_version, version_dir, current_version, activate
+)
+
+logger = logging.getLogger(__name__)
+
+# Payloads the bundled model was trained on, added with --seed
+SEED_BENIGN = [
+    "SELECT * FROM users WHERE id = 1",
+    "SELECT name, price FROM products WHERE category = 'electronics'",
+    "INSERT INTO orders (user_id, product_id) VALUES (1, 2)",
+    "UPDATE users SET name = 'John' WHERE id = 1",
+    "DELETE FROM cart WHERE user_id = 1"
+]
+
+SEED_MALICIOUS = [
+    "SELECT * FROM users WHERE id = 1 OR 1=1",
+    "SELECT * FROM users WHERE username = '' OR '1'='1'",
+    "SELECT * FROM users WHERE id = 1; DROP TABLE users;",
+    "SELECT * FROM users UNION SELECT * FROM admin",
+    "' OR '1'='1' --",
+    "admin' --",
+    "1'; DROP TABLE users; --",
+    "1' UNION SELECT username, password FROM users --",
+    "1' OR '1' = '1",
+    "' OR 1=1 #",
+    "' OR 'x'='x",
+    "1' AND 1=(SELECT COUNT(*) FROM tabname); --"
+]
+
+# The compiled forest walks every tree for max_depth steps, so keep it bounded
+MAX_DEPTH = 10
+
+# Holdout rows checked for compiled/sklearn parity
+PARITY_ROWS = 2000
+
+
+class Source:
+    """A stream of (payload, label, cached vector bytes or None) chunks"""
+
+    def __init__(self, name, chunks):
+        self.name = name
+        self._chunks = chunks
+        self.rows = 0
+        self.cached = 0
+        self.tokenized = 0
+
+    def chunks(self, vectorizer_id=None):
+        return self._chunks(vectorizer_id)
+
+    def stats(self):
+        return {'name': self.name, 'rows': self.rows, 'cached': self.cached, 'tokenized': self.tokenized}
+
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def iter_lines(path, label, chunk_size=10000):
+    """Yield chunks of (payload, label, None) from a file with one payload per line"""
+    chunk = []
+    with _open_text(path) as f:
+        for line in f:
+            payload = line.rstrip('\r\n')
+            if not payload.strip():
+                continue
+            chunk.append((payload, label, None))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_labeled(path, chunk_size=10000):
+    """Yield chunks of (payload, label, None) from JSON lines with payload and label"""
+    chunk = []
+    with _open_text(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                chunk.append((str(record['payload']), int(bool(record['label'])), None))
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"{path}:{number}: skipping line without payload and label")
+                continue
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_attack_logs(db, vectorizer_id=None, chunk_size=10000, start=None, end=None):
+    """
+    Yield chunks of (request_data, is_malicious, cached vector) from attack_logs
+
+    One keyset query per chunk; the ml_features vector is only joined when it
+    was produced by ``vectorizer_id``.
+    """
+    conditions = ["a.id > :after_id", "a.request_data IS NOT NULL"]
+    params = {'chunk_size': chunk_size, 'vectorizer_id': vectorizer_id}
+    if start is not None:
+        conditions.append("a.timestamp >= :start")
+        params['start'] = start
+    if end is not None:
+        conditions.append("a.timestamp < :end")
+        params['end'] = end
+    query = text(f"""
+        SELECT a.id, a.request_data, a.is_malicious, f.feature_vector
+        FROM attack_logs a
+        LEFT JOIN ml_features f ON f.attack_log_id = a.id AND f.vectorizer_id = :vectorizer_id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY a.id
+        LIMIT :chunk_size
+    """)
+    after_id = 0
+    while True:
+        params['after_id'] = after_id
+        with db.connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        if not rows:
+            return
+        yield [(row[1], int(bool(row[2])), row[3]) for row in rows]
+        after_id = rows[-1][0]
+
+
+class Reservoir:
+    """Uniform random sample of at most ``max_size`` items from a stream"""
+
+    def __init__(self, max_size, seed=42):
+        self.max_size = max_size
+        self.items = []
+        self.seen = 0
+        self._random = random.Random(seed)
+
+    def add(self, item):
+        self.seen += 1
+        if len(self.items) < self.max_size:
+            self.items.append(item)
+            return
+        slot = self._random.randrange(self.seen)
+        if slot < self.max_size:
+            self.items[slot] = item
+
+
+def fit_vocabulary(sources, sample_size, max_features):
+    """Fit a new TF-IDF vocabulary on a uniform sample of every source's payloads"""
+    sample = Reservoir(sample_size)
+    for source in sources:
+        for chunk in source.chunks():
+            for payload, _, _ in chunk:
+                sample.add(preprocess_text(payload))
+    vectorizer = TfidfVectorizer(max_features=max_features, ngram_range=(1, 3), analyzer='char')
+    vectorizer.fit(sample.items)
+    return vectorizer
+
+
+def collect_rows(sources, vectorizer, max_samples):
+    """
+    Vectorize every source chunk by chunk into a reservoir of sparse rows
+
+    Returns:
+        Reservoir of (indices, values, label) items
+    """
+    compiled = CompiledVectorizer.from_sklearn(vectorizer)
+    vectorizer_id = compiled.digest
+    rows = Reservoir(max_samples)
+    for source in sources:
+        for chunk in source.chunks(vectorizer_id):
+            for payload, label, cached in chunk:
+                if cached is not None:
+                    indices, values, _ = decode_features(bytes(cached))
+                    source.cached += 1
+                else:
+                    indices, values = compiled.transform_sparse(preprocess_text(payload))
+                    values = values.astype(np.float32)
+                    source.tokenized += 1
+                source.rows += 1
+                rows.add((indices, values, label))
+            logger.info(f"{source.name}: {source.rows:,} rows ({source.cached:,} from cached vectors)")
+    return rows
+
+
+def split_matrix(items, n_features, holdout, seed=42):
+    """Shuffle rows into train and holdout CSR matrices and label arrays"""
+    order = np.random.default_rng(seed).permutation(len(items))
+    n_holdout = int(len(items) * holdout)
+    parts = []
+    for part in (order[n_holdout:], order[:n_holdout]):
+        rows = [items[i] for i in part]
+        X = to_csr([(indices, values, None) for indices, values, _ in rows], n_features)
+        parts.append((X, np.asarray([label for _, _, label in rows], dtype=int)))
+    return parts
+
+
+def holdout_metrics(forest, X, y):
+    """Accuracy, precision and recall on the holdout rows"""
+    if not len(y):
+        return {}
+    predicted = forest.predict(X)
+    true_positive = int(np.sum((predicted == 1) & (y == 1)))
+    return {
+        'rows': int(len(y)),
+        'accuracy': float(np.mean(predicted == y)),
+        'precision': true_positive / max(1, int(np.sum(predicted == 1))),
+        'recall': true_positive / max(1, int(np.sum(y == 1))),
+    }
+
+
+def check_parity(compiled, forest, X):
+    """Largest difference between compiled and sklearn probabilities on rows of X"""
+    X = X[:PARITY_ROWS]
+    if X.shape[0] == 0:
+        return 0.0
+    expected = forest.predict_proba(X)[:, list(forest.classes_).index(1)]
+    actual = compiled.forest.predict_proba(X.toarray())
+    return float(np.abs(expected - actual).max())
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def write_artifact(model_dir, vectorizer, forest, compiled, manifest):
+    """Write a new version directory, renamed into place once complete"""
+    version = manifest['version']
+    final_dir = version_dir(model_dir, version)
+    tmp_dir = final_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    joblib.dump(forest, os.path.join(tmp_dir, MODEL_FILE))
+    joblib.dump(vectorizer, os.path.join(tmp_dir, VECTORIZER_FILE))
+    # Written after the pickles so the classifier sees it as current
+    compiled.save_dir(os.path.join(tmp_dir, COMPILED_DIR))
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.rename(tmp_dir, final_dir)
+    return final_dir
+
+
+def train(sources, model_dir, refit_vectorizer=False, vocabulary_sample=200000, max_features=1000,
+          max_samples=1000000, holdout=0.1, n_estimators=100, n_jobs=-1):
+    """
+    Run the pipeline and write a new artifact version
+
+    Returns:
+        dict: The artifact's manifest
+    """
+    started = time.perf_counter()
+    timings = {}
+
+    stage = time.perf_counter()
+    if refit_vectorizer:
+        vectorizer = fit_vocabulary(sources, vocabulary_sample, max_features)
+    else:
+        # Keep the active vocabulary so cached ml_features vectors stay usable
+        active = version_dir(model_dir, current_version(model_dir))
+        vectorizer = joblib.load(os.path.join(active, VECTORIZER_FILE))
+    n_features = len(vectorizer.vocabulary_)
+    timings['vocabulary'] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    rows = collect_rows(sources, vectorizer, max_samples)
+    (X_train, y_train), (X_holdout, y_holdout) = split_matrix(rows.items, n_features, holdout)
+    del rows
+    timings['featurize'] = time.perf_counter() - stage
+    classes = set(np.unique(y_train).tolist())
+    if classes != {0, 1}:
+        raise ValueError(f"Training needs benign and malicious samples, got labels {sorted(classes)}; "
+                         f"add a --benign corpus (attack_logs only holds attacks)")
+    logger.info(f"Fitting {n_estimators} trees on {X_train.shape[0]:,} rows "
+                f"({X_train.nnz:,} nonzeros), {X_holdout.shape[0]:,} held out")
+
+    stage = time.perf_counter()
+    forest = RandomForestClassifier(n_estimators=n_estimators, max_depth=MAX_DEPTH,
+                                    n_jobs=n_jobs, random_state=42)
+    forest.fit(X_train, y_train)
+    timings['fit'] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    compiled = CompiledSQLiModel(CompiledVectorizer.from_sklearn(vectorizer), CompiledForest.from_sklearn(forest))
+    divergence = check_parity(compiled, forest, X_holdout if X_holdout.shape[0] else X_train)
+    if divergence > 1e-9:
+        raise RuntimeError(f"Compiled model diverges from sklearn by {divergence}")
+    metrics = holdout_metrics(forest, X_holdout, y_holdout)
+    timings['compile'] = time.perf_counter() - stage
+
+    matrix_bytes = sum(X.data.nbytes + X.indices.nbytes + X.indptr.nbytes for X in (X_train, X_holdout))
+    manifest = {
+        'version': new_version(),
+        'created_at': datetime.now().isoformat(),
+        'vectorizer_id': compiled.vectorizer.digest,
+        'vectorizer_refit': refit_vectorizer,
+        'n_features': n_features,
+        'params': {
+            'n_estimators': n_estimators, 'max_depth': MAX_DEPTH, 'n_jobs': n_jobs,
+            'max_samples': max_samples, 'holdout': holdout,
+        },
+        'sources': [source.stats() for source in sources],
+        'samples': {
+            'train': int(X_train.shape[0]),
+            'holdout': int(X_holdout.shape[0]),
+            'malicious': int(y_train.sum() + y_holdout.sum()),
+            'benign': int(len(y_train) + len(y_holdout) - y_train.sum() - y_holdout.sum()),
+        },
+        'metrics': metrics,
+        'timings': timings,
+        'memory': {'matrix_bytes': int(matrix_bytes), 'peak_rss_bytes': peak_rss_bytes()},
+        'libraries': {'sklearn': sklearn.__version__, 'numpy': np.__version__},
+    }
+
+    timings['total'] = time.perf_counter() - started
+    os.makedirs(model_dir, exist_ok=True)
+    write_artifact(model_dir, vectorizer, forest, compiled, manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a new SQL injection model version",
+                                     epilog=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db-url', help="Database URL (defaults to HONEYPOT_DB_URL)")
+    parser.add_argument('--no-attack-logs', action='store_true', help="Do not train on attack_logs")
+    parser.add_argument('--start', type=datetime.fromisoformat, help="Only attacks from this timestamp (ISO format)")
+    parser.add_argument('--end', type=datetime.fromisoformat, help="Only attacks before this timestamp (ISO format)")
+    parser.add_argument('--benign', action='append', default=[], help="File of benign payloads, one per line")
+    parser.add_argument('--malicious', action='append', default=[], help="File of SQL injection payloads, one per line")
+    parser.add_argument('--corpus', action='append', default=[], help="JSON lines with payload and label")
+    parser.add_argument('--seed', action='store_true', help="Add the samples the bundled model was trained on")
+    parser.add_argument('--model-dir', default=default_model_dir(), help="Artifact directory (default: HONEYPOT_MODEL_DIR)")
+    parser.add_argument('--refit-vectorizer', action='store_true',
+                        help="Fit a new vocabulary (cached ml_features vectors are then not reused)")
+    parser.add_argument('--vocabulary-sample', type=int, default=200000, help="Payloads sampled to fit the vocabulary")
+    parser.add_argument('--max-features', type=int, default=1000)
+    parser.add_argument('--max-samples', type=int, default=1000000, help="Rows kept for fitting, sampled uniformly")
+    parser.add_argument('--holdout', type=float, default=0.1, help="Fraction of rows held out for metrics")
+    parser.add_argument('--trees', type=int, default=100)
+    parser.add_argument('--jobs', type=int, default=-1, help="Parallel tree fitting jobs (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="Rows read per chunk")
+    parser.add_argument('--no-activate', action='store_true', help="Do not point CURRENT at the new version")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    chunk_size = args.chunk_size
+    sources = []
+    if not args.no_attack_logs:
+        db = create_db_engine(args.db_url)
+        sources.append(Source('attack_logs', lambda vectorizer_id: iter_attack_logs(
+            db, vectorizer_id, chunk_size, args.start, args.end)))
+    for path in args.benign:
+        sources.append(Source(path, lambda _, path=path: iter_lines(path, 0, chunk_size)))
+    for path in args.malicious:
+        sources.append(Source(path, lambda _, path=path: iter_lines(path, 1, chunk_size)))
+    for path in args.corpus:
+        sources.append(Source(path, lambda _, path=path: iter_labeled(path, chunk_size)))
+    if args.seed:
+        seed = [(payload, 0, None) for payload in SEED_BENIGN] + [(payload, 1, None) for payload in SEED_MALICIOUS]
+        sources.append(Source('seed', lambda _: iter([seed])))
+    if not sources:
+        parser.error("no training data: give corpora or leave attack_logs enabled")
+
+    try:
+        manifest = train(
+            sources, args.model_dir, refit_vectorizer=args.refit_vectorizer,
+            vocabulary_sample=args.vocabulary_sample, max_features=args.max_features,
+            max_samples=args.max_samples, holdout=args.holdout, n_estimators=args.trees,
+            n_jobs=args.jobs
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    timings = ', '.join(f"{stage} {seconds:.1f}s" for stage, seconds in manifest['timings'].items())
+    logger.info(f"Model {manifest['version']}: {manifest['samples']['train']:,} training rows, "
+                f"holdout {manifest['metrics']}; {timings}; "
+                f"peak RSS {manifest['memory']['peak_rss_bytes'] / 1e6:,.0f} MB")
+    if not args.no_activate:
+        activate(args.model_dir, manifest['version'])
+        logger.info(f"Activated {manifest['version']} in {args.model_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+"""
+Append-only risk score history backed by SQLite in WAL mode
+
+Each assessment becomes one small row of (timestamp, risk_score, severity)
+indexed by time. The rest of the report is stored once per distinct body in
+a separate table, so repeated details are not duplicated. Appends are single
+transactions, which makes them atomic, and WAL lets readers query while the
+monitor thread writes.
+
+The database lives in the data directory (HONEYPOT_DATA_DIR, by default
+``$XDG_DATA_HOME/honeypot``), outside the source tree. An existing
+risk_history.json is imported on first use and renamed to
+``risk_history.json.migrated``.
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILE = 'risk_history.db'
+DEFAULT_LEGACY_JSON = 'risk_history.json'
+
+SUMMARY_FIELDS = ('timestamp', 'risk_score', 'severity')
+
+# Days of history kept by prune_expired
+DEFAULT_RETENTION_DAYS = 30
+
+# Seconds between the deletes prune_expired actually runs
+PRUNE_INTERVAL = 3600
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS risk_history (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        risk_score REAL NOT NULL,
+        severity TEXT,
+        details_id INTEGER REFERENCES risk_details(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_risk_history_ts ON risk_history (ts);
+    CREATE TABLE IF NOT EXISTS risk_details (
+        id INTEGER PRIMARY KEY,
+        digest BLOB NOT NULL UNIQUE,
+        body TEXT NOT NULL
+    );
+"""
+
+INSERT_HISTORY = "INSERT INTO risk_history (ts, risk_score, severity, details_id) VALUES (?, ?, ?, ?)"
+
+
+def default_data_dir():
+    """Directory for runtime state such as the risk history, overridable with HONEYPOT_DATA_DIR"""
+    data_home = os.getenv('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.getenv('HONEYPOT_DATA_DIR', os.path.join(data_home, 'honeypot'))
+
+
+def _to_epoch(timestamp):
+    """Convert an ISO timestamp, datetime or None (now) to epoch seconds"""
+    if timestamp is None:
+        return datetime.now().timestamp()
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    return datetime.fromisoformat(str(timestamp)).timestamp()
+
+
+class RiskHistoryStore:
+    """Time-indexed store of assessment risk scores"""
+
+    def __init__(self, path=None, legacy_json=DEFAULT_LEGACY_JSON,
+                 retention_days=DEFAULT_RETENTION_DAYS):
+        """
+        Open (or create) the store
+
+        Args:
+            path: SQLite database file (default: risk_history.db in the data directory)
+            legacy_json: risk_history.json to import when the store is empty,
+                or None to skip the migration
+            retention_days: Days of reports prune_expired keeps, or None to keep all
+        """
+        self.path = path or os.path.join(default_data_dir(), HISTORY_FILE)
+        self.retention_days = retention_days
+        self._last_prune = None
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+        if legacy_json and os.path.exists(legacy_json):
+            try:
+                self.migrate_json(legacy_json)
+            except Exception as e:
+                logger.error(f"Error migrating {legacy_json}: {str(e)}", exc_info=True)
+
+    def _connect(self):
+        """Return this thread's connection, reopening it in forked children"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _store_details(self, conn, details):
+        """Insert a details body once and return its id"""
+        body = json.dumps(details, sort_keys=True, separators=(',', ':'), default=str)
+        digest = hashlib.blake2b(body.encode('utf-8'), digest_size=16).digest()
+        conn.execute(
+            "INSERT OR IGNORE INTO risk_details (digest, body) VALUES (?, ?)", (digest, body)
+        )
+        return conn.execute("SELECT id FROM risk_details WHERE digest = ?", (digest,)).fetchone()[0]
+
+    def _rows_for(self, conn, reports):
+        """Build risk_history rows for reports, storing their details"""
+        rows = []
+        for report in reports:
+            details = {k: v for k, v in report.items() if k not in SUMMARY_FIELDS}
+            details_id = self._store_details(conn, details) if details else None
+            rows.append((
+                _to_epoch(report.get('timestamp')),
+                float(report.get('risk_score') or 0.0),
+                report.get('severity'),
+                details_id
+            ))
+        return rows
+
+    def append(self, report):
+        """Append one assessment report atomically"""
+        self.extend([report])
+
+    def extend(self, reports):
+        """Append several reports in one transaction"""
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(INSERT_HISTORY, self._rows_for(conn, reports))
+
+    def range(self, start=None, end=None, limit=None, with_details=False):
+        """
+        Return reports between start and end (inclusive), oldest first
+
+        Args:
+            start, end: ISO strings, datetimes or epoch seconds; None is unbounded
+            limit: Return only the most recent ``limit`` matching reports
+            with_details: Include the stored report body in each entry
+        """
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("h.ts >= ?")
+            params.append(_to_epoch(start))
+        if end is not None:
+            clauses.append("h.ts <= ?")
+            params.append(_to_epoch(end))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        body = "d.body" if with_details else "NULL"
+        join = "LEFT JOIN risk_details d ON d.id = h.details_id" if with_details else ""
+
+        query = f"""
+            SELECT h.ts, h.risk_score, h.severity, {body}
+            FROM risk_history h {join}
+            {where}
+            ORDER BY h.ts DESC, h.id DESC
+        """
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+
+        rows = self._connect().execute(query, params).fetchall()
+        entries = []
+        for ts, risk_score, severity, details in reversed(rows):
+            entry = json.loads(details) if details else {}
+            entry.update({
+                'timestamp': datetime.fromtimestamp(ts).isoformat(),
+                'risk_score': risk_score,
+                'severity': severity
+            })
+            entries.append(entry)
+        return entries
+
+    def latest(self, n, with_details=False):
+        """Return the ``n`` most recent reports, oldest first"""
+        return self.range(limit=n, with_details=with_details)
+
+    def count(self):
+        """Number of stored reports"""
+        return self._connect().execute("SELECT COUNT(*) FROM risk_history").fetchone()[0]
+
+    def prune(self, before):
+        """Delete reports older than ``before`` along with unreferenced details"""
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                deleted = conn.execute(
+                    "DELETE FROM risk_history WHERE ts < ?", (_to_epoch(before),)
+                ).rowcount
+                conn.execute("""
+                    DELETE FROM risk_details
+                    WHERE id NOT IN (SELECT details_id FROM risk_history WHERE details_id IS NOT NULL)
+                """)
+        return deleted
+
+    def prune_expired(self, now=None):
+        """
+        Apply the retention period, at most once per PRUNE_INTERVAL
+
+        Called after appends; returns the number of reports deleted.
+        """
+        if not self.retention_days:
+            return 0
+        now = datetime.now() if now is None else now
+        if self._last_prune is not None and (now - self._last_prune).total_seconds() < PRUNE_INTERVAL:
+            return 0
+        self._last_prune = now
+        deleted = self.prune(now - timedelta(days=self.retention_days))
+        if deleted:
+            logger.info(f"Pruned {deleted} risk history entries older than {self.retention_days} days")
+        return deleted
+
+    def migrate_json(self, json_path):
+        """
+        Import a legacy risk_history.json into an empty store and retire the file
+
+        A store that already has history is left alone, and so is the file,
+        so nothing is renamed without having been imported.
+        """
+        imported = None
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                # Serialise concurrent first starts so the history is imported once
+                conn.execute('BEGIN IMMEDIATE')
+                if not os.path.exists(json_path):
+                    return 0
+                if conn.execute("SELECT COUNT(*) FROM risk_history").fetchone()[0] == 0:
+                    with open(json_path, 'r') as f:
+                        history = [entry for entry in json.load(f) if isinstance(entry, dict)]
+                    conn.executemany(INSERT_HISTORY, self._rows_for(conn, history))
+                    imported = len(history)
+        if imported is None:
+            logger.warning(f"Not importing {json_path}: {self.path} already has history. "
+                           f"Move the file away once it is no longer needed")
+            return 0
+        try:
+            os.replace(json_path, json_path + '.migrated')
+        except FileNotFoundError:
+            pass
+        logger.info(f"Migrated {imported} entries from {json_path} to {self.path}")
+        return imported
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -26,7 +26,7 @@ CREATE TABLE IF NOT EXISTS products (
 -- Create attack_logs table
 CREATE TABLE IF NOT EXISTS attack_logs (
     id INT AUTO_INCREMENT PRIMARY KEY,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     source_ip VARCHAR(45) NOT NULL,
     request_method VARCHAR(10),
     request_path TEXT CHARACTER SET utf8mb4,
@@ -38,14 +38,44 @@ CREATE TABLE IF NOT EXISTS attack_logs (
     user_agent TEXT CHARACTER SET utf8mb4,
     headers MEDIUMTEXT CHARACTER SET utf8mb4,
     response_code INT,
-    is_malicious BOOLEAN
+    is_malicious BOOLEAN,
+    payload_fingerprint CHAR(16),
+    -- Dashboard queries: 24h severity stats, latest events, per-IP and per-score lookups
+    INDEX idx_attack_logs_timestamp_risk (timestamp, risk_score),
+    INDEX idx_attack_logs_source_ip_timestamp (source_ip, timestamp),
+    INDEX idx_attack_logs_risk_timestamp (risk_score, timestamp),
+    INDEX idx_attack_logs_fingerprint_timestamp (payload_fingerprint, timestamp),
+    -- Keyset pagination of the events API: ORDER BY timestamp DESC, id DESC
+    INDEX idx_attack_logs_timestamp_id (timestamp, id)
 ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 
+-- Occurrences of each payload fingerprint per source IP and repeat window;
+-- repeats within a window are counted here instead of logged in full
+CREATE TABLE IF NOT EXISTS attack_fingerprint_counts (
+    source_ip VARCHAR(45) NOT NULL,
+    payload_fingerprint CHAR(16) NOT NULL,
+    window_start DATETIME NOT NULL,
+    first_seen DATETIME NOT NULL,
+    last_seen DATETIME NOT NULL,
+    hit_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (source_ip, payload_fingerprint, window_start),
+    INDEX idx_attack_fingerprint_counts_last_seen (last_seen)
+);
+
+-- Per-minute attack counts by severity, maintained as attacks are logged
+CREATE TABLE IF NOT EXISTS attack_severity_rollup (
+    minute DATETIME NOT NULL,
+    severity VARCHAR(10) NOT NULL,
+    event_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (minute, severity)
+);
+
 -- Create ml_features table
 CREATE TABLE IF NOT EXISTS ml_features (
     id INT AUTO_INCREMENT PRIMARY KEY,
     attack_log_id INT,
-    feature_vector TEXT,
+    feature_vector BLOB,
+    vectorizer_id CHAR(16),
     prediction_score FLOAT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (attack_log_id) REFERENCES attack_logs(id)
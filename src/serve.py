@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Production entry point for the honeypot, served by gunicorn.
+
+The app is built once in the gunicorn master (preload), so the ML model and
+the compiled detection rules are loaded before forking and shared
+copy-on-write by every worker. Each worker then joins an election on a lock
+file so the system monitor runs in exactly one of them.
+
+    python -m src.serve --workers 4 --threads 8 --bind 0.0.0.0:9000
+"""
+
+import gc
+import os
+import logging
+import argparse
+from dotenv import load_dotenv
+from gunicorn.app.base import BaseApplication
+
+from src.honeypot.web_honeypot import SQLInjectionHoneypot
+
+logger = logging.getLogger(__name__)
+
+
+class HoneypotApplication(BaseApplication):
+    """gunicorn application that preloads one SQLInjectionHoneypot for all workers"""
+
+    def __init__(self, options, monitor_lock_path):
+        self.options = options
+        self.monitor_lock_path = monitor_lock_path
+        self.honeypot = None
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+        self.cfg.set('preload_app', True)
+        self.cfg.set('post_fork', self.post_fork)
+
+    def load(self):
+        if self.honeypot is None:
+            self.honeypot = SQLInjectionHoneypot(start_monitoring=False, lazy_startup=False)
+
+            # Connections opened in the master must not be shared by the workers
+            self.honeypot.db.dispose()
+
+            # Keep the loaded model and rules out of the collector's reach so
+            # reference-count updates do not copy their pages in every worker
+            gc.freeze()
+        return self.honeypot.app
+
+    def post_fork(self, server, worker):
+        self.honeypot.start_monitoring(lock_path=self.monitor_lock_path)
+        self.honeypot.attackers.start()
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Run the honeypot under gunicorn")
+    parser.add_argument('--bind', default=f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '9000')}")
+    parser.add_argument('--workers', type=int, default=int(os.getenv('HONEYPOT_WORKERS', os.cpu_count() or 1)))
+    parser.add_argument('--threads', type=int, default=int(os.getenv('HONEYPOT_THREADS', '8')))
+    parser.add_argument('--timeout', type=int, default=30)
+    parser.add_argument('--monitor-lock', default=os.getenv('HSIEM_MONITOR_LOCK', 'system_monitor.lock'),
+                        help="Lock file used to elect the worker that runs the system monitor")
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'timeout': args.timeout,
+        'loglevel': args.log_level,
+        'accesslog': '-',
+    }
+    logger.info(f"Starting honeypot with {args.workers} workers x {args.threads} threads on {args.bind}")
+    HoneypotApplication(options, os.path.abspath(args.monitor_lock)).run()
+
+
+if __name__ == '__main__':
+    main()
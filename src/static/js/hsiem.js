@@ -10,6 +10,8 @@ document.addEventListener('DOMContentLoaded', function() {
     refreshEvents();
     refreshSystemStatus();
     refreshVulnerabilityAssessment();
+    refreshRiskTrend();
+    refreshFingerprints();
 });
 
 // Refresh events table
@@ -43,6 +45,92 @@ function refreshVulnerabilityAssessment() {
         .catch(error => console.error('Error fetching vulnerability assessment:', error));
 }
 
+// Refresh risk trend chart from the downsampled JSON series.
+// Without Chart.js the server-rendered PNG stays visible instead.
+let riskTrendChart = null;
+
+function refreshRiskTrend() {
+    if (typeof Chart === 'undefined') {
+        return;
+    }
+    fetch('/api/hsiem/trend/data?points=300')
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            updateRiskTrend(data);
+        })
+        .catch(error => console.error('Error fetching risk trend:', error));
+}
+
+function updateRiskTrend(data) {
+    const labels = data.timestamps.map(ts => new Date(ts).toLocaleTimeString());
+    if (riskTrendChart) {
+        riskTrendChart.data.labels = labels;
+        riskTrendChart.data.datasets[0].data = data.scores;
+        riskTrendChart.update();
+        return;
+    }
+
+    const canvas = document.getElementById('risk-trend-chart');
+    riskTrendChart = new Chart(canvas, {
+        type: 'line',
+        data: {
+            labels: labels,
+            datasets: [{
+                label: 'Risk Score',
+                data: data.scores,
+                borderColor: 'darkorange',
+                pointRadius: 2,
+                tension: 0
+            }]
+        },
+        options: {
+            animation: false,
+            scales: {y: {min: 0, max: 1}}
+        }
+    });
+    canvas.classList.remove('d-none');
+    document.getElementById('risk-trend-img').classList.add('d-none');
+}
+
+// Refresh the most repeated payload fingerprints
+function refreshFingerprints() {
+    fetch('/api/hsiem/fingerprints')
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            updateFingerprintsTable(data.fingerprints);
+        })
+        .catch(error => console.error('Error fetching payload fingerprints:', error));
+}
+
+function updateFingerprintsTable(fingerprints) {
+    const tbody = document.getElementById('fingerprints-table');
+    tbody.innerHTML = '';
+
+    fingerprints.forEach(fingerprint => {
+        const row = document.createElement('tr');
+        [
+            fingerprint.payload_fingerprint,
+            fingerprint.hits,
+            fingerprint.source_ips,
+            new Date(fingerprint.last_seen).toLocaleString(),
+            fingerprint.sample || ''
+        ].forEach(value => {
+            const cell = document.createElement('td');
+            cell.textContent = value;
+            row.appendChild(cell);
+        });
+        row.lastChild.className = 'text-truncate';
+        row.lastChild.style.maxWidth = '20rem';
+        tbody.appendChild(row);
+    });
+}
+
 // Show event details in modal
 function showDetails(eventId) {
     fetch(`/api/hsiem/events/${eventId}`)
@@ -199,4 +287,6 @@ setInterval(() => {
     refreshEvents();
     refreshSystemStatus();
     refreshVulnerabilityAssessment();
+    refreshRiskTrend();
+    refreshFingerprints();
 }, 30000); 
\ No newline at end of file
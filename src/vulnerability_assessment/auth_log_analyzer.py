@@ -0,0 +1,154 @@
+"""
+Incremental auth.log analysis with per-IP sliding-window counters
+"""
+
+import re
+import time
+import logging
+import threading
+from collections import deque, namedtuple, Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+FAILED_PASSWORD = 'failed_password'
+SUDO_FAILURE = 'sudo_failure'
+AUTH_FAILURE = 'auth_failure'
+
+EVENT_KINDS = (FAILED_PASSWORD, SUDO_FAILURE, AUTH_FAILURE)
+
+# Example lines (Debian/Ubuntu auth.log):
+#   sshd[812]: Failed password for invalid user admin from 203.0.113.7 port 50122 ssh2
+#   sudo: pam_unix(sudo:auth): authentication failure; logname=bob uid=1000 ... user=bob
+#   sshd[812]: pam_unix(sshd:auth): authentication failure; ... rhost=203.0.113.7  user=root
+_FAILED_PASSWORD = re.compile(
+    r'Failed password for (?:invalid user )?(?P<user>\S*) from (?P<ip>[0-9A-Fa-f.:]+)'
+)
+_PAM_FIELD = re.compile(r'\b(?P<key>ruser|rhost|user)=(?P<value>\S*)')
+
+AuthEvent = namedtuple('AuthEvent', ['kind', 'source_ip', 'user', 'observed_at'])
+
+
+def parse_auth_line(line, observed_at=None):
+    """Parse one auth.log line into an AuthEvent, or None if it is not a failure"""
+    if 'Failed password' in line:
+        match = _FAILED_PASSWORD.search(line)
+        if match:
+            return AuthEvent(FAILED_PASSWORD, match.group('ip'), match.group('user') or None,
+                             observed_at)
+        return AuthEvent(FAILED_PASSWORD, None, None, observed_at)
+
+    if 'authentication failure' in line:
+        fields = {m.group('key'): m.group('value') for m in _PAM_FIELD.finditer(line)}
+        kind = SUDO_FAILURE if 'sudo' in line else AUTH_FAILURE
+        return AuthEvent(kind, fields.get('rhost') or None,
+                         fields.get('user') or fields.get('ruser') or None, observed_at)
+    return None
+
+
+class AuthLogAnalyzer:
+    """
+    Consumes new auth.log lines and keeps failure counts over a sliding window.
+
+    Each line is parsed once when it is fed in. Events are kept in arrival
+    order and counted per kind and per (source IP, kind); events older than
+    ``window_seconds`` are evicted on every feed or summary, so reading the
+    aggregates never rescans log text. Event times are the time a line was
+    fed, since syslog timestamps carry no year or zone.
+    """
+
+    def __init__(self, window_seconds=3600, max_events=100000, top_n=20):
+        """
+        Initialize the analyzer
+
+        Args:
+            window_seconds: Length of the sliding window
+            max_events: Upper bound on events kept in the window
+            top_n: Number of source IPs reported in summaries
+        """
+        self.window_seconds = window_seconds
+        self.max_events = max_events
+        self.top_n = top_n
+        self.lines_seen = 0
+
+        self._events = deque()
+        self._by_kind = Counter()
+        self._unattributed = Counter()
+        self._by_ip = defaultdict(Counter)
+        self._users_by_ip = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def feed(self, lines, now=None):
+        """Parse and count new log lines, returning how many were failures"""
+        now = time.time() if now is None else now
+        added = 0
+        with self._lock:
+            for line in lines:
+                self.lines_seen += 1
+                event = parse_auth_line(line, now)
+                if event is None:
+                    continue
+                self._events.append(event)
+                self._count(event, 1)
+                added += 1
+            self._evict(now)
+        return added
+
+    def _count(self, event, delta):
+        """Apply one event to the aggregate counters"""
+        self._by_kind[event.kind] += delta
+        if event.source_ip is None:
+            self._unattributed[event.kind] += delta
+            return
+        per_ip = self._by_ip[event.source_ip]
+        per_ip[event.kind] += delta
+        if event.user is not None:
+            self._users_by_ip[event.source_ip][event.user] += delta
+
+        if delta < 0:
+            if per_ip[event.kind] <= 0:
+                del per_ip[event.kind]
+            if not per_ip:
+                del self._by_ip[event.source_ip]
+                self._users_by_ip.pop(event.source_ip, None)
+            elif event.user is not None:
+                users = self._users_by_ip[event.source_ip]
+                if users[event.user] <= 0:
+                    del users[event.user]
+
+    def _evict(self, now):
+        """Drop events that left the window or exceed max_events"""
+        cutoff = now - self.window_seconds
+        events = self._events
+        while events and (events[0].observed_at < cutoff or len(events) > self.max_events):
+            self._count(events.popleft(), -1)
+
+    def counts(self, now=None):
+        """Return the number of failures per kind in the window"""
+        with self._lock:
+            self._evict(time.time() if now is None else now)
+            return {kind: self._by_kind[kind] for kind in EVENT_KINDS}
+
+    def summary(self, now=None):
+        """Return window totals and the source IPs with the most failures"""
+        with self._lock:
+            self._evict(time.time() if now is None else now)
+            top_ips = sorted(self._by_ip.items(), key=lambda item: -sum(item[1].values()))
+            return {
+                'window_seconds': self.window_seconds,
+                'lines_seen': self.lines_seen,
+                'totals': {kind: self._by_kind[kind] for kind in EVENT_KINDS},
+                'unattributed': {kind: self._unattributed[kind] for kind in EVENT_KINDS},
+                'distinct_sources': {
+                    kind: sum(1 for kinds in self._by_ip.values() if kinds[kind])
+                    for kind in EVENT_KINDS
+                },
+                'source_ips': [
+                    {
+                        'source_ip': ip,
+                        'count': sum(kinds.values()),
+                        'kinds': dict(kinds),
+                        'users': sorted(self._users_by_ip.get(ip, ()))
+                    }
+                    for ip, kinds in top_ips[:self.top_n]
+                ]
+            }
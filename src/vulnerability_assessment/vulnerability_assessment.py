@@ -8,6 +8,12 @@ import platform
 
 logger = logging.getLogger(__name__)
 
+AUTH_FLAG_TYPES = {
+    'failed_password': 'Authentication Failure',
+    'sudo_failure': 'Sudo Authentication Failure',
+    'auth_failure': 'Authentication Failure'
+}
+
 class VulnerabilityAssessment:
     """Analyzes system data for security vulnerabilities"""
     
@@ -86,7 +92,10 @@ class VulnerabilityAssessment:
             # Check system version
             if platform.system() == "Linux":
                 # Add Linux-specific checks
-                if self.system_data.get('logs'):
+                auth_events = self.system_data.get('auth_events')
+                if auth_events:
+                    self._flag_auth_events(auth_events)
+                elif self.system_data.get('logs'):
                     auth_log = self.system_data['logs'].get('auth.log', [])
                     for line in auth_log:
                         if 'Failed password' in line or 'authentication failure' in line:
@@ -100,6 +109,25 @@ class VulnerabilityAssessment:
             logger.error(f"Error analyzing system: {str(e)}", exc_info=True)
             return 0
     
+    def _flag_auth_events(self, auth_events):
+        """Flag authentication failures from AuthLogAnalyzer window counts"""
+        for entry in auth_events.get('source_ips', []):
+            self.details['event_log_flags']['linux'].append({
+                'type': 'Authentication Failure',
+                'source_ip': entry['source_ip'],
+                'count': entry['count'],
+                'kinds': entry['kinds'],
+                'users': entry['users']
+            })
+        
+        # Failures without a source address (e.g. local sudo) are reported per kind
+        for kind, count in auth_events.get('unattributed', {}).items():
+            if count > 0:
+                self.details['event_log_flags']['linux'].append({
+                    'type': AUTH_FLAG_TYPES.get(kind, 'Authentication Failure'),
+                    'count': count
+                })
+    
     def compute_risk_score(self):
         """Compute overall risk score based on all factors"""
         try:
@@ -0,0 +1,174 @@
+import json
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.honeypot import attack_log_writer
+from src.honeypot.attack_log_writer import AttackLogWriter, ATTACK_LOG_COLUMNS
+
+CREATE_ATTACK_LOGS = """
+    CREATE TABLE attack_logs (
+        id INTEGER PRIMARY KEY,
+        timestamp TEXT,
+        source_ip TEXT NOT NULL,
+        request_method TEXT,
+        request_path TEXT,
+        request_data TEXT,
+        type TEXT,
+        attack_type TEXT,
+        attack_details TEXT,
+        risk_score REAL,
+        user_agent TEXT,
+        headers TEXT,
+        response_code INTEGER,
+        is_malicious BOOLEAN,
+        payload_fingerprint TEXT
+    )
+"""
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # The rollup upsert is MySQL syntax; these tests cover the attack_logs side
+    monkeypatch.setattr(attack_log_writer, 'update_rollup', lambda conn, rows: None)
+    path = str(tmp_path / 'honeypot.db')
+    engine = create_engine('sqlite://', creator=lambda: sqlite3.connect(path))
+    with engine.begin() as conn:
+        conn.execute(text(CREATE_ATTACK_LOGS))
+    return engine
+
+
+@pytest.fixture
+def writer(db, tmp_path):
+    return AttackLogWriter(db, batch_size=2, spill_path=str(tmp_path / 'spill.jsonl'),
+                           max_replay_attempts=2)
+
+
+def row(source_ip, **fields):
+    values = dict.fromkeys(ATTACK_LOG_COLUMNS)
+    values.update(timestamp='2026-10-17 12:00:00', source_ip=source_ip, risk_score=0.8, **fields)
+    return values
+
+
+def stored_ips(db):
+    with db.connect() as conn:
+        return [ip for (ip,) in conn.execute(text("SELECT source_ip FROM attack_logs ORDER BY id"))]
+
+
+def read_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_spilled_rows_are_replayed(writer, db, tmp_path):
+    writer.spill([row('10.0.0.1'), row('10.0.0.2'), row('10.0.0.3')])
+    writer._replay_spill()
+    assert stored_ips(db) == ['10.0.0.1', '10.0.0.2', '10.0.0.3']
+    assert writer.stats()['replayed'] == 3
+    assert not (tmp_path / 'spill.jsonl').exists()
+    assert list(tmp_path.glob('*.replay')) == []
+
+
+def test_unreachable_database_keeps_rows_unchanged(writer, db, tmp_path):
+    with db.begin() as conn:
+        conn.execute(text("DROP TABLE attack_logs"))  # OperationalError, like a lost server
+    writer.spill([row('10.0.0.1'), row('10.0.0.2'), row('10.0.0.3')])
+    for _ in range(writer.max_replay_attempts + 1):
+        writer._replay_spill()
+    spilled = read_lines(tmp_path / 'spill.jsonl')
+    assert [r['source_ip'] for r in spilled] == ['10.0.0.1', '10.0.0.2', '10.0.0.3']
+    assert all('replay_attempts' not in r for r in spilled)
+    assert not (tmp_path / 'spill.jsonl.dead').exists()
+
+
+def test_bad_row_is_dead_lettered_without_blocking_others(writer, db, tmp_path):
+    writer.spill([row('10.0.0.1'), row(None), row('10.0.0.3'), row('10.0.0.4')])
+
+    writer._replay_spill()
+    assert stored_ips(db) == ['10.0.0.1', '10.0.0.3', '10.0.0.4']
+    retried = read_lines(tmp_path / 'spill.jsonl')
+    assert len(retried) == 1 and retried[0]['replay_attempts'] == 1
+
+    writer._replay_spill()
+    assert not (tmp_path / 'spill.jsonl').exists()
+    dead = read_lines(tmp_path / 'spill.jsonl.dead')
+    assert len(dead) == 1 and dead[0]['replay_attempts'] == 2
+    assert 'NOT NULL' in dead[0]['replay_error']
+    assert writer.stats()['dead_lettered'] == 1
+    assert stored_ips(db) == ['10.0.0.1', '10.0.0.3', '10.0.0.4']
+
+
+def test_stale_replay_files_are_recovered(writer, db, tmp_path):
+    # A replay claimed by a process that no longer exists
+    stale = tmp_path / 'spill.jsonl.999999999.replay'
+    stale.write_text(json.dumps(row('10.0.0.9')) + '\n')
+    writer._recover_stale_replays()
+    assert not stale.exists()
+    writer._replay_spill()
+    assert stored_ips(db) == ['10.0.0.9']
+
+
+def test_failed_batch_is_spilled_and_replayed_after_the_next_flush(writer, db, tmp_path):
+    with db.begin() as conn:
+        conn.execute(text("ALTER TABLE attack_logs RENAME TO attack_logs_moved"))
+    assert not writer._write([row('10.0.0.1')])
+    assert writer.stats()['spilled'] == 1
+    with db.begin() as conn:
+        conn.execute(text("ALTER TABLE attack_logs_moved RENAME TO attack_logs"))
+    assert writer._write([row('10.0.0.2')])
+    writer._replay_spill()
+    assert sorted(stored_ips(db)) == ['10.0.0.1', '10.0.0.2']
+
+
+def create_ml_features(db):
+    with db.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE ml_features (
+                attack_log_id INTEGER PRIMARY KEY,
+                feature_vector BLOB,
+                vectorizer_id TEXT,
+                prediction_score REAL
+            )
+        """))
+
+
+def test_feature_vectors_are_linked_to_their_rows(db, tmp_path):
+    create_ml_features(db)
+    writer = AttackLogWriter(db, spill_path=str(tmp_path / 'spill.jsonl'),
+                             featurizer=lambda data: [(d.encode(), 'v1') for d in data])
+    writer._write([row('10.0.0.1', request_data='a'), row('10.0.0.2'), row('10.0.0.3', request_data='c')])
+    with db.connect() as conn:
+        linked = conn.execute(text("""
+            SELECT a.source_ip, f.feature_vector FROM ml_features f
+            JOIN attack_logs a ON a.id = f.attack_log_id ORDER BY a.id
+        """)).all()
+    assert [(ip, bytes(vector)) for ip, vector in linked] == [('10.0.0.1', b'a'), ('10.0.0.3', b'c')]
+    assert writer.stats()['feature_vectors'] == 2
+
+
+def test_rows_without_vectors_are_still_written(db, tmp_path):
+    create_ml_features(db)
+    writer = AttackLogWriter(db, spill_path=str(tmp_path / 'spill.jsonl'),
+                             featurizer=lambda data: [None for _ in data])
+    assert writer._write([row('10.0.0.1', request_data='a')])
+    assert stored_ips(db) == ['10.0.0.1']
+    assert writer.stats()['spilled'] == 0
+
+
+def test_replayed_first_row_is_kept_when_repeats_created_the_counter(writer, db, monkeypatch):
+    # Repeat rows written while the window's first full row sat in the spill
+    # file have already created the counter row
+    monkeypatch.setattr(attack_log_writer, 'update_fingerprint_counts', lambda conn, rows: set())
+    first = row('10.0.0.1', payload_fingerprint='fp1', window_start='2026-10-17 12:00:00')
+    writer.spill([first])
+    writer._replay_spill()
+    assert stored_ips(db) == ['10.0.0.1']
+
+    # Once stored, later full rows of the same window are repeats; the next window is not
+    writer._write([dict(first, timestamp='2026-10-17 12:01:00'),
+                   dict(first, timestamp='2026-10-17 12:05:00', window_start='2026-10-17 12:05:00')])
+    with db.connect() as conn:
+        timestamps = [t for (t,) in conn.execute(text("SELECT timestamp FROM attack_logs ORDER BY id"))]
+    assert timestamps == ['2026-10-17 12:00:00', '2026-10-17 12:05:00']
+    assert writer.stats()['repeats'] == 1
@@ -0,0 +1,85 @@
+import os
+import time
+
+from src.honeypot.attacker_table import AttackerTable
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / 'attackers.snapshot')
+    now = time.time()
+    table = AttackerTable(snapshot_path=path)
+    table.record('10.0.0.1', 0.9, payload="' OR 1=1 --", user_agent='sqlmap', is_attack=True, now=now)
+    table.record('10.0.0.2', 0.1, now=now)
+    assert table.save(path) == 2
+
+    restored = AttackerTable(snapshot_path=path)
+    assert restored.load() == 2
+    assert restored.get('10.0.0.1') == table.get('10.0.0.1')
+
+
+def test_expired_entries_are_not_restored(tmp_path):
+    path = str(tmp_path / 'attackers.snapshot')
+    table = AttackerTable(ttl=60, snapshot_path=path)
+    table.record('10.0.0.1', 0.5, now=time.time() - 120)
+    table.record('10.0.0.2', 0.5)
+    table.save(path)
+    restored = AttackerTable(ttl=60, snapshot_path=path)
+    assert restored.load() == 1
+    assert restored.get('10.0.0.1') is None
+
+
+def test_worker_snapshots_are_merged_on_load(tmp_path):
+    path = str(tmp_path / 'attackers.snapshot')
+    now = time.time()
+    base = AttackerTable(snapshot_path=path)
+    base.record('10.0.0.1', 0.5, payload='a', now=now - 10)
+    base.save(path)
+
+    # Two workers start from the base and each see part of the traffic
+    workers = [AttackerTable(snapshot_path=path) for _ in range(2)]
+    for worker in workers:
+        worker.load()
+    workers[0].record('10.0.0.1', 0.9, payload='b', is_attack=True, now=now)
+    workers[0].record('10.0.0.2', 0.1, now=now)
+    workers[1].record('10.0.0.1', 0.2, payload='c', now=now - 1)
+    workers[1].record('10.0.0.3', 0.1, now=now)
+    # Pids that cannot belong to a running process
+    workers[0].save(workers[0].worker_snapshot_path(999999991))
+    workers[1].save(workers[1].worker_snapshot_path(999999992))
+
+    merged = AttackerTable(snapshot_path=path)
+    assert merged.load() == 3
+    attacker = merged.get('10.0.0.1')
+    assert attacker['requests'] == 3
+    assert attacker['attacks'] == 1
+    assert attacker['max_risk'] == 0.9
+    assert attacker['distinct_payloads'] == 3
+    assert sorted(os.listdir(tmp_path)) == ['attackers.snapshot']
+
+    # The merged base is loaded as is the next time
+    again = AttackerTable(snapshot_path=path)
+    assert again.load() == 3
+    assert again.get('10.0.0.1')['requests'] == 3
+
+
+def test_merged_top_combines_the_other_workers_snapshots(tmp_path):
+    path = str(tmp_path / 'attackers.snapshot')
+    now = time.time()
+    base = AttackerTable(snapshot_path=path)
+    base.record('10.0.0.1', 0.5, now=now - 10)
+    base.save(path)
+
+    serving, other = AttackerTable(snapshot_path=path), AttackerTable(snapshot_path=path)
+    serving.load()
+    other.load()
+    serving.record('10.0.0.1', 0.5, now=now)
+    other.record('10.0.0.1', 0.5, now=now)
+    other.record('10.0.0.2', 0.9, is_attack=True, now=now)
+    other.save(other.worker_snapshot_path(os.getpid() + 1))
+
+    attackers, tracked = serving.merged_top(limit=10)
+    assert tracked == 2
+    assert [(a['source_ip'], a['requests']) for a in attackers] == [('10.0.0.1', 3), ('10.0.0.2', 1)]
+    # Reading leaves the serving table and the files as they were
+    assert serving.get('10.0.0.1')['requests'] == 2
+    assert len(os.listdir(tmp_path)) == 2
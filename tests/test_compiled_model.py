@@ -0,0 +1,72 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.ml_models.attack_classifier import preprocess_text
+from src.ml_models.compiled_model import CompiledSQLiModel
+
+BUNDLED_DIR = os.path.join(os.path.dirname(__file__), '..', 'src', 'ml_models')
+
+PAYLOADS = [
+    "", "a", "hello world", "alice@example.com", "electronics",
+    "' OR '1'='1' --", "admin' --", "1'; DROP TABLE users; --",
+    "1' UNION SELECT username, password FROM users --",
+    "1' AND 1=(SELECT COUNT(*) FROM information_schema.tables); --",
+    '{"username": "admin\' or 1=1 #", "password": "x"}',
+    "ÄÖÜ ß café", "日本語の入力", "tab\tand\nnewline", "%27%20OR%201%3D1",
+]
+
+
+def assert_parity(vectorizer, classifier, compiled):
+    documents = [preprocess_text(payload) for payload in PAYLOADS]
+    expected = classifier.predict_proba(vectorizer.transform(documents))[:, 1]
+    assert np.allclose(compiled.predict_proba(documents), expected, rtol=0.0, atol=1e-9)
+
+
+@pytest.fixture(scope='module')
+def bundled():
+    vectorizer = joblib.load(os.path.join(BUNDLED_DIR, 'sqli_vectorizer.joblib'))
+    classifier = joblib.load(os.path.join(BUNDLED_DIR, 'sqli_model.joblib'))
+    return vectorizer, classifier
+
+
+def test_bundled_model_matches_sklearn(bundled):
+    vectorizer, classifier = bundled
+    assert_parity(vectorizer, classifier, CompiledSQLiModel.from_sklearn(vectorizer, classifier))
+
+
+@pytest.mark.parametrize('options', [
+    {'ngram_range': (2, 3), 'sublinear_tf': True},
+    {'ngram_range': (1, 2), 'use_idf': False, 'lowercase': False},
+    {'ngram_range': (1, 3), 'norm': None},
+])
+def test_vectorizer_options_match_sklearn(options):
+    training = PAYLOADS * 2
+    labels = [i % 2 for i in range(len(training))]
+    vectorizer = TfidfVectorizer(analyzer='char', **options)
+    classifier = RandomForestClassifier(n_estimators=5, random_state=0)
+    classifier.fit(vectorizer.fit_transform([preprocess_text(x) for x in training]), labels)
+    assert_parity(vectorizer, classifier, CompiledSQLiModel.from_sklearn(vectorizer, classifier))
+
+
+def test_word_analyzer_is_rejected():
+    vectorizer = TfidfVectorizer(analyzer='word').fit(['select from users'])
+    classifier = RandomForestClassifier(n_estimators=1).fit(vectorizer.transform(['select from users']), [1])
+    with pytest.raises(ValueError):
+        CompiledSQLiModel.from_sklearn(vectorizer, classifier)
+
+
+@pytest.mark.parametrize('save', ['save', 'save_dir'])
+def test_saved_model_scores_the_same(bundled, tmp_path, save):
+    compiled = CompiledSQLiModel.from_sklearn(*bundled)
+    path = str(tmp_path / ('model.npz' if save == 'save' else 'model'))
+    getattr(compiled, save)(path)
+    loaded = CompiledSQLiModel.load(path)
+    assert loaded.memory_mapped == (save == 'save_dir')
+    documents = [preprocess_text(payload) for payload in PAYLOADS]
+    assert np.array_equal(loaded.predict_proba(documents), compiled.predict_proba(documents))
+    assert loaded.vectorizer.digest == compiled.vectorizer.digest
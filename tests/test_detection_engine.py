@@ -0,0 +1,71 @@
+import re
+import json
+
+import pytest
+
+from src.honeypot.detection_engine import DEFAULT_RULES, DetectionEngine, default_engine
+
+
+def legacy_scan(text):
+    """Every rule searched with re.search, as detect_sql_injection did before the engine"""
+    risk_score = 0.0
+    matched = []
+    for rule in DEFAULT_RULES:
+        if re.search(rule.pattern, text, re.IGNORECASE):
+            matched.append(rule.pattern)
+            risk_score = max(risk_score, rule.weight)
+    if len(matched) > 1:
+        risk_score = min(1.0, risk_score + 0.1 * (len(matched) - 1))
+    return risk_score, matched
+
+
+PAYLOADS = [
+    '',
+    'hello world',
+    'correct horse battery staple',
+    "admin' --",
+    "' OR '1'='1' --",
+    "1' UNION SELECT username, password FROM users --",
+    "1' AND 1=1 UNION ALL SELECT NULL,table_name FROM information_schema.tables#",
+    "1'; DROP TABLE users; --",
+    "x' AND name LIKE '%admin%",
+    "admin' OR 1=1/*",
+    "1; UPDATE users SET role='admin' WHERE id=1",
+    "insert into t values (1)",
+    "uNiOn/**/sElEcT 1",
+    "orlando and android1",
+    "deleted from the form",
+    # Characters IGNORECASE equates with ASCII letters
+    "İNFORMATION_SCHEMA",
+    "UNİON SELECT",
+    "KILL OR 1=1",
+    "union\nselect",
+    "50% off LIKE new",
+]
+
+
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_scan_matches_legacy_regexes(payload):
+    assert default_engine.scan(payload) == legacy_scan(payload)
+
+
+@pytest.mark.parametrize('fields', [
+    {'username': "admin' OR 1=1 --", 'password': 'x'},
+    {'category': 'electronics'},
+    {'category': "1' UNION SELECT NULL FROM information_schema.tables#"},
+])
+def test_scan_matches_legacy_regexes_on_form_json(fields):
+    payload = json.dumps(fields)
+    assert default_engine.scan(payload) == legacy_scan(payload)
+
+
+def test_benign_input_skips_the_regexes():
+    engine = DetectionEngine()
+    engine._compiled = [None] * len(engine.rules)  # Any regex call would fail
+    assert engine.scan('nothing to see here') == (0.0, [])
+
+
+def test_custom_rules():
+    engine = DetectionEngine([DEFAULT_RULES[0]])
+    assert engine.scan('select * from information_schema.columns') == (0.7, [DEFAULT_RULES[0].pattern])
+    assert engine.scan('UNION SELECT 1') == (0.0, [])
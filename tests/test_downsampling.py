@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.honeypot.downsampling import downsample, lttb, minmax
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    x = np.arange(1000, dtype=np.float64)
+    y = rng.random(1000) * 0.2
+    y[421] = 1.0   # a single high-risk attack
+    y[777] = -0.5
+    return x, y
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_spikes_survive_downsampling(series, method):
+    x, y = series
+    reduced_x, reduced_y = downsample(x, y, 50, method=method)
+    assert len(reduced_x) <= 50
+    assert np.all(np.diff(reduced_x) > 0)
+    assert 421 in reduced_x and 777 in reduced_x
+    assert np.array_equal(reduced_y, y[reduced_x.astype(int)])
+
+
+def test_lttb_keeps_the_endpoints_and_exactly_threshold_points(series):
+    x, y = series
+    kept = lttb(x, y, 37)
+    assert len(kept) == 37
+    assert kept[0] == 0 and kept[-1] == len(x) - 1
+
+
+def test_lttb_picks_one_point_per_bucket_on_a_line():
+    x = np.arange(101, dtype=np.float64)
+    kept = lttb(x, 2 * x, 11)
+    assert len(kept) == 11
+    assert np.all(np.diff(kept) > 0)
+
+
+def test_minmax_keeps_each_buckets_extremes(series):
+    x, y = series
+    kept = minmax(x, y, 20)
+    edges = np.linspace(0, len(x), 11).astype(int)
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = kept[(kept >= start) & (kept < end)]
+        assert start + np.argmax(y[start:end]) in bucket
+        assert start + np.argmin(y[start:end]) in bucket
+
+
+def test_short_series_are_returned_unchanged():
+    x, y = downsample([1, 2, 3], [0.1, 0.5, 0.2], 10)
+    assert x.tolist() == [1, 2, 3] and y.tolist() == [0.1, 0.5, 0.2]
+
+
+def test_invalid_arguments_are_rejected(series):
+    x, y = series
+    with pytest.raises(ValueError):
+        downsample(x, y, 10, method='average')
+    with pytest.raises(ValueError):
+        lttb(x, y, 2)
+    with pytest.raises(ValueError):
+        minmax(x, y, 1)
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+import pytest
+
+from src.honeypot.event_query import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip_from_datetime():
+    timestamp = datetime(2026, 3, 18, 9, 34, 8)
+    assert decode_cursor(encode_cursor(timestamp, 42)) == (timestamp, 42)
+
+
+def test_cursor_round_trip_from_string():
+    assert decode_cursor(encode_cursor('2026-03-18 09:34:08', '7')) == (datetime(2026, 3, 18, 9, 34, 8), 7)
+
+
+def test_cursor_drops_microseconds_and_padding():
+    cursor = encode_cursor(datetime(2026, 3, 18, 9, 34, 8, 123456), 1)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (datetime(2026, 3, 18, 9, 34, 8), 1)
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-a-cursor', 'W10', encode_cursor('yesterday', 1)])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,109 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from src.integration.hsiem import event_sink
+from src.integration.hsiem.event_sink import EventSink
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    calls = []
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        calls.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(os, 'fsync', fsync)
+    return calls
+
+
+def read_events(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_events_are_buffered_until_flush(tmp_path):
+    sink = EventSink(str(tmp_path), flush_interval=0)
+    sink.write({'type': 'login', 'user': 'alice'})
+    sink.write({'type': 'scan', 'score': 0.5})
+    assert os.path.getsize(sink.path) == 0
+    sink.flush()
+    assert read_events(sink.path) == [{'type': 'login', 'user': 'alice'}, {'type': 'scan', 'score': 0.5}]
+    assert sink.stats()['events_written'] == 2
+
+
+def test_full_buffer_is_written(tmp_path):
+    sink = EventSink(str(tmp_path), buffer_size=100, flush_interval=0)
+    sink.write({'payload': 'x' * 120})
+    assert len(read_events(sink.path)) == 1
+    assert sink.stats()['buffered_bytes'] == 0
+
+
+def test_fsync_always_syncs_every_event(tmp_path, fsyncs):
+    sink = EventSink(str(tmp_path), flush_interval=0, fsync='always')
+    sink.write({'n': 1})
+    sink.write({'n': 2})
+    assert len(fsyncs) == 2
+    assert len(read_events(sink.path)) == 2
+
+
+def test_fsync_interval_syncs_on_flush_and_close(tmp_path, fsyncs):
+    sink = EventSink(str(tmp_path), flush_interval=0, fsync='interval')
+    sink.write({'n': 1})
+    assert fsyncs == []
+    sink.flush()
+    assert len(fsyncs) == 1
+    sink.write({'n': 2})
+    sink.close()
+    assert len(fsyncs) == 2
+    assert len(read_events(sink.path)) == 2
+
+
+def test_fsync_never_leaves_syncing_to_the_os(tmp_path, fsyncs):
+    sink = EventSink(str(tmp_path), flush_interval=0, fsync='never')
+    sink.write({'n': 1})
+    sink.flush()
+    sink.close()
+    assert fsyncs == []
+    assert len(read_events(sink.path)) == 1
+
+
+def test_unknown_fsync_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        EventSink(str(tmp_path), fsync='sometimes')
+
+
+def test_file_rolls_over_at_midnight(tmp_path, monkeypatch):
+    class Clock(datetime):
+        current = datetime(2026, 10, 17, 23, 59, 59)
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls.current
+
+    monkeypatch.setattr(event_sink, 'datetime', Clock)
+    sink = EventSink(str(tmp_path), flush_interval=0)
+    sink.write({'n': 1})
+    first = sink.path
+
+    Clock.current = datetime(2026, 10, 18, 0, 0, 1)
+    sink._rollover_at = 0  # midnight has passed
+    sink.write({'n': 2})
+    sink.close()
+
+    assert os.path.basename(first) == 'hsiem_20261017.log'
+    assert os.path.basename(sink.path) == 'hsiem_20261018.log'
+    assert read_events(first) == [{'n': 1}]
+    assert read_events(sink.path) == [{'n': 2}]
+    assert sink.stats()['rotations'] == 1
+
+
+def test_closed_sink_rejects_events(tmp_path):
+    sink = EventSink(str(tmp_path), flush_interval=0)
+    sink.close()
+    with pytest.raises(RuntimeError):
+        sink.write({'n': 1})
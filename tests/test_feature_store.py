@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from src.ml_models.feature_store import (
+    COUNT_FEATURES, encode_features, decode_features, densify, to_csr
+)
+
+COUNTS = {name: i * 3 for i, name in enumerate(COUNT_FEATURES)}
+
+
+@pytest.mark.parametrize('indices', [[], [0, 5, 65535], [3, 70000, 1 << 20]])
+def test_round_trip(indices):
+    values = np.linspace(0.1, 0.9, len(indices))
+    decoded_indices, decoded_values, counts = decode_features(encode_features(indices, values, COUNTS))
+    assert decoded_indices.dtype == np.int32
+    assert decoded_indices.tolist() == indices
+    assert np.allclose(decoded_values, values.astype(np.float32))
+    assert counts.tolist() == [COUNTS[name] for name in COUNT_FEATURES]
+
+
+def test_small_indices_use_two_bytes():
+    narrow = encode_features([1, 2], [0.5, 0.5], COUNTS)
+    wide = encode_features([1, 70000], [0.5, 0.5], COUNTS)
+    assert len(wide) - len(narrow) == 4
+
+
+def test_decode_accepts_memoryview():
+    blob = encode_features([4], [0.25], COUNTS)
+    indices, values, _ = decode_features(memoryview(blob))
+    assert indices.tolist() == [4] and values.tolist() == [0.25]
+
+
+def test_unknown_version_is_rejected():
+    blob = bytearray(encode_features([1], [1.0], COUNTS))
+    blob[0] = 99
+    with pytest.raises(ValueError):
+        decode_features(bytes(blob))
+
+
+def test_densify_and_csr_agree():
+    decoded = [
+        decode_features(encode_features([0, 3], [0.5, 0.25], COUNTS)),
+        decode_features(encode_features([], [], COUNTS)),
+        decode_features(encode_features([2], [1.0], COUNTS)),
+    ]
+    dense = densify(decoded, 4)
+    assert dense.tolist() == [[0.5, 0, 0, 0.25], [0, 0, 0, 0], [0, 0, 1.0, 0]]
+    assert np.array_equal(to_csr(decoded, 4).toarray(), dense)
+
+
+def test_cached_vectors_score_like_raw_payloads(tmp_path):
+    from src.ml_models.attack_classifier import SQLInjectionClassifier
+    classifier = SQLInjectionClassifier(model_dir=str(tmp_path))
+    if classifier.vectorizer_id is None:
+        pytest.skip("bundled model has no compiled vectorizer")
+    payloads = ["' OR 1=1 --", 'hello world', '1 UNION SELECT a FROM b', '{"category": "books"}']
+    vectors = classifier.feature_vectors(payloads)
+    assert [vectorizer_id for _, vectorizer_id in vectors] == [classifier.vectorizer_id] * len(payloads)
+    cached = classifier.predict_risk_vectors(vectors)
+    assert np.allclose(cached, classifier.predict_risk_batch(payloads), atol=1e-6)
+    # Vectors from another vectorizer are left for the caller to score
+    assert classifier.predict_risk_vectors([(vectors[0][0], 'other'), None]) == [None, None]
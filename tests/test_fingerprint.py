@@ -0,0 +1,55 @@
+import pytest
+
+from src.honeypot.fingerprint import RepeatTracker, normalize_payload, payload_fingerprint
+
+
+@pytest.mark.parametrize('variants', [
+    ['AND 4821=4821', 'and 1337 = 1337', 'AnD 7=7'],
+    ["1' OR 'xYzq'='xYzq", "9' or 'abc' = 'abc"],
+    ['1/**/UNION/**/SELECT 0x41,2', '5 union   select 0xff , 77'],
+    ['id=1\tOR\n2>1', 'id = 3 OR 4 > 5'],
+])
+def test_variants_share_a_fingerprint(variants):
+    assert len({normalize_payload(v) for v in variants}) == 1
+    assert len({payload_fingerprint(v) for v in variants}) == 1
+
+
+def test_normalized_shape():
+    assert normalize_payload('AND 4821=4821') == 'and ?=?'
+    assert normalize_payload('1/**/UNION/**/SELECT 0x41,2') == '? union select ?,?'
+
+
+def test_different_shapes_differ():
+    assert payload_fingerprint("1' OR 1=1 --") != payload_fingerprint("1' AND 1=1 --")
+    assert payload_fingerprint('1 UNION SELECT a') != payload_fingerprint('1 UNION SELECT a, b')
+    assert len(payload_fingerprint('anything')) == 16
+
+
+def test_repeats_within_a_window():
+    tracker = RepeatTracker(window=300)
+    assert tracker.observe('10.0.0.1', 'fp', now=600) == (False, 600)
+    assert tracker.observe('10.0.0.1', 'fp', now=899) == (True, 600)
+    # Another IP or fingerprint is a first occurrence of its own
+    assert tracker.observe('10.0.0.2', 'fp', now=899) == (False, 600)
+    assert tracker.observe('10.0.0.1', 'other', now=899) == (False, 600)
+    assert tracker.repeats == 1
+
+
+def test_windows_are_fixed_and_epoch_aligned():
+    tracker = RepeatTracker(window=300)
+    assert tracker.observe('10.0.0.1', 'fp', now=899) == (False, 600)
+    # One second later is a new window, not 300 seconds after the first hit
+    assert tracker.observe('10.0.0.1', 'fp', now=900) == (False, 900)
+    assert tracker.observe('10.0.0.1', 'fp', now=1000) == (True, 900)
+    # Every process agrees on the window start
+    assert RepeatTracker(window=300).observe('10.0.0.1', 'fp', now=1000) == (False, 900)
+
+
+def test_least_recently_seen_pairs_are_forgotten():
+    tracker = RepeatTracker(window=300, max_entries=2)
+    tracker.observe('10.0.0.1', 'fp', now=10)
+    tracker.observe('10.0.0.2', 'fp', now=11)
+    tracker.observe('10.0.0.1', 'fp', now=12)  # refreshes 10.0.0.1
+    tracker.observe('10.0.0.3', 'fp', now=13)  # evicts 10.0.0.2
+    assert tracker.observe('10.0.0.1', 'fp', now=14) == (True, 0)
+    assert tracker.observe('10.0.0.2', 'fp', now=15) == (False, 0)
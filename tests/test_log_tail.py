@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from src.data_collector import log_tail
+from src.data_collector.log_tail import LogFollower, tail_lines
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    # Exercise reads that span several blocks with tiny files
+    monkeypatch.setattr(log_tail, 'BLOCK_SIZE', 16)
+
+
+def append(path, text):
+    with open(path, 'a') as f:
+        f.write(text)
+
+
+def test_tail_lines(tmp_path):
+    path = tmp_path / 'auth.log'
+    path.write_text(''.join(f'line {i}\n' for i in range(50)))
+    assert tail_lines(str(path), 3) == ['line 47\n', 'line 48\n', 'line 49\n']
+    assert tail_lines(str(path), 0) == []
+
+
+def test_first_poll_returns_the_existing_tail(tmp_path):
+    path = tmp_path / 'auth.log'
+    path.write_text('one\ntwo\nthree\n')
+    follower = LogFollower(str(path), max_lines=2)
+    assert follower.poll() == ['two\n', 'three\n']
+    assert follower.poll() == []
+
+
+def test_every_appended_line_is_returned_but_only_max_lines_kept(tmp_path):
+    path = tmp_path / 'auth.log'
+    path.write_text('')
+    follower = LogFollower(str(path), max_lines=3)
+    follower.poll()
+    lines = [f'Failed password for root from 10.0.0.{i} port 22\n' for i in range(40)]
+    append(path, ''.join(lines))
+    batches = list(follower.batches())
+    assert len(batches) > 1
+    assert [line for batch in batches for line in batch] == lines
+    assert follower.lines() == lines[-3:]
+
+
+def test_partial_line_waits_for_its_newline(tmp_path):
+    path = tmp_path / 'auth.log'
+    path.write_text('')
+    follower = LogFollower(str(path))
+    follower.poll()
+    append(path, 'complete\nhalf a li')
+    assert follower.poll() == ['complete\n']
+    append(path, 'ne that is longer than one block\n')
+    assert follower.poll() == ['half a line that is longer than one block\n']
+
+
+def test_rotation_drains_the_old_file_then_follows_the_new_one(tmp_path):
+    path = tmp_path / 'auth.log'
+    path.write_text('old 1\n')
+    follower = LogFollower(str(path))
+    follower.poll()
+    append(path, 'old 2\nold 3\n')
+    os.rename(path, tmp_path / 'auth.log.1')
+    path.write_text('new 1\n')
+    assert follower.poll() == ['old 2\n', 'old 3\n', 'new 1\n']
+    append(path, 'new 2\n')
+    assert follower.poll() == ['new 2\n']
+
+
+def test_truncation_restarts_from_the_beginning(tmp_path):
+    path = tmp_path / 'auth.log'
+    path.write_text('a fairly long first line\nanother one\n')
+    follower = LogFollower(str(path))
+    follower.poll()
+    with open(path, 'w') as f:  # copytruncate
+        f.write('fresh\n')
+    assert follower.poll() == ['fresh\n']
+
+
+def test_missing_file_is_retried(tmp_path):
+    path = tmp_path / 'auth.log'
+    follower = LogFollower(str(path))
+    assert follower.poll() == []
+    path.write_text('appeared\n')
+    assert follower.poll() == ['appeared\n']
+    os.unlink(path)
+    assert follower.poll() == []
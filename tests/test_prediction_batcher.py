@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from src.ml_models.prediction_batcher import PredictionBatcher
+
+
+class FakeClassifier:
+    """Scores a payload by its length and records every batch"""
+
+    def __init__(self, cached=None, fail=False):
+        self.cached = cached or {}
+        self.fail = fail
+        self.batches = []
+        self.inline = []
+
+    def cached_risk(self, input_data):
+        return self.cached.get(input_data)
+
+    def cache_stats(self):
+        return {}
+
+    def predict_risk_batch(self, inputs):
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        self.batches.append(list(inputs))
+        return [len(x) / 100 for x in inputs]
+
+    def predict_risk(self, input_data):
+        self.inline.append(input_data)
+        return 0.0
+
+
+def score_concurrently(batcher, payloads):
+    results = {}
+    barrier = threading.Barrier(len(payloads))
+
+    def score(payload):
+        barrier.wait()
+        results[payload] = batcher.predict_risk(payload)
+
+    threads = [threading.Thread(target=score, args=(payload,)) for payload in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_batches():
+    classifier = FakeClassifier()
+    batcher = PredictionBatcher(classifier, max_batch_size=64, max_wait_ms=200)
+    payloads = ['x' * n for n in range(1, 9)]
+    results = score_concurrently(batcher, payloads)
+    assert results == {payload: len(payload) / 100 for payload in payloads}
+    assert len(classifier.batches) < len(payloads)
+    assert sorted(x for batch in classifier.batches for x in batch) == payloads
+    assert batcher.stats()['batched_items'] == len(payloads)
+
+
+def test_batches_are_capped_at_max_batch_size():
+    classifier = FakeClassifier()
+    batcher = PredictionBatcher(classifier, max_batch_size=3, max_wait_ms=200)
+    score_concurrently(batcher, ['x' * n for n in range(1, 8)])
+    assert max(len(batch) for batch in classifier.batches) <= 3
+
+
+def test_cached_payloads_skip_the_queue():
+    classifier = FakeClassifier(cached={'cached': 0.75})
+    batcher = PredictionBatcher(classifier)
+    assert batcher.predict_risk('cached') == 0.75
+    assert classifier.batches == [] and batcher._worker is None
+
+
+def test_failed_batch_is_scored_inline():
+    classifier = FakeClassifier(fail=True)
+    batcher = PredictionBatcher(classifier, timeout=1.0)
+    assert batcher.predict_risk('payload') == 0.0
+    assert classifier.inline == ['payload']
+
+
+@pytest.fixture
+def classifier(tmp_path):
+    from src.ml_models.attack_classifier import SQLInjectionClassifier
+    classifier = SQLInjectionClassifier(cache_size=2, model_dir=str(tmp_path))
+    scored = []
+    predict = classifier._predict_positive
+
+    def counting(processed_inputs):
+        scored.append(list(processed_inputs))
+        return predict(processed_inputs)
+
+    classifier._predict_positive = counting
+    classifier.scored = scored
+    return classifier
+
+
+def test_batch_scores_each_distinct_payload_once(classifier):
+    scores = classifier.predict_risk_batch(["' OR 1=1 --", "' or   1=1 --", 'hello'])
+    # Payloads are cached by their normalized form
+    assert classifier.scored == [["' or 1=1 --", 'hello']]
+    assert scores[0] == scores[1]
+    assert classifier.cache_stats()['misses'] == 3
+
+
+def test_score_cache_evicts_the_least_recently_used(classifier):
+    classifier.predict_risk_batch(['a', 'b'])
+    assert classifier.cached_risk('a') is not None  # a is now the most recent
+    classifier.predict_risk_batch(['c'])
+    assert classifier.cached_risk('b') is None
+    assert classifier.cached_risk('a') is not None
+    assert classifier.cache_stats()['size'] == 2
+    classifier.predict_risk('a')
+    assert classifier.scored == [['a', 'b'], ['c']]
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+from flask import Flask, jsonify
+
+from src.honeypot.response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache()
+
+
+def make_app(cache, view, ttl=60):
+    app = Flask(__name__)
+    app.route('/api/hsiem/stats')(cache.cached('stats', ttl)(view))
+    return app
+
+
+def test_concurrent_requests_share_one_computation(cache):
+    calls = []
+    release = threading.Event()
+
+    def stats():
+        calls.append(1)
+        release.wait(5)
+        return jsonify({'events': 42})
+
+    app = make_app(cache, stats)
+    responses = []
+
+    def get():
+        responses.append(app.test_client().get('/api/hsiem/stats'))
+
+    threads = [threading.Thread(target=get) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()['coalesced'] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert [r.get_json() for r in responses] == [{'events': 42}] * 5
+    assert cache.stats()['misses'] == 1 and cache.stats()['coalesced'] == 4
+
+
+def test_matching_etag_gets_an_empty_304(cache):
+    client = make_app(cache, lambda: jsonify({'events': 42})).test_client()
+    first = client.get('/api/hsiem/stats')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and first.headers['Cache-Control'] == 'no-cache'
+
+    revalidated = client.get('/api/hsiem/stats', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert revalidated.headers['ETag'] == etag
+
+    stale = client.get('/api/hsiem/stats', headers={'If-None-Match': '"other"'})
+    assert stale.status_code == 200 and stale.get_json() == {'events': 42}
+    assert cache.stats()['not_modified'] == 1 and cache.stats()['hits'] == 2
+
+
+def test_errors_are_not_cached(cache):
+    results = [({'error': 'down'}, 500), ({'events': 1}, 200)]
+
+    def stats():
+        body, status = results.pop(0)
+        return jsonify(body), status
+
+    client = make_app(cache, stats).test_client()
+    assert client.get('/api/hsiem/stats').status_code == 500
+    assert client.get('/api/hsiem/stats').get_json() == {'events': 1}
+    assert cache.stats()['misses'] == 2
+
+
+def test_failed_computation_is_retried(cache):
+    attempts = []
+
+    def compute():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("database unavailable")
+        return {'events': 1}
+
+    app = make_app(cache, lambda: jsonify(compute()))
+    app.testing = False
+    client = app.test_client()
+    assert client.get('/api/hsiem/stats').status_code == 500
+    assert client.get('/api/hsiem/stats').get_json() == {'events': 1}
+    assert len(attempts) == 2
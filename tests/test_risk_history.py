@@ -0,0 +1,67 @@
+import json
+import logging
+from datetime import datetime, timedelta
+
+from src.risk_history import RiskHistoryStore
+
+
+def write_history(path, scores):
+    start = datetime(2026, 1, 1)
+    path.write_text(json.dumps([
+        {'timestamp': (start + timedelta(minutes=i)).isoformat(), 'risk_score': score,
+         'severity': 'LOW', 'details': {'n': i}}
+        for i, score in enumerate(scores)
+    ]))
+
+
+def test_append_and_range(tmp_path):
+    store = RiskHistoryStore(str(tmp_path / 'history.db'), legacy_json=None)
+    store.extend([
+        {'timestamp': '2026-01-01T00:00:00', 'risk_score': 0.1, 'severity': 'Low', 'body': 'a'},
+        {'timestamp': '2026-01-01T00:05:00', 'risk_score': 0.9, 'severity': 'High', 'body': 'a'},
+    ])
+    assert store.count() == 2
+    assert [entry['risk_score'] for entry in store.latest(1)] == [0.9]
+    entries = store.range(start='2026-01-01T00:01:00', with_details=True)
+    assert entries == [{'timestamp': '2026-01-01T00:05:00', 'risk_score': 0.9,
+                        'severity': 'High', 'body': 'a'}]
+
+
+def test_legacy_json_is_imported_once_and_retired(tmp_path):
+    legacy = tmp_path / 'risk_history.json'
+    write_history(legacy, [0.1, 0.2, 0.3])
+    store = RiskHistoryStore(str(tmp_path / 'history.db'), legacy_json=str(legacy))
+    assert store.count() == 3
+    assert store.latest(3, with_details=True)[0]['details'] == {'n': 0}
+    assert not legacy.exists()
+    assert (tmp_path / 'risk_history.json.migrated').exists()
+
+
+def test_legacy_json_is_kept_when_the_store_has_history(tmp_path, caplog):
+    store = RiskHistoryStore(str(tmp_path / 'history.db'), legacy_json=None)
+    store.append({'risk_score': 0.5})
+    legacy = tmp_path / 'risk_history.json'
+    write_history(legacy, [0.1, 0.2])
+    with caplog.at_level(logging.WARNING):
+        assert store.migrate_json(str(legacy)) == 0
+    assert legacy.exists()
+    assert store.count() == 1
+    assert 'Not importing' in caplog.text
+
+
+def test_prune_expired_applies_the_retention_period(tmp_path):
+    store = RiskHistoryStore(str(tmp_path / 'history.db'), legacy_json=None, retention_days=1)
+    now = datetime.now()
+    store.extend([{'timestamp': now - timedelta(days=3), 'risk_score': 1.0, 'old': True},
+                  {'timestamp': now, 'risk_score': 0.5}])
+    assert store.prune_expired(now) == 1
+    # At most once per PRUNE_INTERVAL
+    store.append({'timestamp': now - timedelta(days=2), 'risk_score': 1.0})
+    assert store.prune_expired(now + timedelta(minutes=1)) == 0
+    assert store.count() == 2
+
+
+def test_default_path_is_in_the_data_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv('HONEYPOT_DATA_DIR', str(tmp_path / 'data'))
+    store = RiskHistoryStore(legacy_json=None)
+    assert store.path == str(tmp_path / 'data' / 'risk_history.db')